@@ -0,0 +1,133 @@
+import asyncio
+import datetime as dt
+import json
+
+from classifier import classify
+from exports import assessment_payload, encode_json
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+# Batches larger than this are classified on a worker thread so one big
+# request cannot stall every other connection on the event loop.
+INLINE_BATCH_SIZE = 64
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _now():
+    return dt.datetime.utcnow().isoformat() + "Z"
+
+
+def classify_payload(answers, timestamp=None):
+    # Same shape as the JSON download from export_assessment().
+    if not isinstance(answers, dict):
+        raise BadRequest("answers must be a JSON object")
+    timestamp = timestamp or _now()
+    try:
+        verdict, rationale, decision_log = classify(answers)
+    except (AttributeError, TypeError, ValueError) as exc:
+        raise BadRequest(str(exc)) from None
+    if verdict is None:
+        raise BadRequest(rationale[0])
+    decision_log = [{"timestamp": timestamp, **entry} for entry in decision_log]
+    assessment = {"result": verdict, "rationale": rationale, "answers": answers, "decision_log": decision_log}
+    return assessment_payload(assessment, timestamp)
+
+
+def _unwrap(record):
+    if isinstance(record, dict) and "answers" in record:
+        return record["answers"]
+    return record
+
+
+def classify_batch(records):
+    timestamp = _now()
+    results = []
+    for record in records:
+        try:
+            results.append(classify_payload(_unwrap(record), timestamp))
+        except BadRequest as exc:
+            results.append({"error": str(exc)})
+    return results
+
+
+# -------- ASGI plumbing
+async def _read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise BadRequest("request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _respond(send, status, body):
+    data = encode_json(body, compact=True)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": data})
+
+
+async def _handle(method, path, receive):
+    if path == "/health":
+        return 200, {"status": "ok"}
+    if path not in ("/classify", "/classify/batch"):
+        return 404, {"error": "not found"}
+    if method != "POST":
+        return 405, {"error": "method not allowed"}
+
+    try:
+        body = json.loads(await _read_body(receive) or b"null")
+    except json.JSONDecodeError as exc:
+        raise BadRequest(f"invalid JSON: {exc}") from None
+
+    if path == "/classify":
+        return 200, classify_payload(_unwrap(body))
+
+    records = body.get("records") if isinstance(body, dict) else body
+    if not isinstance(records, list):
+        raise BadRequest("batch requests must be a JSON array or {\"records\": [...]}")
+    if len(records) > INLINE_BATCH_SIZE:
+        return 200, await asyncio.to_thread(classify_batch, records)
+    return 200, classify_batch(records)
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    try:
+        status, body = await _handle(scope["method"], scope["path"], receive)
+    except BadRequest as exc:
+        status, body = 400, {"error": str(exc)}
+    await _respond(send, status, body)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the classifier over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run("api:app", host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,237 @@
+import datetime as dt
+import os
+import queue
+import threading
+import time
+
+from classifier import RULESET_VERSION
+from exports import encode_json
+
+QUEUE_SIZE = 10_000
+BATCH_SIZE = 256
+FSYNC_INTERVAL = 1.0
+MAX_BYTES = 64 * 1024 * 1024
+
+_STOP = object()
+
+
+def _isoformat(timestamp):
+    return dt.datetime.fromtimestamp(timestamp, dt.timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+
+# -------- Events
+# Built on the script thread from references only; the writer thread formats
+# the timestamp and serialises them.
+def decision_event(session, entry):
+    # ``entry`` is a sessions.DecisionEntry.
+    step, outcome, notes = entry.decision
+    return {
+        "type": "decision",
+        "session": session,
+        "timestamp": entry.recorded_at,
+        "step": step,
+        "outcome": outcome,
+        "notes": notes,
+    }
+
+
+def verdict_event(session, assessment, key):
+    return {
+        "type": "verdict",
+        "session": session,
+        "timestamp": time.time(),
+        "ruleset_version": RULESET_VERSION,
+        "verdict": assessment["result"],
+        "answers_key": key,
+        "answers": assessment["answers"],
+    }
+
+
+# -------- Writer
+class AuditLog:
+    # Appends audit events (dicts with a float ``timestamp``) to JSON lines
+    # files from a background thread. record() never blocks or touches the
+    # disk: events go through a queue of ``queue_size``, and when it is full
+    # they are counted as dropped and the gap is written to the log as a
+    # "dropped" event once the writer catches up. The writer takes up to
+    # ``batch_size`` events per write, fsyncs at most every ``fsync_interval``
+    # seconds and on close(), and starts a new file after ``max_bytes``. Each
+    # process writes its own files.
+
+    def __init__(
+        self,
+        directory,
+        batch_size=BATCH_SIZE,
+        fsync_interval=FSYNC_INTERVAL,
+        max_bytes=MAX_BYTES,
+        queue_size=QUEUE_SIZE,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.batch_size = batch_size
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.queue_size = queue_size
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.rotations = 0
+        self.max_depth = 0
+        self.last_error = None
+        self._unreported = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(queue_size)
+        self._file = None
+        self._size = 0
+        self._sequence = 0
+        self._thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+        self._thread.start()
+
+    def record(self, event):
+        if not self._closed:
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                pass
+            else:
+                depth = self._queue.qsize()
+                with self._lock:
+                    self.enqueued += 1
+                    if depth > self.max_depth:
+                        self.max_depth = depth
+                return True
+        with self._lock:
+            self.dropped += 1
+            self._unreported += 1
+        return False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "fsyncs": self.fsyncs,
+                "rotations": self.rotations,
+                "depth": self._queue.qsize(),
+                "max_depth": self.max_depth,
+                "queue_size": self.queue_size,
+            }
+
+    def close(self, timeout=None):
+        # Writes and fsyncs everything recorded before the call.
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # -------- Writer thread
+    def _run(self):
+        last_sync = time.monotonic()
+        unsynced = False
+        stopping = False
+        while not stopping:
+            try:
+                event = self._queue.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                event = None
+            batch = []
+            while event is not None:
+                if event is _STOP:
+                    stopping = True
+                    break
+                batch.append(event)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    event = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            with self._lock:
+                gap, self._unreported = self._unreported, 0
+            if gap:
+                batch.append({"type": "dropped", "timestamp": time.time(), "count": gap})
+            if batch:
+                try:
+                    written = self._write(batch, gap)
+                except Exception as exc:  # the writer must outlive any one batch
+                    self._lost(len(batch) - bool(gap), exc)
+                    written = False
+                if written:
+                    unsynced = True
+                elif gap:
+                    # Reported again with the next batch.
+                    with self._lock:
+                        self._unreported += gap
+            if unsynced and (stopping or time.monotonic() - last_sync >= self.fsync_interval):
+                try:
+                    self._sync()
+                except Exception as exc:
+                    self.last_error = repr(exc)
+                unsynced = False
+                last_sync = time.monotonic()
+        if self._file is not None:
+            self._file.close()
+
+    def _write(self, batch, gap=0):
+        # ``batch`` ends with the "dropped" event for ``gap`` when there is one;
+        # it is not itself counted as lost if the write fails.
+        lines = []
+        for event in batch:
+            try:
+                event["timestamp"] = _isoformat(event["timestamp"])
+                lines.append(encode_json(event, compact=True) + b"\n")
+            except (KeyError, TypeError, ValueError) as exc:
+                self._lost(1, exc)
+        if not lines:
+            return False
+        data = b"".join(lines)
+        try:
+            if self._file is None or (self._size and self._size + len(data) > self.max_bytes):
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+        except OSError as exc:
+            self._lost(len(lines) - bool(gap), exc)
+            return False
+        self._size += len(data)
+        with self._lock:
+            self.written += len(lines)
+            self.batches += 1
+        return True
+
+    def _lost(self, count, exc):
+        # Reported in the log as a "dropped" event once it is writable again.
+        with self._lock:
+            self.last_error = repr(exc)
+            self.dropped += count
+            self._unreported += count
+
+    def _sync(self):
+        # No file when the last rotation failed to open the next one.
+        if self._file is None:
+            return
+        try:
+            os.fsync(self._file.fileno())
+        except OSError as exc:
+            self.last_error = str(exc)
+            return
+        with self._lock:
+            self.fsyncs += 1
+
+    def _rotate(self):
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+            self.rotations += 1
+        self._sequence += 1
+        started = dt.datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        name = f"audit-{started}-{os.getpid()}-{self._sequence:04d}.jsonl"
+        self._file = open(os.path.join(self.directory, name), "ab")
+        self._size = 0
@@ -0,0 +1,98 @@
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from audit import BATCH_SIZE, FSYNC_INTERVAL, QUEUE_SIZE, AuditLog  # noqa: E402
+from exports import encode_json  # noqa: E402
+
+NOTES = ("The system relies on supervised learning.", "Outputs influence decisions.")
+
+
+def event(index):
+    return {
+        "type": "decision",
+        "session": f"{index % 1000:032x}",
+        "timestamp": time.time(),
+        "step": "Step 2 — AI techniques",
+        "outcome": "AI techniques identified",
+        "notes": NOTES,
+    }
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return {p: ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))] * 1e6 for p in (50, 99, 99.9)}
+
+
+def bench_sync(events, directory):
+    # What record() replaces: an append and fsync on the script thread.
+    samples = []
+    with open(os.path.join(directory, "sync.jsonl"), "ab") as stream:
+        for index in range(events):
+            started = time.perf_counter()
+            stream.write(encode_json(event(index), compact=True) + b"\n")
+            stream.flush()
+            os.fsync(stream.fileno())
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_async(events, threads, directory, args):
+    log = AuditLog(directory, args.batch_size, args.fsync_interval, queue_size=args.queue_size)
+    samples = [[] for _ in range(threads)]
+
+    def script_thread(number):
+        for index in range(number, events, threads):
+            started = time.perf_counter()
+            log.record(event(index))
+            samples[number].append(time.perf_counter() - started)
+            if args.rate:
+                time.sleep(threads / args.rate)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=script_thread, args=(number,)) for number in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    log.close()
+    elapsed = time.perf_counter() - started
+    return [sample for thread in samples for sample in thread], log.stats(), elapsed
+
+
+# -------- Entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare audit-log record() latency with synchronous fsynced writes.")
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8, help="concurrent script threads")
+    parser.add_argument("--rate", type=float, default=0, help="events/sec over all threads (0 = as fast as possible)")
+    parser.add_argument("--sync-events", type=int, default=500, help="events for the synchronous baseline")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--fsync-interval", type=float, default=FSYNC_INTERVAL)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        sync = bench_sync(args.sync_events, directory)
+        samples, stats, elapsed = bench_async(args.events, args.threads, directory, args)
+
+    print(f"{'writer':24} {'p50 µs':>9} {'p99 µs':>9} {'p99.9 µs':>9}")
+    for name, values in [("sync append + fsync", sync), ("AuditLog.record", samples)]:
+        row = percentiles(values)
+        print(f"{name:24} {row[50]:>9.1f} {row[99]:>9.1f} {row[99.9]:>9.1f}")
+    print(
+        f"\n{stats['written']:,} events written in {stats['batches']} batches and {stats['fsyncs']} fsyncs"
+        f" ({stats['written'] / elapsed:,.0f}/s, mean batch {stats['written'] / max(1, stats['batches']):.0f});"
+        f" queue peak {stats['max_depth']}/{stats['queue_size']}, {stats['dropped']} dropped"
+    )
+
+
+if __name__ == "__main__":
+    main()
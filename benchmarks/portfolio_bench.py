@@ -0,0 +1,146 @@
+import argparse
+import datetime as dt
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from classifier import RULESET_VERSION, WIZARD_ANSWERS, canonical, decode, encode, evaluate_mask  # noqa: E402
+from portfolio import PortfolioReport, section_lines, write_report  # noqa: E402
+from store import AssessmentStore  # noqa: E402
+
+START = dt.datetime(2026, 7, 1)
+
+
+def portfolio(count, seed):
+    # Finished assessments of ``count`` systems with random answers, as the
+    # store returns them.
+    rng = random.Random(seed)
+    systems = []
+    while len(systems) < count:
+        mask = canonical(rng.getrandbits(29) & WIZARD_ANSWERS)
+        result = evaluate_mask(mask)
+        if result.verdict is None:
+            continue
+        recorded = START + dt.timedelta(seconds=rng.randrange(90 * 86400))
+        systems.append(
+            {
+                "id": len(systems) + 1,
+                "system": f"System {len(systems) + 1:05d}",
+                "recorded_at": recorded.isoformat() + "Z",
+                "ruleset_version": RULESET_VERSION,
+                "result": result.verdict,
+                "rationale": list(result.rationale),
+                "answers": decode(mask, result.stage),
+                "decision_log": [
+                    {
+                        "timestamp": (recorded - dt.timedelta(minutes=len(result.decision_log) - index)).isoformat() + "Z",
+                        "step": step,
+                        "outcome": outcome,
+                        "notes": list(notes),
+                    }
+                    for index, (step, outcome, notes) in enumerate(result.decision_log)
+                ],
+            }
+        )
+    return systems
+
+
+def bench(name, render, systems, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = render(systems)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{name:34} {len(systems) / best:>12,.0f} {size / best / 1e6:>8.1f} {best * 1000:>9.1f}")
+
+
+def per_line(systems):
+    # Rendering each section line by line, with the counts the summary needs.
+    masks = Counter()
+    size = 0
+    for assessment in systems:
+        masks[assessment.get("ruleset_version"), encode(assessment["answers"]), assessment["result"]] += 1
+        size += len("\n".join(section_lines(assessment)).encode("utf-8"))
+    return size
+
+
+def templated(systems):
+    report = PortfolioReport("Benchmark")
+    return sum(len(report.section(assessment).encode("utf-8")) for assessment in systems)
+
+
+def full_report(systems):
+    buffer = io.BytesIO()
+    write_report(systems, buffer, "Benchmark")
+    return buffer.tell()
+
+
+class Sink:
+    # Counts the report's bytes without keeping them.
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+
+
+def report_from(store, raw):
+    sink = Sink()
+    write_report(store.query_raw() if raw else store.query(), sink, "Benchmark", raw=raw)
+    return sink.size
+
+
+# -------- Entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure portfolio report throughput.")
+    parser.add_argument("--systems", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5, help="best of this many runs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    systems = portfolio(args.systems, args.seed)
+    report = PortfolioReport("Benchmark")
+    for assessment in systems:
+        if report.section(assessment) != "\n".join(section_lines(assessment)):
+            raise SystemExit(f"Template output differs from section_lines() for {assessment['system']}")
+
+    print(f"{args.systems:,} systems, {len(report.keys):,} distinct answer sets\n")
+    print(f"{'renderer':34} {'systems/s':>12} {'MB/s':>8} {'total ms':>9}")
+    bench("section_lines + summary counts", per_line, systems, args.repeat)
+    bench("PortfolioReport.section", templated, systems, args.repeat)
+    bench("write_report (summary first)", full_report, systems, args.repeat)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "portfolio.sqlite3")
+        with AssessmentStore(path) as store:
+            for assessment in systems:
+                store.add(assessment, recorded_at=assessment["recorded_at"])
+        with AssessmentStore(path) as store:
+            report = PortfolioReport("Benchmark")
+            for assessment, row in zip(store.query(), store.query_raw()):
+                if report.row_section(row) != "\n".join(section_lines(assessment)):
+                    raise SystemExit(f"Stored row {row[0]} renders differently from section_lines()")
+
+            print(f"\n{'from the store':34} {'systems/s':>12} {'MB/s':>8} {'total ms':>9}")
+            bench("query() + write_report", lambda _: report_from(store, False), systems, args.repeat)
+            bench("query_raw() + write_report", lambda _: report_from(store, True), systems, args.repeat)
+
+            tracemalloc.start()
+            report_from(store, True)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    print(f"\nPeak allocations while reporting from the store: {peak / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
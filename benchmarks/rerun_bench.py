@@ -0,0 +1,259 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "streamlit_app.py"
+sys.path.insert(0, str(ROOT))
+
+from classifier import CONDITION_LABELS, encode, to_token  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "rerun_baseline.json"
+
+CONDITIONS = [
+    "The model plays a supporting role only",
+    "The model is fixed after deployment",
+    "The model does not influence or redefine the system’s objectives",
+    "The outputs are narrowly scoped",
+    "Performance metric is computational efficiency",
+]
+KNOWLEDGE = "Do you know if the solution use AI Models?"
+STEP1_NONE = ("checkbox", "None applies")
+STEP2_UNABLE = ("checkbox", "step2_unable_to_verify")
+
+# Each path is the sequence of widget changes a user makes to reach one
+# terminal outcome of the wizard.
+PATHS = {
+    "step1_exclusion": [("checkbox", "Basic data processing tools")],
+    "step2_unable_yes": [STEP1_NONE, STEP2_UNABLE, ("radio", KNOWLEDGE, "Yes it use an AI Model")],
+    "step2_unable_no": [STEP1_NONE, STEP2_UNABLE, ("radio", KNOWLEDGE, "No it does not")],
+    "step2_unable_not_sure": [STEP1_NONE, STEP2_UNABLE, ("radio", KNOWLEDGE, "I am not sure"), ("checkbox", "g_none")],
+    "step2_generation_indicators": [
+        STEP1_NONE,
+        STEP2_UNABLE,
+        ("radio", KNOWLEDGE, "I am not sure"),
+        ("checkbox", "g_content"),
+        ("checkbox", "g_decisions"),
+    ],
+    "step2_none_selected": [STEP1_NONE, ("checkbox", "No, None of these techniques was used")],
+    "step3_not_claimed": [STEP1_NONE, ("checkbox", "Yes, using Machine Learning techniques")],
+    "step3_partial_conditions": [
+        STEP1_NONE,
+        ("checkbox", "Yes, using Logic‑ and Knowledge‑Based Techniques"),
+        ("radio", "Optimization-only usage?", "Yes"),
+        ("checkbox", CONDITIONS[0]),
+        ("checkbox", CONDITIONS[1]),
+    ],
+    "step3_all_conditions": [
+        STEP1_NONE,
+        ("checkbox", "Yes, using Machine Learning techniques"),
+        ("radio", "Optimization-only usage?", "Yes"),
+    ]
+    + [("checkbox", label) for label in CONDITIONS],
+}
+
+# Opening a shared link (``?a=<token>``) to the end of a path, which should
+# take a single run however many answers the link holds.
+SHARED_LINKS = {
+    "shared_link_all_conditions": {
+        "non_ai_categories": {"none_applies": True},
+        "ai_techniques": {"ml_selected": True},
+        "optimization_only": True,
+        "optimization_conditions": {key: True for key in CONDITION_LABELS},
+    },
+}
+
+
+def _widget(at, kind, ident):
+    widgets = at.checkbox if kind == "checkbox" else at.radio
+    for widget in widgets:
+        if widget.key == ident or widget.label == ident:
+            return widget
+    raise LookupError(f"No {kind} {ident!r} on the page")
+
+
+def _answers_form(at, action):
+    # The form ``action``'s widget is in, or "" when it is not on the page yet
+    # (it appears once the current form is submitted).
+    try:
+        return _widget(at, action[0], action[1]).form_id
+    except LookupError:
+        return ""
+
+
+def _submit(at, form_id):
+    for button in at.button:
+        if button.form_id == form_id:
+            button.click()
+            return
+    raise LookupError(f"No submit button in form {form_id!r}")
+
+
+def _count_nodes(node):
+    children = getattr(node, "children", None) or {}
+    return 1 + sum(_count_nodes(child) for child in children.values())
+
+
+def _timed_run(at, trace_allocations):
+    if trace_allocations:
+        tracemalloc.start()
+    started = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - started
+    peak = 0
+    if trace_allocations:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    if at.exception:
+        raise RuntimeError(f"App raised during benchmark: {at.exception[0].value}")
+    return elapsed, peak
+
+
+def bench_path(actions, trace_allocations=False, query=None):
+    # Loads the app and replays ``actions``, returning the time of each run
+    # (the initial load first). AppTest re-executes the whole script on every
+    # interaction, fragments included, so each rerun here is a full-script
+    # rerun rather than the fragment-scoped rerun a browser session gets.
+    # tracemalloc slows every allocation down, so wall time and allocations
+    # are measured on separate passes.
+    at = AppTest.from_file(str(APP), default_timeout=30)
+    at.query_params.update(query or {})
+    samples = [_timed_run(at, trace_allocations)]
+    for index, action in enumerate(actions):
+        widget = _widget(at, action[0], action[1])
+        widget.set_value(action[2] if len(action) > 2 else True)
+        if widget.form_id:
+            # Batched steps: the form is submitted with its last answer.
+            if index + 1 < len(actions) and _answers_form(at, actions[index + 1]) == widget.form_id:
+                continue
+            _submit(at, widget.form_id)
+        samples.append(_timed_run(at, trace_allocations))
+    return {
+        "timings": [elapsed * 1000 for elapsed, _ in samples],
+        "peak_alloc_kb": max(peak for _, peak in samples) / 1024,
+        "deltas": _count_nodes(at._tree) - 1,
+    }
+
+
+def run_suite(repeat):
+    # Warm-up: the first AppTest run in a process pays one-off import costs.
+    bench_path([])
+    results = {}
+    runs = [(name, actions, None) for name, actions in PATHS.items()]
+    runs += [(name, [], {"a": to_token(encode(answers))}) for name, answers in SHARED_LINKS.items()]
+    runs += [(f"{name}_batched", actions, {"batched": "1"}) for name, actions in PATHS.items()]
+    for name, actions, query in runs:
+        samples = [bench_path(actions, query=query) for _ in range(repeat)]
+        allocations = bench_path(actions, trace_allocations=True, query=query)
+        # The fastest of the ``repeat`` timings of each run, so a GC pause or
+        # a busy machine in one pass does not move the result. The initial
+        # load is reported on its own and kept out of the rerun figures.
+        fastest = [min(timings) for timings in zip(*(sample["timings"] for sample in samples))]
+        load, reruns = fastest[0], fastest[1:]
+        results[name] = {
+            "reruns": len(fastest),
+            "deltas": samples[0]["deltas"],
+            "load_ms": round(load, 3),
+            "median_ms": round(statistics.median(reruns), 3) if reruns else None,
+            "max_ms": round(max(reruns), 3) if reruns else None,
+            "peak_alloc_kb": round(allocations["peak_alloc_kb"], 1),
+        }
+    return results
+
+
+def _exceeds(current, expected, tolerance, floor):
+    # A regression must clear both the relative tolerance and the absolute
+    # floor, so small figures do not fail on noise.
+    if current is None or expected is None:
+        return False
+    return current > max(expected * (1 + tolerance), expected + floor)
+
+
+def compare(results, baseline, time_tolerance, time_floor, alloc_tolerance, alloc_floor):
+    failures = []
+    for name, current in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if current["deltas"] > expected["deltas"]:
+            failures.append(f"{name}: deltas {current['deltas']} > baseline {expected['deltas']}")
+        if current["reruns"] > expected["reruns"]:
+            failures.append(f"{name}: reruns {current['reruns']} > baseline {expected['reruns']}")
+        for key, label in (("load_ms", "initial load"), ("median_ms", "median rerun")):
+            if _exceeds(current[key], expected.get(key), time_tolerance, time_floor):
+                failures.append(
+                    f"{name}: {label} {current[key]:.2f} ms > baseline {expected[key]:.2f} ms"
+                    f" (+{time_tolerance:.0%}, at least +{time_floor:g} ms)"
+                )
+        if _exceeds(current["peak_alloc_kb"], expected["peak_alloc_kb"], alloc_tolerance, alloc_floor):
+            failures.append(
+                f"{name}: peak allocations {current['peak_alloc_kb']:.0f} KiB > baseline"
+                f" {expected['peak_alloc_kb']:.0f} KiB (+{alloc_tolerance:.0%}, at least +{alloc_floor:g} KiB)"
+            )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark streamlit_app.py reruns along every wizard path.")
+    parser.add_argument("--repeat", type=int, default=5, help="passes per path; the fastest time of each run is kept")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="allowed median slowdown (0.5 = +50%%)")
+    parser.add_argument("--time-floor", type=float, default=10.0, help="slowdown in ms always allowed")
+    parser.add_argument("--alloc-tolerance", type=float, default=0.25, help="allowed peak allocation growth")
+    parser.add_argument("--alloc-floor", type=float, default=128.0, help="peak allocation growth in KiB always allowed")
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    # Keep benchmark assessments and audit events out of the real files.
+    scratch = tempfile.mkdtemp()
+    os.environ["ASSESSMENT_DB"] = os.path.join(scratch, "bench.sqlite3")
+    os.environ["AUDIT_LOG_DIR"] = os.path.join(scratch, "audit_logs")
+
+    results = run_suite(args.repeat)
+    print(f"{'path':36} {'reruns':>6} {'deltas':>6} {'load ms':>8} {'median ms':>10} {'max ms':>8} {'peak KiB':>9}")
+    for name, row in results.items():
+        median = "-" if row["median_ms"] is None else f"{row['median_ms']:.2f}"
+        slowest = "-" if row["max_ms"] is None else f"{row['max_ms']:.2f}"
+        print(
+            f"{name:36} {row['reruns']:>6} {row['deltas']:>6} {row['load_ms']:>8.2f} {median:>10}"
+            f" {slowest:>8} {row['peak_alloc_kb']:>9.0f}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+        return 0
+
+    failures = compare(
+        results,
+        json.loads(args.baseline.read_text()),
+        args.time_tolerance,
+        args.time_floor,
+        args.alloc_tolerance,
+        args.alloc_floor,
+    )
+    if failures:
+        print("\nREGRESSIONS:", file=sys.stderr)
+        for failure in failures:
+            print(f"  {failure}", file=sys.stderr)
+        return 1
+    print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import exports  # noqa: E402
+from classifier import ML_TECHNIQUES, evaluate  # noqa: E402
+from exports import assessment_payload, encode_json, markdown_lines, render_markdown  # noqa: E402
+
+TIMESTAMP = "2026-01-01T00:00:00.000000Z"
+
+
+def assessment(entries):
+    # A finished assessment whose decision log is padded to ``entries`` lines
+    # by repeating its steps, as after many revisions of the answers.
+    answers = {
+        "non_ai_categories": {"none_applies": True},
+        "ai_techniques": {"ml_selected": True, "ml_techniques": list(ML_TECHNIQUES)},
+        "optimization_only": True,
+        "optimization_conditions": {"supporting_role_only": True, "fixed_after_deployment": True},
+    }
+    result = evaluate(answers)
+    log = [
+        {"timestamp": TIMESTAMP, "step": step, "outcome": outcome, "notes": list(notes)}
+        for step, outcome, notes in result.decision_log
+    ]
+    return {
+        "result": result.verdict,
+        "rationale": list(result.rationale),
+        "answers": answers,
+        "decision_log": [log[index % len(log)] for index in range(entries)],
+    }
+
+
+def stdlib_fallback(compact):
+    def encode(value):
+        fast, exports.orjson = exports.orjson, None
+        try:
+            return encode_json(value, compact)
+        finally:
+            exports.orjson = fast
+
+    return encode
+
+
+def throughput(func, value, seconds):
+    # Calls per second and output MB per second over roughly ``seconds``.
+    size = len(func(value))
+    calls, started = 0, time.perf_counter()
+    while True:
+        for _ in range(10):
+            func(value)
+        calls += 10
+        elapsed = time.perf_counter() - started
+        if elapsed >= seconds:
+            return calls / elapsed, calls * size / elapsed / 1e6
+
+
+def encoders():
+    yield "json indent=2 (download)", lambda value: json.dumps(value, indent=2).encode("utf-8")
+    yield "stdlib indent=2", stdlib_fallback(compact=False)
+    yield "stdlib compact", stdlib_fallback(compact=True)
+    if exports.orjson is not None:
+        yield "orjson indent=2", lambda value: encode_json(value)
+        yield "orjson compact", lambda value: encode_json(value, compact=True)
+
+
+def renderers():
+    yield "markdown_lines join", lambda value: "\n".join(markdown_lines(value)).encode("utf-8")
+    yield "render_markdown", lambda value: render_markdown(value).encode("utf-8")
+
+
+# -------- Entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare JSON encoders and Markdown renderers on large decision logs.")
+    parser.add_argument("--entries", type=int, nargs="+", default=[10, 100, 1000], help="decision log lengths")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time spent on each measurement")
+    args = parser.parse_args(argv)
+
+    if exports.orjson is None:
+        print("orjson is not installed; only the stdlib fallback is measured.\n")
+    for entries in args.entries:
+        value = assessment(entries)
+        payload = assessment_payload(value, TIMESTAMP)
+        # Every fast path must produce exactly what the path it replaces does.
+        assert encode_json(payload) == stdlib_fallback(compact=False)(payload)
+        assert encode_json(payload, compact=True) == stdlib_fallback(compact=True)(payload)
+        assert json.loads(encode_json(payload)) == payload
+        assert render_markdown(value) == "\n".join(markdown_lines(value))
+
+        print(f"{entries:,} decision log entries")
+        for name, func, subject in [
+            *((name, func, payload) for name, func in encoders()),
+            *((name, func, value) for name, func in renderers()),
+        ]:
+            rate, megabytes = throughput(func, subject, args.seconds)
+            print(f"  {name:26} {rate:>10,.0f}/s {megabytes:>8.1f} MB/s")
+        print()
+
+
+if __name__ == "__main__":
+    main()
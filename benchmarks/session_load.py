@@ -0,0 +1,321 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.asyncio.client import connect
+from websockets.exceptions import WebSocketException
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "streamlit_app.py"
+sys.path.insert(0, str(ROOT))
+
+import traces  # noqa: E402
+from sessions import CHECKPOINT_INTERVAL  # noqa: E402
+
+WIDGET_KINDS = ("checkbox", "radio", "multiselect")
+RERUN_FOLLOWS = ForwardMsg.FINISHED_EARLY_FOR_RERUN
+
+
+# -------- Client
+class Client:
+    # One browser tab on the app's websocket. It keeps the wizard widgets the
+    # runs so far have rendered and sends a widget change the way the
+    # frontend does: every changed widget's state, scoped to the fragment
+    # that rendered the widget.
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.page = ""
+        self.widgets = {}
+        self.states = {}
+        self.errors = 0
+
+    async def rerun(self, fragment=""):
+        # Seconds until the run the message starts, and any run it triggers
+        # with st.rerun(), has finished.
+        message = BackMsg()
+        message.rerun_script.page_script_hash = self.page
+        message.rerun_script.fragment_id = fragment
+        message.rerun_script.widget_states.widgets.extend(self.states.values())
+        started = time.perf_counter()
+        await self.ws.send(message.SerializeToString())
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.ws.recv())
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                self.page = forward.new_session.page_script_hash
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                self._element(forward.delta.new_element, forward.delta.fragment_id)
+            elif kind == "script_finished" and forward.script_finished != RERUN_FOLLOWS:
+                return time.perf_counter() - started
+
+    def _element(self, element, fragment):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.errors += 1
+        elif kind in WIDGET_KINDS:
+            ident = getattr(element, kind).id
+            key = ident.split("-", 2)[-1]  # "$$ID-<hash>-<key>"
+            if key.startswith(traces.WIDGET_PREFIXES):
+                self.widgets[key] = (ident, kind, fragment)
+
+    def change(self, key, value):
+        # The fragment to rerun, or None when the page does not show ``key``.
+        if key not in self.widgets:
+            return None
+        ident, kind, fragment = self.widgets[key]
+        state = WidgetState(id=ident)
+        if kind == "multiselect":
+            state.string_array_value.data.extend(value)
+        elif kind == "radio":
+            if value is not None:
+                state.string_value = value
+        else:
+            state.bool_value = bool(value)
+        self.states[ident] = state
+        return fragment
+
+
+# -------- Sessions
+def _new_counts():
+    return {"loads": [], "reruns": [], "traces": 0, "skipped": 0, "errors": 0, "failed": 0}
+
+
+async def replay(url, trace, deadline, options, counts):
+    async with connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=options["timeout"]) as ws:
+        client = Client(ws)
+        counts["loads"].append(await asyncio.wait_for(client.rerun(), options["timeout"]))
+        previous = 0.0
+        for t, key, value in trace:
+            await asyncio.sleep(min(options["max_think"], max(0.0, t - previous) * options["think_scale"]))
+            previous = t
+            if time.monotonic() >= deadline:
+                break
+            fragment = client.change(key, value)
+            if fragment is None:
+                counts["skipped"] += 1
+                continue
+            counts["reruns"].append(await asyncio.wait_for(client.rerun(fragment), options["timeout"]))
+        else:
+            counts["traces"] += 1
+        counts["errors"] += client.errors
+
+
+async def session(url, trace_list, deadline, options, counts, rng):
+    # Replays traces one after another, each in a new browser session, until
+    # ``deadline``; sessions start spread over the ramp-up period.
+    await asyncio.sleep(rng.uniform(0, options["ramp"]))
+    while time.monotonic() < deadline:
+        try:
+            await replay(url, rng.choice(trace_list), deadline, options, counts)
+        except (OSError, asyncio.TimeoutError, WebSocketException):
+            counts["failed"] += 1
+            await asyncio.sleep(1)
+
+
+def _run_sessions(url, trace_list, sessions, duration, options, seed):
+    # One client process. time.monotonic() is system-wide, so the deadline is
+    # taken here rather than passed in.
+    async def run():
+        deadline = time.monotonic() + options["ramp"] + duration
+        rng = random.Random(seed)
+        counts = _new_counts()
+        await asyncio.gather(
+            *(session(url, trace_list, deadline, options, counts, random.Random(rng.random())) for _ in range(sessions))
+        )
+        return counts
+
+    return asyncio.run(run())
+
+
+def run_load(url, trace_list, sessions, processes, duration, options, seed):
+    processes = max(1, min(processes, sessions))
+    shares = [sessions // processes + (index < sessions % processes) for index in range(processes)]
+    counts = _new_counts()
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [
+            pool.submit(_run_sessions, url, trace_list, share, duration, options, seed * 1000 + index)
+            for index, share in enumerate(shares)
+        ]
+        for future in futures:
+            for name, value in future.result().items():
+                counts[name] += value
+    counts["elapsed"] = time.perf_counter() - started
+    return counts
+
+
+# -------- Server
+def start_server(port, directory):
+    # The app with its stores in ``directory``; sessions are checkpointed to a
+    # SQLite session store so their serialized size can be read back.
+    env = dict(
+        os.environ,
+        ASSESSMENT_DB=os.path.join(directory, "assessments.sqlite3"),
+        AUDIT_LOG_DIR=os.path.join(directory, "audit_logs"),
+        SESSION_STORE=os.path.join(directory, "sessions.sqlite3"),
+    )
+    command = [sys.executable, "-m", "streamlit", "run", str(APP), "--server.headless=true", f"--server.port={port}"]
+    command.append("--browser.gatherUsageStats=false")
+    log = open(os.path.join(directory, "server.log"), "wb")
+    server = subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT, cwd=directory)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return server, env["SESSION_STORE"]
+        except OSError:
+            if server.poll() is not None:
+                break
+            time.sleep(0.25)
+    server.kill()
+    raise RuntimeError(f"The app did not start; see {log.name}")
+
+
+def rss_kib(pid):
+    try:
+        with open(f"/proc/{pid}/status") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def state_sizes(path):
+    # (sessions, mean bytes, max bytes) of the checkpointed session states.
+    if not path or not os.path.exists(path):
+        return None
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT count(*), avg(length(state)), max(length(state)) FROM sessions").fetchone()
+
+
+# -------- Report
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))] * 1000 if ordered else float("nan")
+
+
+def summarise(sessions, processes, counts, rss_before, rss_after, sizes):
+    return {
+        "sessions": sessions,
+        "processes": processes,
+        "traces": counts["traces"],
+        "reruns": len(counts["reruns"]),
+        "reruns_per_s": len(counts["reruns"]) / counts["elapsed"],
+        **{f"p{p}_ms": percentile(counts["reruns"], p) for p in (50, 95, 99)},
+        "load_p50_ms": percentile(counts["loads"], 50),
+        "skipped": counts["skipped"],
+        "errors": counts["errors"],
+        "failed": counts["failed"],
+        "rss_mib": rss_after / 1024 if rss_after else None,
+        "rss_growth_mib": (rss_after - rss_before) / 1024 if rss_after and rss_before else None,
+        "stored_sessions": sizes[0] if sizes else None,
+        "state_bytes_mean": sizes[1] if sizes else None,
+        "state_bytes_max": sizes[2] if sizes else None,
+    }
+
+
+def _cell(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+
+def print_table(rows):
+    print(
+        f"{'sessions':>8} {'procs':>5} {'traces':>6} {'reruns':>7} {'reruns/s':>8} {'p50 ms':>7} {'p95 ms':>7}"
+        f" {'p99 ms':>7} {'load ms':>7} {'failed':>6} {'RSS MiB':>8} {'+MiB':>6} {'state B':>8}"
+    )
+    for row in rows:
+        print(
+            f"{row['sessions']:>8} {row['processes']:>5} {row['traces']:>6} {row['reruns']:>7}"
+            f" {row['reruns_per_s']:>8.1f} {row['p50_ms']:>7.1f} {row['p95_ms']:>7.1f} {row['p99_ms']:>7.1f}"
+            f" {row['load_p50_ms']:>7.1f} {row['failed']:>6} {_cell(row['rss_mib'], '>8.1f')}"
+            f" {_cell(row['rss_growth_mib'], '>+6.1f')} {_cell(row['state_bytes_mean'], '>8.0f')}"
+        )
+    skipped = sum(row["skipped"] for row in rows)
+    errors = sum(row["errors"] for row in rows)
+    if skipped or errors:
+        print(f"\n{skipped} trace steps skipped (widget not on the page), {errors} runs raised in the app")
+
+
+# -------- Entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replay wizard interaction traces as concurrent browser sessions against the app."
+    )
+    parser.add_argument("--traces", help="traces recorded with APP_RECORD_TRACE (default: synthetic traces)")
+    parser.add_argument("--synthetic", type=int, default=200, help="synthetic traces to generate")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10, 50, 100], help="concurrent sessions per step")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="client processes")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per step, after the ramp-up")
+    parser.add_argument("--ramp", type=float, default=5, help="seconds over which sessions start")
+    parser.add_argument("--think-scale", type=float, default=1.0, help="multiplier for the recorded pauses")
+    parser.add_argument("--max-think", type=float, default=5.0, help="longest pause between two changes")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for a run")
+    parser.add_argument("--url", help="app to load, e.g. http://host:8501 (default: start one)")
+    parser.add_argument("--server-pid", type=int, help="with --url, the app process to read RSS from")
+    parser.add_argument("--session-store", help="with --url, the app's SESSION_STORE to read state sizes from")
+    parser.add_argument("--port", type=int, default=8599, help="port for the started app")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results here")
+    args = parser.parse_args(argv)
+
+    trace_list = list((traces.load(args.traces) if args.traces else traces.synthetic(args.synthetic, args.seed)).values())
+    trace_list = [trace for trace in trace_list if trace]
+    if not trace_list:
+        parser.error(f"{args.traces} holds no widget changes")
+    options = {
+        "ramp": args.ramp,
+        "think_scale": args.think_scale,
+        "max_think": args.max_think,
+        "timeout": args.timeout,
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = None
+        pid, store = args.server_pid, args.session_store
+        if args.url:
+            base = args.url.rstrip("/")
+        else:
+            server, store = start_server(args.port, directory)
+            pid, base = server.pid, f"http://127.0.0.1:{args.port}"
+        url = base.replace("http", "ws", 1) + "/_stcore/stream"
+        rows = []
+        try:
+            for sessions in args.sessions:
+                before = rss_kib(pid) if pid else None
+                counts = run_load(url, trace_list, sessions, args.processes, args.duration, options, args.seed)
+                after = rss_kib(pid) if pid else None
+                if store:
+                    time.sleep(CHECKPOINT_INTERVAL + 0.5)
+                rows.append(summarise(sessions, min(args.processes, sessions), counts, before, after, state_sizes(store)))
+                print(f"{sessions} sessions: {rows[-1]['reruns']} reruns", file=sys.stderr)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(30)
+
+    print(f"{len(trace_list)} {'recorded' if args.traces else 'synthetic'} traces, {args.duration:g}s per step\n")
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(rows, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import datetime as dt
+import gc
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from classifier import STEP1_ANSWERS, STEP2_ANSWERS, STEP3_ANSWERS, decode, evaluate_mask  # noqa: E402
+from sessions import DecisionEntry, SessionRegistry  # noqa: E402
+
+WIZARD_ANSWERS = STEP1_ANSWERS | STEP2_ANSWERS | STEP3_ANSWERS
+STORED_KEY = "0" * 64
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def finished_masks(count, seed):
+    # Random answer sets that reach a verdict, like the sessions of users who
+    # finished the wizard.
+    rng = random.Random(seed)
+    masks = []
+    while len(masks) < count:
+        mask = rng.getrandbits(29) & WIZARD_ANSWERS
+        if evaluate_mask(mask).verdict is not None:
+            masks.append(mask)
+    return masks
+
+
+# -------- Session representations
+def dict_session(mask):
+    # Before: nested answer dicts, and log entries as dicts with an ISO
+    # timestamp string and a copied notes list, all in st.session_state.
+    result = evaluate_mask(mask)
+    return {
+        "answers": decode(mask),
+        "decision_log_entries": [
+            {
+                "timestamp": dt.datetime.utcnow().isoformat() + "Z",
+                "step": step,
+                "outcome": outcome,
+                "notes": list(notes),
+            }
+            for step, outcome, notes in result.decision_log
+        ],
+        "stored_assessment_key": STORED_KEY[:-1] + str(mask % 10),
+    }
+
+
+def build(representation, masks):
+    if representation == "dict":
+        return [dict_session(mask) for mask in masks]
+    registry = SessionRegistry()
+    for index, mask in enumerate(masks):
+        state = registry.create(f"{index:032x}")
+        state.answers = mask
+        state.decision_log.extend(DecisionEntry(decision) for decision in evaluate_mask(mask).decision_log)
+        state.stored_key = STORED_KEY[:-1] + str(mask % 10)
+    return registry
+
+
+def measure(representation, sessions, seed):
+    masks = finished_masks(sessions, seed)
+    gc.collect()
+    before = rss_bytes()
+    kept = build(representation, masks)
+    gc.collect()
+    after = rss_bytes()
+    assert len(kept) == sessions
+    return (after - before) / sessions
+
+
+# -------- Entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the resident memory each session's wizard state costs.")
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--representation", choices=["dict", "compact"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.representation:
+        print(measure(args.representation, args.sessions, args.seed))
+        return
+
+    # Each representation is measured in a fresh interpreter so one cannot
+    # reuse memory the other freed.
+    results = {}
+    for representation in ("dict", "compact"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--representation", representation,
+             "--sessions", str(args.sessions), "--seed", str(args.seed)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[representation] = float(output)
+
+    print(f"{args.sessions:,} finished sessions")
+    print(f"  nested dicts (before):   {results['dict']:>8,.0f} bytes RSS per session")
+    print(f"  compact records (after): {results['compact']:>8,.0f} bytes RSS per session")
+    print(f"  saved:                   {1 - results['compact'] / results['dict']:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
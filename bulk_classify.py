@@ -0,0 +1,231 @@
+import argparse
+import csv
+import functools
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from classifier import FLAGS, RULESET_VERSION, classify
+from exports import encode_json
+
+LIST_COLUMNS = {"ai_techniques.ml_techniques"}
+TEXT_COLUMNS = {"ai_techniques.ai_model_knowledge"}
+TRUE_VALUES = {"1", "true", "yes", "y", "x"}
+# Inventory fields copied from each record to its result, for portfolio.py.
+PASSTHROUGH = ("system", "business_unit")
+# Every column read into the answers; the ML techniques come from the list
+# column rather than one column per technique.
+ANSWER_COLUMNS = LIST_COLUMNS | TEXT_COLUMNS | {
+    name for name in FLAGS if not name.startswith("ai_techniques.ml_techniques.")
+}
+# Top-level keys of the answers dict, kept from JSON lines records that hold
+# the answers inline.
+ANSWER_KEYS = {column.split(".")[0] for column in ANSWER_COLUMNS}
+
+
+# -------- Input readers
+@functools.lru_cache(maxsize=None)
+def _clashes(column):
+    # A column above or below an answer column, such as ``ai_techniques``.
+    return any(path.startswith(column + ".") or column.startswith(path + ".") for path in ANSWER_COLUMNS)
+
+
+def answers_from_row(row):
+    # CSV columns are dotted paths into the answers dict, e.g.
+    # ``non_ai_categories.none_applies`` or ``ai_techniques.ml_techniques``
+    # (the latter ``;``-separated). Other columns are ignored; ValueError for
+    # a column that would overwrite part of the answers.
+    answers = {}
+    for column, value in row.items():
+        if column not in ANSWER_COLUMNS:
+            if column is not None and _clashes(column):
+                raise ValueError(f"Column {column!r} clashes with the answer columns")
+            continue
+        value = (value or "").strip()
+        if column in LIST_COLUMNS:
+            parsed = [item.strip() for item in value.split(";") if item.strip()]
+        elif column in TEXT_COLUMNS:
+            parsed = value or None
+        else:
+            parsed = value.lower() in TRUE_VALUES
+        *parents, leaf = column.split(".")
+        target = answers
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = parsed
+    return answers
+
+
+def _fields(record):
+    return {name: record[name] for name in PASSTHROUGH if record.get(name)}
+
+
+# Readers yield (id, answers or the exception that made them unreadable,
+# passthrough fields) per record.
+def iter_jsonl(stream):
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_number, exc, {}
+            continue
+        if not isinstance(record, dict):
+            yield line_number, ValueError(f"Expected a JSON object, got {type(record).__name__}"), {}
+        elif "answers" in record:
+            yield record.get("id", line_number), record["answers"], _fields(record)
+        else:
+            answers = {key: value for key, value in record.items() if key in ANSWER_KEYS}
+            yield record.get("id", line_number), answers, _fields(record)
+
+
+def _row_record(row, row_number):
+    # A row that cannot be read is reported as an error record.
+    try:
+        answers = answers_from_row(row)
+    except ValueError as exc:
+        answers = exc
+    return row.get("id") or row_number, answers, _fields(row)
+
+
+def iter_csv(stream):
+    for row_number, row in enumerate(csv.DictReader(stream), start=1):
+        yield _row_record(row, row_number)
+
+
+def iter_xlsx(stream):
+    # The first sheet of a workbook (binary ``stream``) with the CSV layout,
+    # read row by row. Only this format needs openpyxl.
+    try:
+        import openpyxl
+    except ImportError:
+        raise RuntimeError("Spreadsheet input needs openpyxl: pip install openpyxl") from None
+
+    workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(name).strip() if name is not None else None for name in next(rows, ())]
+        for row_number, values in enumerate(rows, start=1):
+            row = {column: "" if value is None else str(value) for column, value in zip(header, values)}
+            if any(row.values()):
+                yield _row_record(row, row_number)
+    finally:
+        workbook.close()
+
+
+def read_records(stream, fmt):
+    # ``stream`` is binary for xlsx and text otherwise.
+    if fmt == "csv":
+        return iter_csv(stream)
+    if fmt == "xlsx":
+        return iter_xlsx(stream)
+    return iter_jsonl(stream)
+
+
+def input_format(name):
+    suffix = os.path.splitext(name.lower())[1]
+    return {".csv": "csv", ".xlsx": "xlsx"}.get(suffix, "jsonl")
+
+
+# -------- Classification
+def classify_record(record_id, answers, fields=None):
+    # The answers are echoed back so portfolio.py can report on the results.
+    # Answers that stop short of a verdict are an error, as in api.py, marked
+    # ``incomplete`` and carrying the question still to answer.
+    fields = fields or {}
+    if isinstance(answers, Exception):
+        return {"id": record_id, **fields, "error": str(answers)}
+    if not isinstance(answers, dict):
+        return {"id": record_id, **fields, "error": f"Expected answers to be an object, got {type(answers).__name__}"}
+    try:
+        verdict, rationale, decision_log = classify(answers)
+    except (AttributeError, TypeError, ValueError) as exc:
+        return {"id": record_id, **fields, "error": str(exc)}
+    if verdict is None:
+        return {"id": record_id, **fields, "error": rationale[0], "incomplete": True}
+    return {
+        "id": record_id,
+        **fields,
+        "ruleset_version": RULESET_VERSION,
+        "result": verdict,
+        "rationale": rationale,
+        "answers": answers,
+        "decision_log": decision_log,
+    }
+
+
+def _classify_chunk(chunk):
+    return [encode_json(classify_record(*record), compact=True) for record in chunk]
+
+
+def classify_stream(records, workers, chunk_size, pool=None):
+    # ``pool`` is an executor with ``workers`` processes to share instead of
+    # starting one for this stream.
+    chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+    if pool is not None:
+        yield from _classify_chunks(chunks, pool, workers)
+    elif workers <= 1:
+        for chunk in chunks:
+            yield from _classify_chunk(chunk)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from _classify_chunks(chunks, pool, workers)
+
+
+def _classify_chunks(chunks, pool, workers):
+    # Only ``2 * workers`` chunks are ever in flight, so memory stays bounded
+    # no matter how large the inventory is; results come back in input order.
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(_classify_chunk, chunk))
+        if len(pending) >= 2 * workers:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+# -------- Entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Classify an AI inventory of answer records.")
+    parser.add_argument("input", help="JSONL, CSV or xlsx file of answer records ('-' for JSONL on stdin)")
+    parser.add_argument("-o", "--output", default="-", help="NDJSON output file (default: stdout)")
+    parser.add_argument(
+        "--format", choices=["jsonl", "csv", "xlsx"], help="input format (default: from file extension)"
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="records sent to a worker at a time")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or input_format(args.input)
+    if args.input == "-":
+        source = sys.stdin
+    elif fmt == "xlsx":
+        source = open(args.input, "rb")
+    else:
+        source = open(args.input, newline="", encoding="utf-8")
+    sink = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+
+    count = 0
+    started = time.perf_counter()
+    try:
+        for line in classify_stream(read_records(source, fmt), args.workers, args.chunk_size):
+            sink.write(line + b"\n")
+            count += 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout.buffer:
+            sink.close()
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0.0
+    print(f"Classified {count} records in {elapsed:.2f}s ({rate:,.0f} records/sec)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
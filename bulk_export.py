@@ -0,0 +1,170 @@
+import argparse
+import io
+import itertools
+import sys
+import time
+import zipfile
+
+from classifier import FLAGS, encode
+from exports import encode_json, render_markdown
+from store import AssessmentStore
+
+FORMATS = ("ndjson", "parquet", "markdown")
+KNOWLEDGE_COLUMN = "ai_techniques.ai_model_knowledge"
+PARQUET_BATCH_SIZE = 2000
+
+
+# -------- Flattening
+def flatten(assessment):
+    # One row per assessment with a boolean column per answer flag, named by
+    # its dotted path as in classifier.FLAGS, plus the AI model knowledge
+    # answer, which is the only free-text answer.
+    answers = assessment["answers"]
+    mask = encode(answers)
+    row = {
+        "id": assessment.get("id"),
+        "recorded_at": assessment.get("recorded_at"),
+        "ruleset_version": assessment.get("ruleset_version"),
+        "result": assessment["result"],
+        "rationale": list(assessment.get("rationale", [])),
+    }
+    for name, bit in FLAGS.items():
+        row[name] = bool(mask & bit)
+    row[KNOWLEDGE_COLUMN] = (answers.get("ai_techniques") or {}).get("ai_model_knowledge")
+    row["decision_log"] = [
+        {
+            "timestamp": entry["timestamp"],
+            "step": entry["step"],
+            "outcome": entry["outcome"],
+            "notes": list(entry.get("notes") or []),
+        }
+        for entry in assessment.get("decision_log", [])
+    ]
+    return row
+
+
+def parquet_schema(pa):
+    entry = pa.struct(
+        [
+            ("timestamp", pa.string()),
+            ("step", pa.string()),
+            ("outcome", pa.string()),
+            ("notes", pa.list_(pa.string())),
+        ]
+    )
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("recorded_at", pa.string()),
+            ("ruleset_version", pa.string()),
+            ("result", pa.string()),
+            ("rationale", pa.list_(pa.string())),
+            *[(name, pa.bool_()) for name in FLAGS],
+            (KNOWLEDGE_COLUMN, pa.string()),
+            ("decision_log", pa.list_(entry)),
+        ]
+    )
+
+
+# -------- Writers
+# Each writer takes any iterable of assessment dicts (store.query() or a
+# generator), consumes it once and returns the number written.
+def write_ndjson(assessments, stream):
+    count = 0
+    for assessment in assessments:
+        stream.write(encode_json(assessment, compact=True) + b"\n")
+        count += 1
+    return count
+
+
+def write_parquet(assessments, target, batch_size=PARQUET_BATCH_SIZE):
+    # pyarrow ships with Streamlit but is only needed for this format.
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow") from None
+
+    # Only one row group of ``batch_size`` rows is held at a time.
+    schema = parquet_schema(pa)
+    count = 0
+    with pq.ParquetWriter(target, schema) as writer:
+        rows = iter(assessments)
+        for batch in iter(lambda: list(itertools.islice(rows, batch_size)), []):
+            columns = {name: [] for name in schema.names}
+            for assessment in batch:
+                for name, value in flatten(assessment).items():
+                    columns[name].append(value)
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            count += len(batch)
+    return count
+
+
+def markdown_name(assessment, index):
+    assessment_id = assessment.get("id")
+    return f"assessment-{assessment_id if assessment_id is not None else index:06d}.md"
+
+
+def write_markdown_zip(assessments, target):
+    # The same layout as the single-assessment Markdown download.
+    count = 0
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as archive:
+        for count, assessment in enumerate(assessments, start=1):
+            archive.writestr(markdown_name(assessment, count), render_markdown(assessment))
+    return count
+
+
+def export(assessments, fmt, target):
+    # ``target`` is a binary stream, or a path for Parquet and zip.
+    if fmt == "ndjson":
+        return write_ndjson(assessments, target)
+    if fmt == "parquet":
+        return write_parquet(assessments, target)
+    if fmt == "markdown":
+        return write_markdown_zip(assessments, target)
+    raise ValueError(f"Unknown export format: {fmt!r}")
+
+
+def export_bytes(assessments, fmt):
+    # For downloads, which need the finished file in memory anyway.
+    buffer = io.BytesIO()
+    export(assessments, fmt, buffer)
+    return buffer.getvalue()
+
+
+# -------- Entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export stored assessments in bulk.")
+    parser.add_argument("--db", default="assessments.sqlite3", help="assessment store (default: %(default)s)")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--since", help="first recorded_at to include, e.g. 2026-07-01")
+    parser.add_argument("--until", help="recorded_at to stop before, e.g. 2026-10-01")
+    parser.add_argument("--verdict")
+    parser.add_argument("--ruleset-version")
+    parser.add_argument("--flag", action="append", default=[], help="dotted answer flag that must be set")
+    args = parser.parse_args(argv)
+
+    sink = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+
+    started = time.perf_counter()
+    with AssessmentStore(args.db) as store:
+        assessments = store.query(
+            verdict=args.verdict,
+            ruleset_version=args.ruleset_version,
+            since=args.since,
+            until=args.until,
+            flags=args.flag,
+        )
+        try:
+            count = export(assessments, args.format, sink)
+        finally:
+            if args.output != "-":
+                sink.close()
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0.0
+    print(f"Exported {count} assessments in {elapsed:.2f}s ({rate:,.0f} assessments/sec)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+import itertools
+import os
+from collections import namedtuple
+
+import ruleset
+
+# The questions, their wording and the verdict rules live in a versioned
+# ruleset file (ruleset.json by default), loaded and compiled once on import.
+RULESET_PATH = os.environ.get("CLASSIFIER_RULESET", ruleset.DEFAULT_PATH)
+RULESET = ruleset.load(RULESET_PATH)
+
+# Bump the ruleset's version whenever the questions or verdict rules change;
+# caches and stored assessments are keyed by it.
+RULESET_VERSION = RULESET["version"]
+
+# -------- Questionnaire vocabulary
+_QUESTIONS = RULESET["questions"]
+NON_AI_LABELS = {option["key"]: option["name"] for option in _QUESTIONS["non_ai_categories"]["options"]}
+ML_TECHNIQUES = tuple(_QUESTIONS["ai_techniques"]["ml_techniques"]["options"])
+AI_MODEL_KNOWLEDGE_OPTIONS = tuple(_QUESTIONS["ai_techniques"]["ai_model_knowledge"]["options"])
+GENERATION_LABELS = {
+    option["key"]: option["name"] for option in _QUESTIONS["ai_techniques"]["generation_indicators"]["options"]
+}
+CONDITION_LABELS = {option["key"]: option["name"] for option in _QUESTIONS["optimization_conditions"]["options"]}
+
+AI_SYSTEM = RULESET["verdicts"]["ai_system"]
+LIKELY_AI_SYSTEM = RULESET["verdicts"]["likely_ai_system"]
+LIKELY_NOT_AI_SYSTEM = RULESET["verdicts"]["likely_not_ai_system"]
+BORDERLINE = RULESET["verdicts"]["borderline"]
+
+SELECT_OPTION = RULESET["messages"]["select_option"]
+SELECT_GENERATION = RULESET["messages"]["select_generation"]
+GENERATION_CONFLICT = RULESET["messages"]["generation_conflict"]
+
+# A classification is either final (``verdict`` set) or stopped at ``stage``
+# waiting for more input (``verdict`` is None and ``message`` says what is
+# missing). ``decision_log`` holds ``(step, outcome, notes)`` tuples and
+# ``summary`` the Markdown bullets shown under an early verdict.
+Classification = namedtuple(
+    "Classification", ["verdict", "rationale", "decision_log", "stage", "summary", "message"]
+)
+
+# -------- Answer bitmask layout
+NONE_APPLIES = 1 << 0
+_NON_AI_BITS = tuple((1 << (1 + index), key) for index, key in enumerate(NON_AI_LABELS))
+STEP1_UNABLE = 1 << 4
+
+ML_SELECTED = 1 << 5
+LOGIC_SELECTED = 1 << 6
+NONE_SELECTED = 1 << 7
+STEP2_UNABLE = 1 << 8
+_ML_SHIFT = 9
+_ML_BITS = {name: 1 << (_ML_SHIFT + index) for index, name in enumerate(ML_TECHNIQUES)}
+_KNOWLEDGE_SHIFT = 14
+_KNOWLEDGE_CODES = {option: code for code, option in enumerate(AI_MODEL_KNOWLEDGE_OPTIONS, start=1)}
+
+_GENERATION_SHIFT = 16
+_GENERATION_BITS = tuple((1 << (_GENERATION_SHIFT + index), key) for index, key in enumerate(GENERATION_LABELS))
+GENERATION_NONE = 1 << 20
+
+OPTIMIZATION_ONLY = 1 << 21
+_CONDITION_SHIFT = 22
+_CONDITION_BITS = tuple((1 << (_CONDITION_SHIFT + index), key) for index, key in enumerate(CONDITION_LABELS))
+
+INFERS_OUTPUTS = 1 << 27
+VARYING_AUTONOMY = 1 << 28
+
+_NON_AI_MASK = sum(bit for bit, _ in _NON_AI_BITS)
+_STEP1_MASK = NONE_APPLIES | _NON_AI_MASK | STEP1_UNABLE
+_ML_MASK = sum(_ML_BITS.values())
+_KNOWLEDGE_MASK = 0b11 << _KNOWLEDGE_SHIFT
+_GENERATION_MASK = sum(bit for bit, _ in _GENERATION_BITS)
+_CONDITION_MASK = sum(bit for bit, _ in _CONDITION_BITS)
+_INFERENCE_MASK = INFERS_OUTPUTS | VARYING_AUTONOMY
+# The last AI model knowledge answer ("I am not sure") asks the generation
+# indicators follow-up.
+_NOT_SURE = len(AI_MODEL_KNOWLEDGE_OPTIONS) << _KNOWLEDGE_SHIFT
+
+# Options beyond the bits reserved for a question would overlap the next one.
+for _name, _options, _slots in (
+    ("non_ai_categories", NON_AI_LABELS, 3),
+    ("ml_techniques", ML_TECHNIQUES, 5),
+    ("ai_model_knowledge", AI_MODEL_KNOWLEDGE_OPTIONS, 3),
+    ("generation_indicators", GENERATION_LABELS, 4),
+    ("optimization_conditions", CONDITION_LABELS, 5),
+):
+    if len(_options) > _slots:
+        raise ruleset.RulesetError(f"questions: {_name} has {len(_options)} options; the answer layout holds {_slots}")
+
+# Bits answered by each wizard step, for updating one step's answers in place.
+STEP1_ANSWERS = _STEP1_MASK
+STEP2_ANSWERS = (
+    ML_SELECTED | LOGIC_SELECTED | NONE_SELECTED | STEP2_UNABLE
+    | _ML_MASK | _KNOWLEDGE_MASK | _GENERATION_MASK | GENERATION_NONE
+)
+STEP3_ANSWERS = OPTIMIZATION_ONLY | _CONDITION_MASK
+
+# Dotted answer path of every single-bit flag, for storage and reporting.
+FLAGS = {
+    "non_ai_categories.none_applies": NONE_APPLIES,
+    **{f"non_ai_categories.{key}": bit for bit, key in _NON_AI_BITS},
+    "non_ai_categories.unable_to_verify": STEP1_UNABLE,
+    "ai_techniques.ml_selected": ML_SELECTED,
+    **{f"ai_techniques.ml_techniques.{name}": bit for name, bit in _ML_BITS.items()},
+    "ai_techniques.logic_knowledge_based": LOGIC_SELECTED,
+    "ai_techniques.none_selected": NONE_SELECTED,
+    "ai_techniques.unable_to_verify": STEP2_UNABLE,
+    **{f"ai_techniques.generation_indicators.{key}": bit for bit, key in _GENERATION_BITS},
+    "ai_techniques.generation_indicators.none_applies": GENERATION_NONE,
+    "optimization_only": OPTIMIZATION_ONLY,
+    **{f"optimization_conditions.{key}": bit for bit, key in _CONDITION_BITS},
+    "inference_autonomy.infers_outputs": INFERS_OUTPUTS,
+    "inference_autonomy.varying_autonomy": VARYING_AUTONOMY,
+}
+
+
+def flag_names(mask):
+    return [name for name, bit in FLAGS.items() if mask & bit]
+
+
+def encode(answers):
+    non_ai = answers.get("non_ai_categories") or {}
+    mask = NONE_APPLIES if non_ai.get("none_applies") else 0
+    for bit, key in _NON_AI_BITS:
+        if non_ai.get(key):
+            mask |= bit
+    if non_ai.get("unable_to_verify"):
+        mask |= STEP1_UNABLE
+
+    techniques = answers.get("ai_techniques") or {}
+    if techniques.get("ml_selected"):
+        mask |= ML_SELECTED
+    if techniques.get("logic_knowledge_based"):
+        mask |= LOGIC_SELECTED
+    if techniques.get("none_selected"):
+        mask |= NONE_SELECTED
+    if techniques.get("unable_to_verify"):
+        mask |= STEP2_UNABLE
+    for name in techniques.get("ml_techniques") or ():
+        try:
+            mask |= _ML_BITS[name]
+        except KeyError:
+            raise ValueError(f"Unknown machine learning technique: {name!r}") from None
+    knowledge = techniques.get("ai_model_knowledge")
+    if knowledge is not None:
+        try:
+            mask |= _KNOWLEDGE_CODES[knowledge] << _KNOWLEDGE_SHIFT
+        except KeyError:
+            raise ValueError(f"Unknown AI model knowledge answer: {knowledge!r}") from None
+    generation = techniques.get("generation_indicators") or {}
+    for bit, key in _GENERATION_BITS:
+        if generation.get(key):
+            mask |= bit
+    if generation.get("none_applies"):
+        mask |= GENERATION_NONE
+
+    if answers.get("optimization_only"):
+        mask |= OPTIMIZATION_ONLY
+    conditions = answers.get("optimization_conditions") or {}
+    for bit, key in _CONDITION_BITS:
+        if conditions.get(key):
+            mask |= bit
+
+    inference = answers.get("inference_autonomy") or {}
+    if inference.get("infers_outputs"):
+        mask |= INFERS_OUTPUTS
+    if inference.get("varying_autonomy"):
+        mask |= VARYING_AUTONOMY
+    return mask
+
+
+def decode(mask, stage="step3"):
+    # The answers dict for ``mask``, with the sections the wizard shows up to
+    # and including ``stage``.
+    answers = {
+        "non_ai_categories": {
+            "none_applies": bool(mask & NONE_APPLIES),
+            **{key: bool(mask & bit) for bit, key in _NON_AI_BITS},
+            "unable_to_verify": bool(mask & STEP1_UNABLE),
+        }
+    }
+    if stage == "step1":
+        return answers
+
+    techniques = answers["ai_techniques"] = {
+        "ml_selected": bool(mask & ML_SELECTED),
+        "ml_techniques": [name for name, bit in _ML_BITS.items() if mask & bit],
+        "logic_knowledge_based": bool(mask & LOGIC_SELECTED),
+        "none_selected": bool(mask & NONE_SELECTED),
+        "unable_to_verify": bool(mask & STEP2_UNABLE),
+    }
+    if mask & STEP2_UNABLE:
+        code = (mask & _KNOWLEDGE_MASK) >> _KNOWLEDGE_SHIFT
+        techniques["ai_model_knowledge"] = AI_MODEL_KNOWLEDGE_OPTIONS[code - 1] if code else None
+        if mask & _KNOWLEDGE_MASK == _NOT_SURE:
+            techniques["generation_indicators"] = {
+                **{key: bool(mask & bit) for bit, key in _GENERATION_BITS},
+                "none_applies": bool(mask & GENERATION_NONE),
+            }
+    if stage in ("step2", "generation"):
+        return answers
+
+    answers["optimization_only"] = bool(mask & OPTIMIZATION_ONLY)
+    answers["optimization_conditions"] = (
+        {key: bool(mask & bit) for bit, key in _CONDITION_BITS} if mask & OPTIMIZATION_ONLY else {}
+    )
+    if mask & _INFERENCE_MASK:
+        answers["inference_autonomy"] = {
+            "infers_outputs": bool(mask & INFERS_OUTPUTS),
+            "varying_autonomy": bool(mask & VARYING_AUTONOMY),
+        }
+    return answers
+
+
+def canonical(mask):
+    # Drop every bit the decision flow never reads on this mask's path, so all
+    # answer sets that classify identically share one table key.
+    if mask & STEP1_UNABLE:
+        key = mask & (_NON_AI_MASK | STEP1_UNABLE)
+    elif mask & _NON_AI_MASK:
+        return mask & _NON_AI_MASK
+    elif mask & NONE_APPLIES:
+        key = NONE_APPLIES
+    else:
+        return 0
+
+    if mask & STEP2_UNABLE:
+        knowledge = mask & _KNOWLEDGE_MASK
+        key |= STEP2_UNABLE | knowledge
+        if knowledge == _NOT_SURE:
+            key |= mask & (_GENERATION_MASK | GENERATION_NONE)
+        return key
+    if mask & NONE_SELECTED:
+        return key | NONE_SELECTED
+    if not mask & (ML_SELECTED | LOGIC_SELECTED):
+        return key
+    key |= mask & (ML_SELECTED | LOGIC_SELECTED | OPTIMIZATION_ONLY | _INFERENCE_MASK)
+    if mask & ML_SELECTED:
+        key |= mask & _ML_MASK
+    if mask & OPTIMIZATION_ONLY:
+        key |= mask & _CONDITION_MASK
+    return key
+
+
+# -------- Share tokens
+# A wizard answer mask as a short URL-safe string: a layout version, then the
+# mask in base 36 (at most six characters). The mask already holds the ML
+# techniques as bits and the AI model knowledge answer as its option index.
+TOKEN_VERSION = "1"
+WIZARD_ANSWERS = STEP1_ANSWERS | STEP2_ANSWERS | STEP3_ANSWERS
+_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def to_token(mask):
+    if mask & ~WIZARD_ANSWERS:
+        raise ValueError(f"Answer mask {mask:#x} has bits the wizard does not ask")
+    digits = ""
+    while True:
+        mask, digit = divmod(mask, 36)
+        digits = _DIGITS[digit] + digits
+        if not mask:
+            return TOKEN_VERSION + digits
+
+
+def from_token(token):
+    version, digits = token[:1], token[1:]
+    if version != TOKEN_VERSION or not digits or digits.strip(_DIGITS):
+        raise ValueError(f"Not an answer token: {token!r}")
+    mask = int(digits, 36)
+    if mask & ~WIZARD_ANSWERS or (mask & _KNOWLEDGE_MASK) > _NOT_SURE:
+        raise ValueError(f"Answer token {token!r} does not fit this answer layout")
+    return mask
+
+
+# -------- Rule evaluation (used once per reachable key while compiling)
+_interned = {}
+
+
+def _intern(value):
+    return _interned.setdefault(value, value)
+
+
+_GROUPS = {
+    "non_ai_categories": tuple((bit, NON_AI_LABELS[key]) for bit, key in _NON_AI_BITS),
+    "ml_techniques": tuple((bit, name) for name, bit in _ML_BITS.items()),
+    "generation_indicators": tuple((bit, GENERATION_LABELS[key]) for bit, key in _GENERATION_BITS),
+    "optimization_conditions": tuple((bit, CONDITION_LABELS[key]) for bit, key in _CONDITION_BITS),
+}
+
+
+def build_machine(rules):
+    # The state machine for a ruleset dict on this answer layout, e.g. a
+    # previous or proposed version of RULESET. Its questions must be the same,
+    # or the bits would mean different answers.
+    if rules["questions"] != RULESET["questions"]:
+        raise ruleset.RulesetError("questions differ from the loaded ruleset, so the answer layouts do not match")
+    return ruleset.StateMachine(
+        rules,
+        FLAGS,
+        _GROUPS,
+        _KNOWLEDGE_MASK,
+        {None: 0, **{option: code << _KNOWLEDGE_SHIFT for option, code in _KNOWLEDGE_CODES.items()}},
+        _intern,
+    )
+
+
+_MACHINE = build_machine(RULESET)
+
+
+def _evaluate(key):
+    return Classification._make(_MACHINE.run(key))
+
+
+# -------- Decision table
+def _subsets(bits):
+    for size in range(len(bits) + 1):
+        for combo in itertools.combinations(bits, size):
+            yield sum(combo)
+
+
+def _reachable_keys():
+    non_ai = [bit for bit, _ in _NON_AI_BITS]
+    yield 0
+    yield from (key for key in _subsets(non_ai) if key)
+    step1_keys = [NONE_APPLIES] + [STEP1_UNABLE | key for key in _subsets(non_ai)]
+
+    step2_keys = [0, NONE_SELECTED]
+    step2_keys += [STEP2_UNABLE | (code << _KNOWLEDGE_SHIFT) for code in range(3)]
+    step2_keys += [
+        STEP2_UNABLE | _NOT_SURE | key
+        for key in _subsets([bit for bit, _ in _GENERATION_BITS] + [GENERATION_NONE])
+    ]
+    technique_keys = [LOGIC_SELECTED]
+    technique_keys += [ML_SELECTED | key for key in _subsets(list(_ML_BITS.values()))]
+    technique_keys += [ML_SELECTED | LOGIC_SELECTED | key for key in _subsets(list(_ML_BITS.values()))]
+    step3_keys = [0] + [OPTIMIZATION_ONLY | key for key in _subsets([bit for bit, _ in _CONDITION_BITS])]
+    step3_keys = [key | extra for key in step3_keys for extra in _subsets([INFERS_OUTPUTS, VARYING_AUTONOMY])]
+
+    for step1_key in step1_keys:
+        for step2_key in step2_keys:
+            yield step1_key | step2_key
+        for technique_key in technique_keys:
+            for step3_key in step3_keys:
+                yield step1_key | technique_key | step3_key
+
+
+def _check_projection():
+    # canonical() drops the answers a path never reads. Spot-check that on a
+    # key for each distinct outcome of every state: flipping a bit the state
+    # reads but canonical() drops must not change the result.
+    names = {bit: name for name, bit in FLAGS.items()}
+    for state, key in list(_MACHINE.visits):
+        reads = _MACHINE.states[state][3]
+        for bit in (1 << index for index in range(reads.bit_length())):
+            if reads & bit and canonical(key ^ bit) == key and _MACHINE.run(key ^ bit) != _MACHINE.run(key):
+                name = names.get(bit, "ai_techniques.ai_model_knowledge")
+                raise ruleset.RulesetError(
+                    f"states.{state}: the rules read {name}, which classifier.canonical() ignores on this path"
+                )
+
+
+def _compile():
+    table = {key: _evaluate(key) for key in _reachable_keys()}
+    unused = _MACHINE.unused()
+    if unused:
+        raise ruleset.RulesetError("no answer set reaches " + ", ".join(unused))
+    _check_projection()
+    return table
+
+
+_TABLE = _compile()
+
+
+def evaluate_mask(mask):
+    return _TABLE[canonical(mask)]
+
+
+def evaluate(answers):
+    return _TABLE[canonical(encode(answers))]
+
+
+def classify(answers):
+    result = evaluate(answers)
+    decision_log = [
+        {"step": step, "outcome": outcome, "notes": list(notes)}
+        for step, outcome, notes in result.decision_log
+    ]
+    return result.verdict, list(result.rationale), decision_log
@@ -0,0 +1,119 @@
+import datetime as dt
+
+import pandas as pd
+import streamlit as st
+
+from classifier import CONDITION_LABELS, ML_TECHNIQUES
+
+# The portfolio dashboard reads the store's daily counters (store.daily_counts),
+# which are updated as each verdict is stored, so a rerun reads a few dozen
+# rows per day of the period however many assessments the store holds.
+BUCKETS = {"Day": "D", "Week": "W", "Month": "M"}
+DEFAULT_DAYS = 90
+
+
+# -------- Aggregates
+def load_counts(store, since, until):
+    # Days from ``since`` to ``until`` inclusive (dates).
+    rows = store.daily_counts(since.isoformat(), (until + dt.timedelta(days=1)).isoformat()).fetchall()
+    return pd.DataFrame(rows, columns=["day", "name", "count"])
+
+
+def totals(counts):
+    return counts.groupby("name")["count"].sum().to_dict()
+
+
+def verdicts_over_time(counts, bucket):
+    verdicts = counts[counts["name"].str.startswith("verdict:")]
+    periods = pd.to_datetime(verdicts["day"]).dt.to_period(BUCKETS[bucket]).dt.start_time
+    table = verdicts.assign(period=periods, verdict=verdicts["name"].str.slice(len("verdict:")))
+    return table.pivot_table(index="period", columns="verdict", values="count", aggfunc="sum", fill_value=0)
+
+
+def assessments(total):
+    return sum(count for name, count in total.items() if name.startswith("verdict:"))
+
+
+def unable_to_verify(total):
+    # Shares of the assessments that answered each step.
+    reached_step2 = assessments(total) - total.get("stage:step1", 0)
+    return (
+        _share(total.get("answer:non_ai_categories.unable_to_verify", 0), assessments(total)),
+        _share(total.get("answer:ai_techniques.unable_to_verify", 0), reached_step2),
+    )
+
+
+def ml_techniques(total):
+    selected = total.get("answer:ai_techniques.ml_selected", 0)
+    rows = []
+    for name in ML_TECHNIQUES:
+        count = total.get(f"answer:ai_techniques.ml_techniques.{name}", 0)
+        rows.append((name, count, _share(count, selected)))
+    return pd.DataFrame(rows, columns=["Technique", "Systems", "Share of ML systems"])
+
+
+def carve_out_hit_rates(total):
+    # (systems claiming optimization-only usage, met count and rate per condition)
+    claimed = total.get("answer:optimization_only", 0)
+    rows = []
+    for key, label in CONDITION_LABELS.items():
+        count = total.get(f"answer:optimization_conditions.{key}", 0)
+        rows.append((label, count, _share(count, claimed)))
+    return claimed, pd.DataFrame(rows, columns=["Condition", "Met", "Hit rate"])
+
+
+def _share(count, total):
+    return count / total if total else None
+
+
+# -------- Page
+def _rate_column():
+    return st.column_config.ProgressColumn(format="percent", min_value=0, max_value=1)
+
+
+def _percent(share):
+    return f"{share:.1%}" if share is not None else "–"
+
+
+def render(store):
+    st.title("Portfolio dashboard")
+    today = dt.date.today()
+    default = (today - dt.timedelta(days=DEFAULT_DAYS - 1), today)
+    period = st.date_input("Recorded between", default, max_value=today, key="dashboard-period")
+    if len(period) != 2:
+        st.caption("Pick the last day of the period.")
+        return
+    counts = load_counts(store, *period)
+    if counts.empty:
+        st.info("No assessments were recorded in this period.")
+        return
+    total = totals(counts)
+    step1_unable, step2_unable = unable_to_verify(total)
+    claimed, conditions = carve_out_hit_rates(total)
+
+    columns = st.columns(4)
+    columns[0].metric("Assessments", f"{assessments(total):,}")
+    columns[1].metric("Unable to verify, Step 1", _percent(step1_unable))
+    columns[2].metric("Unable to verify, Step 2", _percent(step2_unable))
+    columns[3].metric("Claim optimization-only", f"{claimed:,}")
+
+    st.markdown("### Verdicts over time")
+    bucket = st.segmented_control("Per", list(BUCKETS), default="Week", key="dashboard-bucket") or "Week"
+    st.bar_chart(verdicts_over_time(counts, bucket))
+
+    st.markdown("### ML techniques selected")
+    st.dataframe(
+        ml_techniques(total),
+        hide_index=True,
+        use_container_width=True,
+        column_config={"Share of ML systems": _rate_column()},
+    )
+
+    st.markdown("### Carve-out condition hit rates")
+    st.caption(f"Share of the {claimed:,} systems that claim optimization-only usage meeting each condition.")
+    st.dataframe(
+        conditions,
+        hide_index=True,
+        use_container_width=True,
+        column_config={"Hit rate": _rate_column()},
+    )
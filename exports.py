@@ -0,0 +1,194 @@
+import collections
+import copy
+import hashlib
+import json
+import threading
+
+from classifier import RULESET_VERSION, evaluate
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+APP_NAME = "AI System Classifier (EU AI Act-aligned)"
+APP_VERSION = "1.0.0"
+RESULT_CACHE_SIZE = 1024
+
+# Exports are rendered once per distinct answer set with this marker in place
+# of every timestamp, then split on it; filling in a session's timestamps is
+# a single join.
+SLOT = "\x00"
+_JSON_SLOT = json.dumps(SLOT)
+_NO_NOTES = ("No additional notes recorded.",)
+
+
+class CachedResult:
+    # Everything about an answer set that does not depend on when or by whom
+    # it was answered: its key, the classification and, once an export is
+    # first requested, both export templates.
+    __slots__ = ("key", "verdict", "rationale", "decision_log", "_answers", "_templates")
+
+    def __init__(self, key, answers):
+        result = evaluate(answers)
+        self.key = key
+        self.verdict = result.verdict
+        self.rationale = result.rationale
+        self.decision_log = result.decision_log
+        self._answers = copy.deepcopy(answers)
+        self._templates = None
+
+    def templates(self):
+        # Built at most a few times under contention; every build is identical.
+        if self._templates is None:
+            skeleton = {
+                "result": self.verdict,
+                "rationale": list(self.rationale),
+                "answers": self._answers,
+                "decision_log": [
+                    {"timestamp": SLOT, "step": step, "outcome": outcome, "notes": list(notes)}
+                    for step, outcome, notes in self.decision_log
+                ],
+            }
+            self._templates = (
+                json.dumps(assessment_payload(skeleton, SLOT), indent=2).split(_JSON_SLOT),
+                "\n".join(markdown_lines(skeleton)).split(SLOT),
+            )
+        return self._templates
+
+
+class ResultCache:
+    # Least-recently-used and bounded to ``maxsize`` entries; shared by every
+    # session and request in the process.
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = build()
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+result_cache = ResultCache(RESULT_CACHE_SIZE)
+
+
+def answers_key(answers):
+    canonical = json.dumps(answers, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{RULESET_VERSION}\n{canonical}".encode("utf-8")).hexdigest()
+
+
+def assessment_payload(assessment, timestamp):
+    return {"app": APP_NAME, "version": APP_VERSION, "timestamp": timestamp, "assessment": assessment}
+
+
+def markdown_lines(assessment):
+    yield "# AI System Classification Summary"
+    yield ""
+    yield f"**Result:** {assessment['result']}"
+    yield ""
+    yield "## Rationale"
+    for item in assessment.get("rationale", []):
+        yield f"- {item}"
+    yield ""
+    yield "## Decision log"
+    for entry in assessment.get("decision_log", []):
+        yield f"### {entry['step']}"
+        yield f"- **Outcome:** {entry['outcome']}"
+        yield f"- **Recorded at:** {entry['timestamp']}"
+        notes = entry.get("notes") or _NO_NOTES
+        yield "- **Notes:**"
+        for note in notes:
+            yield f"  - {note}"
+        yield ""
+
+
+def render_markdown(assessment):
+    # Same text as "\n".join(markdown_lines(assessment)), with the fixed parts
+    # of the layout merged so each decision log entry costs one f-string and
+    # one join instead of a yield per line.
+    parts = [f"# AI System Classification Summary\n\n**Result:** {assessment['result']}\n\n## Rationale"]
+    parts += [f"\n- {item}" for item in assessment.get("rationale", [])]
+    parts.append("\n\n## Decision log")
+    for entry in assessment.get("decision_log", []):
+        parts.append(
+            f"\n### {entry['step']}\n- **Outcome:** {entry['outcome']}"
+            f"\n- **Recorded at:** {entry['timestamp']}\n- **Notes:**\n  - "
+        )
+        parts.append("\n  - ".join(entry.get("notes") or _NO_NOTES))
+        parts.append("\n")
+    return "".join(parts)
+
+
+def encode_json(value, compact=False):
+    # UTF-8 JSON bytes, indented by two spaces or, for the wire, without any
+    # whitespace. orjson is used when it is installed, and the stdlib encoder
+    # for what orjson rejects (integers over 64 bits) or when it is not.
+    if orjson is not None:
+        try:
+            return orjson.dumps(value) if compact else orjson.dumps(value, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            pass
+    if compact:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(value, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def cached_result(answers):
+    # Keyed by the canonical JSON of ``answers`` and the ruleset version, so
+    # identical assessments from any session are classified and templated once.
+    key = answers_key(answers)
+    return result_cache.get(key, lambda: CachedResult(key, answers))
+
+
+def fill_slots(parts, values):
+    # A template for another decision log would silently drop fields.
+    if len(values) != len(parts) - 1:
+        raise ValueError(f"Template has {len(parts) - 1} slots, got {len(values)} values")
+    pieces = [parts[0]]
+    for value, part in zip(values, parts[1:]):
+        pieces.append(value)
+        pieces.append(part)
+    return "".join(pieces)
+
+
+def json_export(assessment, timestamp):
+    json_parts, _ = cached_result(assessment["answers"]).templates()
+    stamps = [timestamp] + [entry["timestamp"] for entry in assessment.get("decision_log", [])]
+    return fill_slots(json_parts, [json.dumps(stamp) for stamp in stamps])
+
+
+def markdown_export(assessment):
+    _, markdown_parts = cached_result(assessment["answers"]).templates()
+    return fill_slots(markdown_parts, [entry["timestamp"] for entry in assessment.get("decision_log", [])])
@@ -0,0 +1,245 @@
+import io
+import json
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+import streamlit as st
+
+from bulk_classify import classify_stream, input_format, read_records
+
+# Uploaded inventories are classified by an InventoryJob on a background
+# thread, on the app's shared worker pool; the page only polls the job's
+# counters and reads one page of its results at a time.
+CHUNK_SIZE = 500
+PAGE_SIZE = 100
+POLL_INTERVAL = 1.0
+FORMATS = ["csv", "xlsx", "jsonl", "ndjson"]
+NO_VERDICT = "No verdict (incomplete answers)"
+UNCLASSIFIED = "Could not be classified"
+
+
+# -------- Jobs
+class InventoryJob:
+    # Classifies one uploaded file. Records are parsed ``chunk_size`` at a time
+    # as the pool takes them, and the NDJSON results are appended to a
+    # temporary file in pages of ``PAGE_SIZE`` lines, so neither the parsed
+    # rows nor the results are held in memory. Every attribute the page reads
+    # is updated by the worker thread only.
+
+    def __init__(self, upload, pool, workers, chunk_size=CHUNK_SIZE):
+        self.file_id = upload.file_id
+        self.name = upload.name
+        self.size = upload.size
+        self.read = 0
+        self.done = 0
+        self.verdicts = Counter()
+        self.errors = 0
+        self.error = None
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self._upload = upload
+        self._pool = pool
+        self._workers = workers
+        self._chunk_size = chunk_size
+        self._pages = []
+        self._results = None
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"inventory-{self.file_id}", daemon=True)
+        self._thread.start()
+
+    @property
+    def finished(self):
+        return self.elapsed is not None
+
+    def progress(self):
+        # Rows classified over the rows the file is expected to hold, estimated
+        # from how far the parser has read into it.
+        if self.finished:
+            return 1.0
+        position = self._upload.tell()
+        if not self.read or not position:
+            return 0.0
+        return min(self.done * position / (self.read * self.size), 0.99)
+
+    def cancel(self):
+        # Stops the worker thread after its current result; never waits.
+        self._cancelled.set()
+
+    def _records(self, records):
+        for record in records:
+            self.read += 1
+            yield record
+
+    def _run(self):
+        fmt = input_format(self.name)
+        source = self._upload if fmt == "xlsx" else io.TextIOWrapper(self._upload, encoding="utf-8-sig", newline="")
+        self._results = tempfile.TemporaryFile()
+        page = []
+        try:
+            records = self._records(read_records(source, fmt))
+            for line in classify_stream(records, self._workers, self._chunk_size, pool=self._pool):
+                if self._cancelled.is_set():
+                    break
+                result = json.loads(line)
+                if result.get("incomplete"):
+                    self.verdicts[NO_VERDICT] += 1
+                elif "error" in result:
+                    self.errors += 1
+                else:
+                    self.verdicts[result["result"]] += 1
+                page.append(line)
+                if len(page) == PAGE_SIZE:
+                    self._write_page(page)
+                    page = []
+                self.done += 1
+        except Exception as exc:  # shown on the page rather than lost with the thread
+            self.error = str(exc) or type(exc).__name__
+        finally:
+            # Rows classified before a failure stay readable.
+            if self._cancelled.is_set():
+                self._results.close()
+            elif page:
+                self._write_page(page)
+            self.elapsed = time.perf_counter() - self.started
+
+    def _write_page(self, lines):
+        data = b"\n".join(lines) + b"\n"
+        with self._lock:
+            self._results.seek(0, io.SEEK_END)
+            self._pages.append((self._results.tell(), len(data)))
+            self._results.write(data)
+
+    # -------- Results
+    @property
+    def pages(self):
+        return len(self._pages)
+
+    def page(self, number):
+        # The results on page ``number`` (from 0) as dicts.
+        with self._lock:
+            offset, length = self._pages[number]
+            self._results.seek(offset)
+            data = self._results.read(length)
+        return [json.loads(line) for line in data.splitlines()]
+
+    def results_bytes(self):
+        with self._lock:
+            self._results.seek(0)
+            return self._results.read()
+
+
+# -------- Page
+def _status_label(job):
+    if job.error:
+        return f"Could not classify {job.name}: {job.error}"
+    if job.finished:
+        return f"Classified {job.done:,} rows of {job.name} in {job.elapsed:.1f}s"
+    return f"Classifying {job.name}…"
+
+
+def _counts(job):
+    # A copy, as the worker thread may be adding a verdict.
+    rows = Counter(dict(job.verdicts)).most_common()
+    if job.errors:
+        rows.append((UNCLASSIFIED, job.errors))
+    return pd.DataFrame(rows, columns=["Verdict", "Rows"])
+
+
+def _progress(job):
+    # Polled every POLL_INTERVAL seconds while the job runs, so the script
+    # thread never waits on it; a full rerun once it finishes replaces it with
+    # the results.
+    if job.finished:
+        st.rerun()
+    with st.status(_status_label(job), expanded=True):
+        st.progress(job.progress(), text=f"{job.done:,} rows classified")
+        if job.done:
+            st.dataframe(_counts(job), hide_index=True, use_container_width=True)
+
+
+def _verdict(result):
+    if result.get("incomplete"):
+        return NO_VERDICT
+    if "error" in result:
+        return UNCLASSIFIED
+    return result["result"]
+
+
+def render_decision(result):
+    st.markdown(f"#### Row {result['id']}")
+    if "error" in result:
+        st.error(result["error"])
+        return
+    st.markdown(f"**Result:** {_verdict(result)}")
+    st.markdown("**Rationale**\n\n" + "\n".join(f"- {item}" for item in result["rationale"]))
+    lines = []
+    for entry in result["decision_log"]:
+        lines.append(f"- {entry['step']} — {entry['outcome']}")
+        lines.extend(f"    - {note}" for note in entry["notes"])
+    st.markdown("**Decision log**\n\n" + "\n".join(lines))
+
+
+def render_results(job):
+    state = "error" if job.error else "complete"
+    with st.status(_status_label(job), state=state, expanded=bool(job.done)):
+        if job.done:
+            st.dataframe(_counts(job), hide_index=True, use_container_width=True)
+    if not job.pages:
+        return
+
+    # Keyed by the upload, so a new file starts on its first page with no row
+    # selected rather than keeping a page number that may be past its end.
+    number = st.number_input("Page", min_value=1, max_value=job.pages, key=f"inventory-page-{job.file_id}") - 1
+    results = job.page(number)
+    table = pd.DataFrame(
+        [(str(result["id"]), _verdict(result)) for result in results],
+        columns=["Row", "Verdict"],
+    )
+    first = number * PAGE_SIZE + 1
+    st.caption(f"Rows {first:,}–{first + len(results) - 1:,}; select one for its decision log.")
+    selection = st.dataframe(
+        table,
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"inventory-rows-{job.file_id}-{number}",
+    )
+    if selection.selection.rows:
+        render_decision(results[selection.selection.rows[0]])
+    st.download_button(
+        "⬇️ Download results (NDJSON)",
+        data=job.results_bytes,
+        file_name="inventory_results.ndjson",
+        mime="application/x-ndjson",
+        use_container_width=True,
+        key="inventory-download",
+        on_click="ignore",
+    )
+
+
+def render(pool, workers):
+    st.title("Classify an inventory")
+    st.caption(
+        "One system per row, with dotted answer columns as in `bulk_classify.py` "
+        "(`non_ai_categories.none_applies`, `ai_techniques.ml_techniques` with `;`-separated values, ...) "
+        "and an optional `id` column. JSON lines files hold an `answers` dict per line."
+    )
+    upload = st.file_uploader("Inventory file", type=FORMATS, key="inventory-upload")
+    job = st.session_state.get("inventory_job")
+    if job is not None and (upload is None or job.file_id != upload.file_id):
+        job.cancel()
+        job = st.session_state.inventory_job = None
+    if upload is None:
+        return
+    if job is None:
+        job = st.session_state.inventory_job = InventoryJob(upload, pool, workers)
+
+    if job.finished:
+        render_results(job)
+    else:
+        st.fragment(_progress, run_every=POLL_INTERVAL)(job)
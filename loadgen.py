@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+SAMPLE_ANSWERS = {
+    "non_ai_categories": {"none_applies": True},
+    "ai_techniques": {"ml_selected": True, "ml_techniques": ["Deep Learning"], "logic_knowledge_based": False},
+    "optimization_only": True,
+    "optimization_conditions": {
+        "supporting_role_only": True,
+        "fixed_after_deployment": True,
+        "no_influence_objectives": True,
+        "outputs_narrowly_scoped": False,
+        "performance_is_efficiency": True,
+    },
+}
+
+
+def build_request(host, port, batch_size):
+    if batch_size > 1:
+        path, body = "/classify/batch", [SAMPLE_ANSWERS] * batch_size
+    else:
+        path, body = "/classify", SAMPLE_ANSWERS
+    data = json.dumps(body).encode("utf-8")
+    head = (
+        f"POST {path} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\nConnection: keep-alive\r\n\r\n"
+    )
+    return head.encode("ascii") + data
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("server closed the connection")
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def _worker(host, port, request, count, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await _read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(host, port, total, concurrency, batch_size):
+    request = build_request(host, port, batch_size)
+    latencies, errors = [], []
+    per_worker, extra = divmod(total, concurrency)
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _worker(host, port, request, per_worker + (1 if index < extra else 0), latencies, errors)
+            for index in range(concurrency)
+        )
+    )
+    return time.perf_counter() - started, latencies, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the classification API on localhost.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=1, help="records per request (>1 uses /classify/batch)")
+    args = parser.parse_args(argv)
+
+    elapsed, latencies, errors = asyncio.run(
+        run(args.host, args.port, args.requests, args.concurrency, args.batch_size)
+    )
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"requests:     {len(latencies)} ({len(errors)} non-200)")
+    print(f"requests/sec: {len(latencies) / elapsed:,.0f}")
+    if args.batch_size > 1:
+        print(f"records/sec:  {len(latencies) * args.batch_size / elapsed:,.0f}")
+    print(f"p50 latency:  {quantiles[49] * 1000:.2f} ms")
+    print(f"p99 latency:  {quantiles[98] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+import argparse
+import json
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from classifier import CONDITION_LABELS, FLAGS, NON_AI_LABELS, OPTIMIZATION_ONLY, encode
+from exports import SLOT, fill_slots
+from store import AssessmentStore
+
+NOT_RECORDED = "not recorded"
+TOP = 10
+WRITE_BATCH = 256
+
+# Decision log timestamps in the store's JSON. A timestamp with an escaped
+# character does not match, so its row takes the decoding path.
+_TIMESTAMP = re.compile(r'"timestamp": "([^"\\]*)"')
+_EXCLUSIONS = [(FLAGS[f"non_ai_categories.{key}"], label) for key, label in NON_AI_LABELS.items()]
+_CONDITIONS = [(FLAGS[f"optimization_conditions.{key}"], label) for key, label in CONDITION_LABELS.items()]
+
+
+def system_name(assessment):
+    return assessment.get("system") or assessment.get("name") or f"Assessment {assessment.get('id')}"
+
+
+# -------- Per-system sections
+def section_lines(assessment):
+    # One system's section of a portfolio report. PortfolioReport renders the
+    # same text from templates compiled from this layout.
+    yield f"## {system_name(assessment)}"
+    yield ""
+    yield f"- **Result:** {assessment['result']}"
+    yield f"- **Recorded at:** {assessment.get('recorded_at') or NOT_RECORDED}"
+    yield "- **Rationale:**"
+    for item in assessment.get("rationale", []):
+        yield f"  - {item}"
+    yield "- **Decision log:**"
+    for entry in assessment.get("decision_log", []):
+        yield f"  - {entry['step']} — {entry['outcome']} ({entry.get('timestamp') or NOT_RECORDED})"
+        for note in entry.get("notes") or ():
+            yield f"    - {note}"
+    yield ""
+    yield ""
+
+
+def compile_section(assessment):
+    # ``assessment``'s section split on a slot for the system name, the
+    # recording time and every decision log timestamp.
+    skeleton = {
+        "system": SLOT,
+        "recorded_at": SLOT,
+        "result": assessment["result"],
+        "rationale": assessment.get("rationale", []),
+        "decision_log": [{**entry, "timestamp": SLOT} for entry in assessment.get("decision_log", [])],
+    }
+    return "\n".join(section_lines(skeleton)).split(SLOT)
+
+
+# -------- Reports
+class PortfolioReport:
+    # Renders the sections of a consolidated report one system at a time.
+    # Systems with the same answers under the same ruleset have the same
+    # verdict, rationale and decision log, so each distinct answer set's
+    # section is compiled once and only the names and times are filled in
+    # for the others. The summary is built from the number of systems per
+    # template key.
+
+    def __init__(self, title, top=TOP):
+        self.title = title
+        self.top = top
+        self.keys = Counter()
+        self._templates = {}
+
+    def section(self, assessment):
+        stamps = [entry.get("timestamp") or NOT_RECORDED for entry in assessment.get("decision_log", [])]
+        key = (assessment.get("ruleset_version"), encode(assessment["answers"]), assessment["result"], len(stamps))
+        self.keys[key] += 1
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates[key] = compile_section(assessment)
+        recorded_at = assessment.get("recorded_at") or NOT_RECORDED
+        return fill_slots(template, [system_name(assessment), recorded_at, *stamps])
+
+    def row_section(self, row):
+        # A store.query_raw() row: the stored mask and the timestamps are
+        # enough for a known answer set, so its JSON is decoded only for the
+        # first system with those answers.
+        assessment_id, recorded_at, version, verdict, mask, rationale, decision_log = row
+        stamps = _TIMESTAMP.findall(decision_log)
+        key = (version, mask, verdict, len(stamps))
+        template = self._templates.get(key)
+        if template is None:
+            log = json.loads(decision_log)
+            if [entry["timestamp"] for entry in log] != stamps:
+                stamps = [entry["timestamp"] for entry in log]
+                key = (version, mask, verdict, len(stamps))
+            assessment = {"result": verdict, "rationale": json.loads(rationale), "decision_log": log}
+            template = self._templates.setdefault(key, compile_section(assessment))
+        self.keys[key] += 1
+        return fill_slots(template, [f"Assessment {assessment_id}", recorded_at or NOT_RECORDED, *stamps])
+
+    @property
+    def systems(self):
+        return sum(self.keys.values())
+
+    def header(self):
+        return f"# {self.title}\n\n"
+
+    def summary(self):
+        return "\n".join(self.summary_lines()) + "\n\n"
+
+    def summary_lines(self):
+        systems, verdicts, versions, exclusions, claimed, missing = 0, Counter(), Counter(), Counter(), 0, Counter()
+        for (version, mask, verdict, _), count in self.keys.items():
+            systems += count
+            verdicts[verdict] += count
+            versions[version] += count
+            for bit, label in _EXCLUSIONS:
+                if mask & bit:
+                    exclusions[label] += count
+            if mask & OPTIMIZATION_ONLY:
+                claimed += count
+                for bit, label in _CONDITIONS:
+                    if not mask & bit:
+                        missing[label] += count
+
+        yield "## Portfolio summary"
+        yield ""
+        yield f"- **Systems assessed:** {systems:,}"
+        listed = ", ".join(f"{version or 'unknown'} ({count:,})" for version, count in versions.most_common())
+        yield f"- **Ruleset versions:** {listed or 'none'}"
+        yield ""
+        yield "### Verdicts"
+        yield ""
+        yield "| Verdict | Systems | Share |"
+        yield "| --- | ---: | ---: |"
+        for verdict, count in verdicts.most_common():
+            yield f"| {verdict} | {count:,} | {count / systems:.1%} |"
+        yield ""
+
+        yield "### Most common exclusion categories"
+        yield ""
+        if exclusions:
+            yield "| Category | Systems | Share |"
+            yield "| --- | ---: | ---: |"
+            for label, count in exclusions.most_common(self.top):
+                yield f"| {label} | {count:,} | {count / systems:.1%} |"
+        else:
+            yield "No system was excluded under a non-AI category."
+        yield ""
+
+        yield "### Carve-out conditions most often missing"
+        yield ""
+        if missing:
+            yield f"Among the {claimed:,} systems that claim optimization-only usage:"
+            yield ""
+            yield "| Condition | Missing in | Share |"
+            yield "| --- | ---: | ---: |"
+            for label, count in missing.most_common(self.top):
+                yield f"| {label} | {count:,} | {count / claimed:.1%} |"
+        elif claimed:
+            yield f"All {claimed:,} systems that claim optimization-only usage meet every condition."
+        else:
+            yield "No system claims optimization-only usage."
+
+
+def write_report(assessments, stream, title, summary_first=True, top=TOP, raw=False):
+    # Consumes ``assessments`` (dicts, or store.query_raw() rows with
+    # ``raw``) once and writes the report to the binary ``stream``; returns
+    # the number of systems. With ``summary_first`` the sections go to a
+    # temporary file until the summary is known, so memory stays constant
+    # either way.
+    report = PortfolioReport(title, top)
+    render = report.row_section if raw else report.section
+    stream.write(report.header().encode("utf-8"))
+    spool = tempfile.TemporaryFile() if summary_first else stream
+    try:
+        sections = []
+        for assessment in assessments:
+            sections.append(render(assessment))
+            if len(sections) == WRITE_BATCH:
+                spool.write("".join(sections).encode("utf-8"))
+                sections.clear()
+        spool.write("".join(sections).encode("utf-8"))
+        stream.write(report.summary().encode("utf-8"))
+        if summary_first:
+            spool.seek(0)
+            shutil.copyfileobj(spool, stream)
+    finally:
+        if summary_first:
+            spool.close()
+    return report.systems
+
+
+# -------- Input readers
+def iter_ndjson(stream, business_unit=None, skipped=None):
+    # Assessments as written by bulk_export.py, or bulk_classify.py results,
+    # which carry the inventory's ``system`` and ``business_unit`` columns.
+    # Records left out are counted by reason in the ``skipped`` Counter.
+    skipped = Counter() if skipped is None else skipped
+    for line in stream:
+        if line.strip():
+            assessment = json.loads(line)
+            if business_unit is not None and assessment.get("business_unit") != business_unit:
+                skipped["other business unit" if "business_unit" in assessment else "no business_unit"] += 1
+            elif assessment.get("result") is None:
+                if assessment.get("incomplete"):
+                    skipped["incomplete"] += 1
+                else:
+                    skipped["error" if "error" in assessment else "no verdict"] += 1
+            else:
+                yield assessment
+
+
+# -------- Entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a consolidated Markdown report for a portfolio of systems.")
+    parser.add_argument("--db", default="assessments.sqlite3", help="assessment store (default: %(default)s)")
+    parser.add_argument("--input", help="NDJSON assessments to report on instead of the store ('-' for stdin)")
+    parser.add_argument(
+        "--business-unit", help="with --input, only records with this business_unit (from bulk_classify.py)"
+    )
+    parser.add_argument("--title", default="AI system portfolio report")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--since", help="first recorded_at to include, e.g. 2026-07-01")
+    parser.add_argument("--until", help="recorded_at to stop before, e.g. 2026-10-01")
+    parser.add_argument("--verdict")
+    parser.add_argument("--ruleset-version")
+    parser.add_argument("--flag", action="append", default=[], help="dotted answer flag that must be set")
+    parser.add_argument("--top", type=int, default=TOP, help="rows in the summary's ranked tables")
+    parser.add_argument("--summary-last", action="store_true", help="write the summary after the sections")
+    args = parser.parse_args(argv)
+    if args.business_unit is not None and not args.input:
+        parser.error("--business-unit needs --input: the store does not record business units")
+
+    skipped = Counter()
+    sink = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    started = time.perf_counter()
+    try:
+        if args.input:
+            source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+            with source:
+                assessments = iter_ndjson(source, args.business_unit, skipped)
+                count = write_report(assessments, sink, args.title, not args.summary_last, args.top)
+        else:
+            with AssessmentStore(args.db) as store:
+                rows = store.query_raw(
+                    verdict=args.verdict,
+                    ruleset_version=args.ruleset_version,
+                    since=args.since,
+                    until=args.until,
+                    flags=args.flag,
+                )
+                count = write_report(rows, sink, args.title, not args.summary_last, args.top, raw=True)
+    finally:
+        if args.output != "-":
+            sink.close()
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0.0
+    print(f"Reported on {count} systems in {elapsed:.2f}s ({rate:,.0f} systems/sec)", file=sys.stderr)
+    if skipped:
+        listed = ", ".join(f"{count} {reason}" for reason, count in skipped.items())
+        print(f"Skipped records: {listed}", file=sys.stderr)
+    if args.business_unit is not None and not count and skipped["no business_unit"]:
+        raise SystemExit(
+            "No input record has a business_unit: report on bulk_classify.py results from an inventory with one."
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import collections
+import contextlib
+import datetime as dt
+import json
+import threading
+import time
+
+WINDOW = 1000
+PERCENTILES = (50, 90, 99)
+
+
+def _percentile(ordered, percent):
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class Profiler:
+    # Process-wide rolling timings per named section. Sections nest: a
+    # section's time excludes the sections opened inside it, so the numbers
+    # add up to the rerun. Every sample is also appended to ``trace_path`` as
+    # one JSON object per line.
+
+    def __init__(self, trace_path=None, window=WINDOW):
+        self._samples = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._trace = open(trace_path, "a", buffering=1, encoding="utf-8") if trace_path else None
+
+    @contextlib.contextmanager
+    def section(self, name, session=None):
+        stack = self._local.__dict__.setdefault("stack", [])
+        nested = [0.0]
+        stack.append(nested)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            self.record(name, elapsed - nested[0], session)
+
+    def record(self, name, seconds, session=None):
+        line = None
+        if self._trace is not None:
+            line = json.dumps(
+                {
+                    "timestamp": dt.datetime.utcnow().isoformat() + "Z",
+                    "session": session,
+                    "section": name,
+                    "ms": round(seconds * 1000, 3),
+                }
+            )
+        with self._lock:
+            self._samples[name].append(seconds)
+            if line is not None:
+                self._trace.write(line + "\n")
+
+    def summary(self):
+        with self._lock:
+            snapshot = {name: sorted(samples) for name, samples in self._samples.items()}
+        rows = []
+        for name, ordered in snapshot.items():
+            row = {"section": name, "samples": len(ordered)}
+            for percent in PERCENTILES:
+                row[f"p{percent} ms"] = round(_percentile(ordered, percent) * 1000, 2)
+            rows.append(row)
+        return rows
+
+    def close(self):
+        if self._trace is not None:
+            with self._lock:
+                self._trace.close()
+                self._trace = None
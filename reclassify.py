@@ -0,0 +1,194 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import ruleset
+from classifier import FLAGS, RULESET_PATH, build_machine, flag_names
+from exports import encode_json
+from store import AssessmentStore
+
+_FLAG_BITS = sum(FLAGS.values())
+
+
+# -------- Rule changes
+# A state's rules change when its transitions do, or any text they use: the
+# step title, shared notes, verdict labels and messages. Answers whose path
+# never enters a changed state take the same rules under both rulesets, so
+# only answers whose path enters one are classified again.
+def _references(rules, node, refs):
+    if isinstance(node, list):
+        for item in node:
+            _references(rules, item, refs)
+        return
+    if not isinstance(node, dict):
+        return
+    if set(node) == {"include"} and node["include"] not in refs["notes"]:
+        shared = refs["notes"][node["include"]] = rules.get("notes", {}).get(node["include"])
+        _references(rules, shared, refs)
+    if isinstance(node.get("verdict"), dict):
+        label = node["verdict"].get("verdict")
+        refs["verdicts"][label] = rules["verdicts"].get(label)
+    if "incomplete" in node:
+        refs["messages"][node["incomplete"]] = rules["messages"].get(node["incomplete"])
+    for value in node.values():
+        _references(rules, value, refs)
+
+
+def _signature(rules, name):
+    spec = rules["states"].get(name)
+    if spec is None:
+        return None
+    refs = {"notes": {}, "verdicts": {}, "messages": {}}
+    _references(rules, spec, refs)
+    titles = (rules["steps"].get(spec["step"], {}).get("log"), rules["steps"]["final"]["log"])
+    return json.dumps([spec, titles, refs], sort_keys=True, ensure_ascii=False)
+
+
+def changed_states(previous, current):
+    names = set(previous["states"]) | set(current["states"])
+    if previous["start"] != current["start"]:
+        return names
+    return {name for name in names if _signature(previous, name) != _signature(current, name)}
+
+
+def answer_names(bits):
+    # The AI model knowledge answer is a code over several bits, not a flag.
+    names = flag_names(bits)
+    if bits & ~_FLAG_BITS:
+        names.append("ai_techniques.ai_model_knowledge")
+    return names
+
+
+def dependency_index(machine):
+    # Rule -> the answers it reads, for reports.
+    return {rule: answer_names(bits) for rule, bits in machine.rules.items()}
+
+
+def _state(rule):
+    return rule.split(".")[1]
+
+
+# -------- Re-classification
+_machine = None
+_changed = None
+
+
+def _init_worker(current, changed):
+    global _machine, _changed
+    _machine = build_machine(current)
+    _changed = changed
+
+
+def _classify_chunk(chunk):
+    # (mask, stored verdict, new verdict, changed rules taken) for every
+    # answer set in ``chunk`` whose path enters a changed state.
+    results = []
+    for mask, verdict in chunk:
+        touched = [f"states.{name}.transitions[{index}]" for name, index in _machine.path(mask) if name in _changed]
+        if touched:
+            results.append((mask, verdict, _machine.run(mask)[0], touched))
+    return results
+
+
+def reclassify(groups, current, changed, workers, chunk_size):
+    # ``groups`` are (answers_mask, stored verdict) pairs. Stored answers are
+    # already projected onto the steps they reached, so they are classified
+    # as they are rather than through classifier.canonical(), which only
+    # knows the loaded ruleset's paths.
+    chunks = iter(lambda: list(itertools.islice(groups, chunk_size)), [])
+    if workers <= 1:
+        _init_worker(current, changed)
+        for chunk in chunks:
+            yield from _classify_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(current, changed)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_classify_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+# -------- Entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Re-classify the stored assessments a ruleset change can affect and report flipped verdicts."
+    )
+    parser.add_argument("previous", help="the ruleset the assessments were classified with, e.g. from git show")
+    parser.add_argument("--ruleset", default=RULESET_PATH, help="the changed ruleset (default: %(default)s)")
+    parser.add_argument("--db", default="assessments.sqlite3", help="assessment store (default: %(default)s)")
+    parser.add_argument("--ruleset-version", help="stored version to check (default: the previous ruleset's)")
+    parser.add_argument("-o", "--output", default="-", help="NDJSON of flipped assessments (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="answer sets sent to a worker at a time")
+    parser.add_argument("--show-index", action="store_true", help="print the answers each changed rule reads")
+    args = parser.parse_args(argv)
+
+    previous, current = ruleset.load(args.previous), ruleset.load(args.ruleset)
+    machine = build_machine(current)
+    changed = changed_states(previous, current)
+    version = args.ruleset_version or previous["version"]
+    report = sys.stderr
+    if not changed:
+        print("The rulesets classify every answer set the same way; nothing to do.", file=report)
+        return 0
+    if current["version"] == previous["version"]:
+        print(f"Warning: both rulesets have version {version!r}; bump it for the changed rules.", file=report)
+    print(f"Changed states: {', '.join(sorted(changed))}", file=report)
+    if args.show_index:
+        for rule, names in dependency_index(machine).items():
+            if _state(rule) in changed:
+                print(f"  {rule} reads {', '.join(names) or 'no answers'}", file=report)
+
+    started = time.perf_counter()
+    sink = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        with AssessmentStore(args.db) as store:
+            counts = {(mask, verdict): count for mask, verdict, count in store.verdicts_by_mask(version)}
+            results = list(reclassify(iter(counts), current, changed, args.workers, args.chunk_size))
+            flips = {(mask, old): (new, rules) for mask, old, new, rules in results if new != old}
+            rows = 0
+            for assessment_id, recorded_at, verdict, mask in store.with_masks(version, {mask for mask, _ in flips}):
+                flip = flips.get((mask, verdict))
+                if flip is None:
+                    continue
+                record = {
+                    "id": assessment_id,
+                    "recorded_at": recorded_at,
+                    "previous_verdict": verdict,
+                    "verdict": flip[0],
+                    "rules": flip[1],
+                }
+                sink.write(encode_json(record, compact=True) + b"\n")
+                rows += 1
+    finally:
+        if sink is not sys.stdout.buffer:
+            sink.close()
+    elapsed = time.perf_counter() - started
+
+    affected = sum(counts[mask, old] for mask, old, _, _ in results)
+    transitions = Counter()
+    for (mask, old), (new, _) in flips.items():
+        transitions[old, new] += counts[mask, old]
+    print(
+        f"Checked {len(counts):,} distinct answer sets ({sum(counts.values()):,} assessments) stored under"
+        f" ruleset {version!r}; {len(results):,} ({affected:,} assessments) take a changed rule and were"
+        f" re-classified in {elapsed:.2f}s.",
+        file=report,
+    )
+    print(f"Verdicts flipped for {rows:,} assessments:", file=report)
+    for (old, new), count in transitions.most_common():
+        print(f"  {old} -> {new}: {count:,}", file=report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+import json
+import os
+import string
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ruleset.json")
+
+_TOP_LEVEL = {"version", "verdicts", "messages", "steps", "questions", "notes", "start", "states"}
+_GUARD_KEYS = {"all", "any", "none", "not_all", "knowledge"}
+_TRANSITION_KEYS = {"when", "log", "goto", "verdict", "incomplete"}
+_TARGETS = ("goto", "verdict", "incomplete")
+_UNSET = object()
+
+
+class RulesetError(ValueError):
+    pass
+
+
+# -------- Loading
+def load(path=DEFAULT_PATH):
+    # JSON, or YAML when the file name says so and PyYAML is installed.
+    with open(path, encoding="utf-8") as handle:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise RulesetError(f"{path}: YAML rulesets need PyYAML: pip install pyyaml") from None
+            try:
+                data = yaml.safe_load(handle)
+            except yaml.YAMLError as exc:
+                raise RulesetError(f"{path}: {exc}") from None
+        else:
+            try:
+                data = json.load(handle)
+            except json.JSONDecodeError as exc:
+                raise RulesetError(f"{path}: {exc}") from None
+
+    if not isinstance(data, dict):
+        raise RulesetError(f"{path}: a ruleset is a mapping")
+    unknown = set(data) - _TOP_LEVEL
+    missing = _TOP_LEVEL - {"notes"} - set(data)
+    if unknown or missing:
+        raise RulesetError(f"{path}: unknown sections {sorted(unknown)}, missing sections {sorted(missing)}")
+    if not isinstance(data["version"], str) or not data["version"]:
+        raise RulesetError(f"{path}: version must be a non-empty string")
+    for section in ("verdicts", "messages"):
+        for name, text in data[section].items():
+            if not isinstance(text, str):
+                raise RulesetError(f"{path}: {section}.{name} must be a string")
+    for name, step in data["steps"].items():
+        if not isinstance(step, dict) or not isinstance(step.get("log"), str):
+            raise RulesetError(f"{path}: steps.{name} needs a 'log' title")
+    return data
+
+
+# -------- Compilation
+class _Names:
+    # Template values: ``{selected[group]}`` and ``{missing[group]}`` are the
+    # comma-separated names of a group's options that are / are not set.
+
+    def __init__(self, key, groups, present):
+        self.key = key
+        self.groups = groups
+        self.present = present
+
+    def __getitem__(self, group):
+        return ", ".join(name for bit, name in self.groups[group] if bool(self.key & bit) is self.present)
+
+
+class _Guard:
+    __slots__ = ("all", "any", "none", "not_all", "knowledge", "reads")
+
+    def __init__(self, spec, where, flags, groups, knowledge_mask, knowledge_codes):
+        if not isinstance(spec, dict) or set(spec) - _GUARD_KEYS:
+            raise RulesetError(f"{where}: a guard is a mapping with keys {sorted(_GUARD_KEYS)}")
+        masks = {}
+        for name in ("all", "any", "none", "not_all"):
+            mask = 0
+            for flag in spec.get(name, ()):
+                if flag.startswith("@"):
+                    if flag[1:] not in groups:
+                        raise RulesetError(f"{where}: unknown answer group {flag!r}")
+                    mask |= sum(bit for bit, _ in groups[flag[1:]])
+                elif flag in flags:
+                    mask |= flags[flag]
+                else:
+                    raise RulesetError(f"{where}: unknown answer flag {flag!r}")
+            masks[name] = mask
+        self.all, self.any, self.none, self.not_all = masks["all"], masks["any"], masks["none"], masks["not_all"]
+        self.knowledge = _UNSET
+        reads = self.all | self.any | self.none | self.not_all
+        if "knowledge" in spec:
+            if spec["knowledge"] not in knowledge_codes:
+                raise RulesetError(f"{where}: unknown AI model knowledge answer {spec['knowledge']!r}")
+            self.knowledge = knowledge_codes[spec["knowledge"]]
+            reads |= knowledge_mask
+        self.reads = reads
+
+    def test(self, key, knowledge_mask):
+        return (
+            key & self.all == self.all
+            and (not self.any or key & self.any)
+            and not key & self.none
+            and (not self.not_all or key & self.not_all != self.not_all)
+            and (self.knowledge is _UNSET or key & knowledge_mask == self.knowledge)
+        )
+
+
+class StateMachine:
+    # A ruleset's ``states`` compiled against the classifier's answer layout:
+    # ``flags`` maps answer flag names to bits, ``groups`` maps group names to
+    # ``(bit, name)`` pairs in display order and ``knowledge_codes`` maps each
+    # AI model knowledge answer (None when unanswered) to its bits under
+    # ``knowledge_mask``. Every reference is resolved and every template
+    # rendered once here, so a broken ruleset fails at startup. ``intern`` is
+    # applied to every log entry and note tuple the machine produces.
+
+    def __init__(self, ruleset, flags, groups, knowledge_mask, knowledge_codes, intern=None):
+        self.ruleset = ruleset
+        self.intern = intern or (lambda value: value)
+        self.flags = flags
+        self.groups = groups
+        self.knowledge_mask = knowledge_mask
+        self.knowledge_codes = knowledge_codes
+        self.final_step = ruleset["steps"].get("final", {}).get("log")
+        if self.final_step is None:
+            raise RulesetError("steps.final needs a 'log' title for the final verdict entry")
+        self.start = ruleset["start"]
+        if self.start not in ruleset["states"]:
+            raise RulesetError(f"start: unknown state {self.start!r}")
+        # Answer bits each rule (one transition, with its notes) reads.
+        self.rules = {}
+        self.states = {name: self._state(name, spec) for name, spec in ruleset["states"].items()}
+        self._check_graph()
+        self._memo = {}
+        self.taken = set()
+        # (state, key) for the first key that reached each distinct state
+        # outcome, for spot checks by the caller.
+        self.visits = []
+
+    # -------- Building
+    def _guard(self, spec, where):
+        return _Guard(spec, where, self.flags, self.groups, self.knowledge_mask, self.knowledge_codes)
+
+    def _texts(self, specs, where):
+        notes = []
+        for index, spec in enumerate(specs):
+            at = f"{where}[{index}]"
+            if isinstance(spec, dict) and set(spec) == {"include"}:
+                shared = self.ruleset.get("notes", {}).get(spec["include"])
+                if shared is None:
+                    raise RulesetError(f"{at}: unknown shared notes {spec['include']!r}")
+                notes += self._texts(shared, f"notes.{spec['include']}")
+                continue
+            if isinstance(spec, str):
+                guard, text = None, spec
+            elif isinstance(spec, dict) and set(spec) <= {"when", "text"} and isinstance(spec.get("text"), str):
+                guard, text = self._guard(spec.get("when", {}), f"{at}.when"), spec["text"]
+            else:
+                raise RulesetError(f"{at}: a note is a string or {{'text': ..., 'when': ...}}")
+            try:
+                self._render(text, 0)
+            except (KeyError, IndexError, ValueError, AttributeError) as exc:
+                raise RulesetError(f"{at}: bad template {text!r}: {exc!r}") from None
+            notes.append((guard, text))
+        return notes
+
+    def _state(self, name, spec):
+        where = f"states.{name}"
+        if not isinstance(spec, dict) or set(spec) != {"stage", "step", "transitions"}:
+            raise RulesetError(f"{where}: a state has exactly 'stage', 'step' and 'transitions'")
+        if spec["step"] not in self.ruleset["steps"]:
+            raise RulesetError(f"{where}: unknown step {spec['step']!r}")
+        transitions = spec["transitions"]
+        if not transitions:
+            raise RulesetError(f"{where}: no transitions")
+        if "when" in transitions[-1]:
+            raise RulesetError(f"{where}: the last transition must not have a guard, so every answer set has one")
+
+        compiled, reads = [], 0
+        for index, transition in enumerate(transitions):
+            at = f"{where}.transitions[{index}]"
+            targets = [target for target in _TARGETS if target in transition]
+            if set(transition) - _TRANSITION_KEYS or len(targets) != 1:
+                raise RulesetError(f"{at}: needs exactly one of {list(_TARGETS)} and only {sorted(_TRANSITION_KEYS)}")
+            guard = self._guard(transition["when"], f"{at}.when") if "when" in transition else None
+            log = transition.get("log")
+            if log is not None:
+                if set(log) - {"outcome", "notes"} or not isinstance(log.get("outcome"), str):
+                    raise RulesetError(f"{at}.log: a log entry has an 'outcome' and optionally 'notes'")
+                log = (log["outcome"], self._texts(log.get("notes", []), f"{at}.log.notes"))
+            target = targets[0]
+            value = transition[target]
+            if target == "goto" and value not in self.ruleset["states"]:
+                raise RulesetError(f"{at}: unknown state {value!r}")
+            if target == "incomplete" and value not in self.ruleset["messages"]:
+                raise RulesetError(f"{at}: unknown message {value!r}")
+            if target == "verdict":
+                if value.get("verdict") not in self.ruleset["verdicts"]:
+                    raise RulesetError(f"{at}: unknown verdict {value.get('verdict')!r}")
+                if set(value) - {"verdict", "rationale", "summary", "notes"} or not value.get("rationale"):
+                    raise RulesetError(f"{at}: a verdict has a rationale and optionally a summary and notes")
+                value = (
+                    self.ruleset["verdicts"][value["verdict"]],
+                    self._texts(value["rationale"], f"{at}.verdict.rationale"),
+                    value.get("summary"),
+                    self._texts(value.get("notes", []), f"{at}.verdict.notes"),
+                )
+            compiled.append((guard, log, target, value))
+            rule_reads = guard.reads if guard else 0
+            texts = (log[1] if log else []) + (value[1] + value[3] if target == "verdict" else [])
+            for note_guard, text in texts:
+                rule_reads |= note_guard.reads if note_guard else 0
+                if "{" in text:
+                    rule_reads |= self._template_reads(text)
+            self.rules[at] = rule_reads
+            reads |= rule_reads
+        return spec["stage"], self.ruleset["steps"][spec["step"]]["log"], compiled, reads
+
+    def _template_reads(self, text):
+        reads = 0
+        for _, field, _, _ in string.Formatter().parse(text):
+            if field and "[" in field:
+                reads |= sum(bit for bit, _ in self.groups[field[field.index("[") + 1 : -1]])
+        return reads
+
+    def _check_graph(self):
+        # Every state must be reachable from the start and none may lead back
+        # to itself.
+        reached, path = set(), []
+
+        def visit(name):
+            if name in path:
+                raise RulesetError(f"states: cycle {' -> '.join(path[path.index(name):] + [name])}")
+            if name in reached:
+                return
+            reached.add(name)
+            path.append(name)
+            for _, _, target, value in self.states[name][2]:
+                if target == "goto":
+                    visit(value)
+            path.pop()
+
+        visit(self.start)
+        unreachable = sorted(set(self.states) - reached)
+        if unreachable:
+            raise RulesetError(f"states: unreachable from {self.start!r}: {unreachable}")
+
+    # -------- Evaluation
+    def _render(self, text, key):
+        if "{" not in text:
+            return text
+        return text.format(selected=_Names(key, self.groups, True), missing=_Names(key, self.groups, False))
+
+    def _notes(self, notes, key):
+        return [self._render(text, key) for guard, text in notes if guard is None or guard.test(key, self.knowledge_mask)]
+
+    def _step(self, name, key):
+        stage, step, transitions, reads = self.states[name]
+        memo_key = (name, key & reads)
+        outcome = self._memo.get(memo_key)
+        if outcome is not None:
+            return outcome
+        for index, (guard, log, target, value) in enumerate(transitions):
+            if guard is None or guard.test(key, self.knowledge_mask):
+                break
+        self.taken.add((name, index))
+        self.visits.append((name, key))
+        intern = self.intern
+        entry = intern((step, log[0], intern(tuple(self._notes(log[1], key))))) if log else None
+        if target == "verdict":
+            verdict, rationale, summary, notes = value
+            rationale = intern(tuple(self._notes(rationale, key)))
+            # The final decision log entry; its notes default to the rationale.
+            notes = intern(tuple(self._notes(notes, key))) or rationale
+            value = (verdict, rationale, summary, intern((self.final_step, verdict, notes)))
+        outcome = self._memo[memo_key] = (stage, entry, target, value, index)
+        return outcome
+
+    def run(self, key):
+        # (verdict, rationale, decision log, stage, summary, message); verdict
+        # is None when the answers are incomplete, and a verdict's log ends
+        # with the final entry.
+        log, name = [], self.start
+        while True:
+            stage, entry, target, value, _ = self._step(name, key)
+            if entry is not None:
+                log.append(entry)
+            if target == "goto":
+                name = value
+            elif target == "incomplete":
+                message = self.ruleset["messages"][value]
+                return None, (message,), tuple(log), stage, None, message
+            else:
+                verdict, rationale, summary, final_entry = value
+                log.append(final_entry)
+                return verdict, rationale, tuple(log), stage, summary, None
+
+    def path(self, key):
+        # The (state, transition index) pairs ``key`` takes; the rule names in
+        # ``rules`` are ``states.<state>.transitions[<index>]``.
+        steps, name = [], self.start
+        while True:
+            _, _, target, value, index = self._step(name, key)
+            steps.append((name, index))
+            if target != "goto":
+                return steps
+            name = value
+
+    def unused(self):
+        return [
+            f"states.{name}.transitions[{index}]"
+            for name, (_, _, transitions, _) in self.states.items()
+            for index in range(len(transitions))
+            if (name, index) not in self.taken
+        ]
@@ -0,0 +1,270 @@
+import datetime as dt
+import json
+import sqlite3
+import threading
+import time
+
+IDLE_TIMEOUT = 30 * 60
+SWEEP_INTERVAL = 60
+CHECKPOINT_INTERVAL = 2.0
+STORE_TTL = 7 * 24 * 60 * 60
+
+
+def _isoformat(recorded_at):
+    return dt.datetime.fromtimestamp(recorded_at, dt.timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+
+class DecisionEntry:
+    # One line of a session's decision log. ``decision`` is the classifier's
+    # interned ``(step, outcome, notes)`` tuple, shared by every session that
+    # recorded the same outcome, so an entry costs one object and a float.
+    __slots__ = ("decision", "recorded_at")
+
+    def __init__(self, decision, recorded_at=None):
+        self.decision = decision
+        self.recorded_at = time.time() if recorded_at is None else recorded_at
+
+    @property
+    def step(self):
+        return self.decision[0]
+
+    @property
+    def outcome(self):
+        return self.decision[1]
+
+    @property
+    def notes(self):
+        return self.decision[2]
+
+    @property
+    def timestamp(self):
+        return _isoformat(self.recorded_at)
+
+    def as_dict(self):
+        step, outcome, notes = self.decision
+        return {"timestamp": self.timestamp, "step": step, "outcome": outcome, "notes": list(notes)}
+
+
+class SessionState:
+    # ``answers`` is the classifier's answer bitmask; see classifier.decode().
+    __slots__ = ("answers", "decision_log", "stored_key", "last_seen")
+
+    def __init__(self):
+        self.answers = 0
+        self.decision_log = []
+        self.stored_key = None
+        self.last_seen = time.monotonic()
+
+
+def dump_state(state):
+    return json.dumps(
+        {
+            "answers": state.answers,
+            "stored_key": state.stored_key,
+            "log": [[*entry.decision, entry.recorded_at] for entry in state.decision_log],
+        },
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+
+
+def load_state(text):
+    data = json.loads(text)
+    state = SessionState()
+    state.answers = data["answers"]
+    state.stored_key = data["stored_key"]
+    state.decision_log = [
+        DecisionEntry((step, outcome, tuple(notes)), recorded_at) for step, outcome, notes, recorded_at in data["log"]
+    ]
+    return state
+
+
+# -------- Session stores
+# A store shares checkpointed sessions between the app's processes, so any of
+# them can resume any session. It needs ``load(session_id)`` returning the
+# text saved by ``save([(session_id, dump_state(state)), ...])``, or None, and
+# ``close()``.
+class SQLiteSessionStore:
+    # Reference store for processes on one host or a shared volume. Sessions
+    # not checkpointed for ``ttl`` seconds are deleted as later batches are
+    # written.
+
+    def __init__(self, path, ttl=STORE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+            """
+        )
+        self._writer.commit()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def load(self, session_id):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        row = connection.execute(
+            "SELECT state FROM sessions WHERE id = ? AND updated_at >= ?", (session_id, time.time() - self.ttl)
+        ).fetchone()
+        return row[0] if row else None
+
+    def save(self, rows):
+        now = time.time()
+        with self._lock, self._writer:
+            self._writer.executemany(
+                "INSERT INTO sessions (id, state, updated_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                [(session_id, text, now) for session_id, text in rows],
+            )
+            self._writer.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl,))
+
+    def close(self):
+        with self._lock:
+            self._writer.close()
+
+
+class SessionRegistry:
+    # Wizard state of every session in the process. Sessions untouched for
+    # ``idle_timeout`` seconds are dropped by a sweep that runs on access, at
+    # most once every ``sweep_interval`` seconds.
+    #
+    # With a ``store``, sessions marked by checkpoint() are written to it in
+    # one batch ``checkpoint_interval`` seconds after the first mark, so a
+    # session costs at most one write per interval however often it changes,
+    # and get() falls back to the store for sessions this process has not seen
+    # or has evicted.
+
+    def __init__(
+        self,
+        idle_timeout=IDLE_TIMEOUT,
+        sweep_interval=SWEEP_INTERVAL,
+        store=None,
+        checkpoint_interval=CHECKPOINT_INTERVAL,
+    ):
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self.store = store
+        self.checkpoint_interval = checkpoint_interval
+        self.evicted = 0
+        self.resumed = 0
+        self.checkpoints = 0
+        self.checkpointed = 0
+        self._sessions = {}
+        self._dirty = {}
+        self._timer = None
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def get(self, session_id):
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep_locked(now)
+            state = self._sessions.get(session_id)
+            if state is not None:
+                state.last_seen = now
+                return state
+            # Not yet checkpointed, but evicted by the sweep above.
+            state = self._dirty.get(session_id)
+            if state is not None:
+                state.last_seen = now
+                self._sessions[session_id] = state
+                return state
+        if self.store is None:
+            return None
+        text = self.store.load(session_id)
+        if text is None:
+            return None
+        with self._lock:
+            state = self._sessions.setdefault(session_id, load_state(text))
+            self.resumed += 1
+            return state
+
+    def create(self, session_id):
+        state = SessionState()
+        with self._lock:
+            self._sessions[session_id] = state
+        return state
+
+    def copy(self, session_id, new_session_id):
+        # A new session that starts from ``session_id``'s answers, decision
+        # log and stored marker, or None when that session is unknown. The
+        # entries are shared: logs only ever replace them.
+        state = self.get(session_id)
+        if state is None:
+            return None
+        copy = self.create(new_session_id)
+        copy.answers = state.answers
+        copy.decision_log = list(state.decision_log)
+        copy.stored_key = state.stored_key
+        return copy
+
+    def discard(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._dirty.pop(session_id, None)
+
+    # -------- Checkpoints
+    def checkpoint(self, session_id):
+        if self.store is None:
+            return
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                return
+            self._dirty[session_id] = state
+            if self._timer is None:
+                self._timer = threading.Timer(self.checkpoint_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        # States are serialised under the lock and written outside it, so
+        # sessions are not held up by the store.
+        with self._save_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                batch, self._dirty = self._dirty, {}
+                rows = [(session_id, dump_state(state)) for session_id, state in batch.items()]
+            self.store.save(rows)
+            self.checkpoints += 1
+            self.checkpointed += len(rows)
+
+    def close(self):
+        if self.store is not None:
+            self.flush()
+            self.store.close()
+
+    def sweep(self):
+        with self._lock:
+            self._sweep_locked(time.monotonic())
+
+    def _sweep_locked(self, now):
+        cutoff = now - self.idle_timeout
+        idle = [session_id for session_id, state in self._sessions.items() if state.last_seen < cutoff]
+        for session_id in idle:
+            del self._sessions[session_id]
+        self.evicted += len(idle)
+        self._next_sweep = now + self.sweep_interval
+
+    def __len__(self):
+        return len(self._sessions)
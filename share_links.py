@@ -0,0 +1,44 @@
+from classifier import RULESET, decode, from_token, to_token
+
+# ``?a=<token>`` carries the wizard's answer mask (classifier.to_token). The
+# app writes it after every step and, before the first widget of a session is
+# created, copies a link's answers into the widget keys, so the link opens with
+# every step filled in and the verdict shown in a single run.
+PARAM = "a"
+_YES, _NO = RULESET["questions"]["optimization_only"]["options"]
+
+
+def widget_values(answers):
+    # Widget key -> value for a classifier.decode() answers dict.
+    techniques = answers.get("ai_techniques", {})
+    generation = techniques.get("generation_indicators", {})
+    return {
+        **{f"step1_{key}": value for key, value in answers["non_ai_categories"].items()},
+        **{f"step2_{key}": value for key, value in techniques.items() if key != "generation_indicators"},
+        **{"g_none" if key == "none_applies" else f"g_{key}": value for key, value in generation.items()},
+        "step3_optimization_only": _YES if answers.get("optimization_only") else _NO,
+        **{f"step3_{key}": value for key, value in answers.get("optimization_conditions", {}).items()},
+    }
+
+
+def restore(query_params, session_state):
+    # False when the link's token cannot be restored; it is dropped from the URL.
+    token = query_params.get(PARAM)
+    if not token:
+        return True
+    try:
+        mask = from_token(token)
+    except ValueError:
+        del query_params[PARAM]
+        return False
+    session_state.update(widget_values(decode(mask)))
+    return True
+
+
+def update(query_params, mask):
+    if not mask:
+        query_params.pop(PARAM, None)
+        return
+    token = to_token(mask)
+    if query_params.get(PARAM) != token:
+        query_params[PARAM] = token
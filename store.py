@@ -0,0 +1,323 @@
+import collections
+import datetime as dt
+import json
+import sqlite3
+import threading
+
+from classifier import FLAGS, RULESET_VERSION, encode, evaluate_mask, flag_names
+from exports import answers_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    id INTEGER PRIMARY KEY,
+    recorded_at TEXT NOT NULL,
+    ruleset_version TEXT NOT NULL,
+    verdict TEXT NOT NULL,
+    answers_key TEXT NOT NULL,
+    answers_mask INTEGER NOT NULL,
+    rationale TEXT NOT NULL,
+    answers TEXT NOT NULL,
+    decision_log TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assessments_recorded_at ON assessments (recorded_at);
+CREATE INDEX IF NOT EXISTS assessments_verdict ON assessments (verdict);
+CREATE INDEX IF NOT EXISTS assessments_ruleset ON assessments (ruleset_version);
+CREATE INDEX IF NOT EXISTS assessments_answers_key ON assessments (answers_key);
+CREATE INDEX IF NOT EXISTS assessments_ruleset_mask ON assessments (ruleset_version, answers_mask, verdict);
+
+CREATE TABLE IF NOT EXISTS flags (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS assessment_flags (
+    flag_id INTEGER NOT NULL REFERENCES flags (id),
+    assessment_id INTEGER NOT NULL REFERENCES assessments (id),
+    PRIMARY KEY (flag_id, assessment_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS daily_counts (
+    day TEXT NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, name)
+) WITHOUT ROWID;
+"""
+
+COLUMNS = "a.id, a.recorded_at, a.ruleset_version, a.verdict, a.rationale, a.answers, a.decision_log"
+RAW_COLUMNS = "a.id, a.recorded_at, a.ruleset_version, a.verdict, a.answers_mask, a.rationale, a.decision_log"
+
+
+def _now():
+    return dt.datetime.utcnow().isoformat() + "Z"
+
+
+def counter_names(verdict, mask):
+    # The daily counters one assessment adds to: its verdict, the step the
+    # wizard stopped at and every answer flag it set.
+    names = [f"verdict:{verdict}", f"stage:{evaluate_mask(mask).stage}"]
+    names += [f"answer:{name}" for name in flag_names(mask)]
+    return names
+
+
+def _row_to_assessment(row):
+    assessment_id, recorded_at, ruleset_version, verdict, rationale, answers, decision_log = row
+    return {
+        "id": assessment_id,
+        "recorded_at": recorded_at,
+        "ruleset_version": ruleset_version,
+        "result": verdict,
+        "rationale": json.loads(rationale),
+        "answers": json.loads(answers),
+        "decision_log": json.loads(decision_log),
+    }
+
+
+class AssessmentStore:
+    # Writes are buffered and committed in one transaction once
+    # ``batch_size`` assessments are pending, or ``flush_interval`` seconds
+    # after the first one was buffered. Reads use one connection per thread so
+    # they never wait on the writer (WAL mode).
+
+    def __init__(self, path, batch_size=100, flush_interval=2.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._timer = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.executescript(SCHEMA)
+        self._writer.executemany(
+            "INSERT OR IGNORE INTO flags (name) VALUES (?)", [(name,) for name in FLAGS]
+        )
+        self._writer.commit()
+        self._flag_ids = dict(self._writer.execute("SELECT name, id FROM flags"))
+        if self._writer.execute(
+            "SELECT NOT EXISTS (SELECT 1 FROM daily_counts) AND EXISTS (SELECT 1 FROM assessments)"
+        ).fetchone()[0]:
+            self.rebuild_counts()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _reader(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    # -------- Writes
+    def add(self, assessment, recorded_at=None, key=None):
+        # Serialise now: the caller may keep mutating the dicts it passed in.
+        # ``key`` is answers_key(answers) when the caller already has it.
+        answers = assessment["answers"]
+        mask = encode(answers)
+        row = (
+            recorded_at or _now(),
+            assessment.get("ruleset_version", RULESET_VERSION),
+            assessment["result"],
+            key or answers_key(answers),
+            mask,
+            json.dumps(assessment.get("rationale", []), ensure_ascii=False),
+            json.dumps(answers, ensure_ascii=False),
+            json.dumps(assessment.get("decision_log", []), ensure_ascii=False),
+        )
+        flag_ids = [self._flag_ids[name] for name in flag_names(mask)]
+        with self._lock:
+            self._pending.append((row, flag_ids))
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+            else:
+                self._start_timer()
+
+    def _start_timer(self):
+        if self._timer is None and self._pending:
+            self._timer = threading.Timer(self.flush_interval, self._timed_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _timed_flush(self):
+        # Nobody is waiting on the timer thread to see the error, so it is kept
+        # in ``last_error`` and the batch is retried after another interval.
+        with self._lock:
+            try:
+                self._flush_locked()
+            except Exception as exc:
+                self.last_error = repr(exc)
+                self._start_timer()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        counts = collections.Counter()
+        try:
+            with self._writer:
+                for row, flag_ids in batch:
+                    cursor = self._writer.execute(
+                        "INSERT INTO assessments (recorded_at, ruleset_version, verdict, answers_key, answers_mask,"
+                        " rationale, answers, decision_log) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        row,
+                    )
+                    self._writer.executemany(
+                        "INSERT INTO assessment_flags (flag_id, assessment_id) VALUES (?, ?)",
+                        [(flag_id, cursor.lastrowid) for flag_id in flag_ids],
+                    )
+                    day = row[0][:10]
+                    for name in counter_names(row[2], row[4]):
+                        counts[day, name] += 1
+                self._add_counts(counts)
+        except BaseException:
+            # The transaction was rolled back; keep the batch for the next flush
+            # rather than losing it (a locked database, a full disk).
+            self._pending[:0] = batch
+            raise
+
+    # -------- Daily counters
+    # Materialised per-day counts of verdicts, stages and answer flags,
+    # updated in the transaction that stores the assessments, so reports on
+    # them read a few rows per day instead of the assessments.
+    def _add_counts(self, counts):
+        self._writer.executemany(
+            "INSERT INTO daily_counts (day, name, count) VALUES (?, ?, ?)"
+            " ON CONFLICT (day, name) DO UPDATE SET count = count + excluded.count",
+            [(day, name, count) for (day, name), count in counts.items()],
+        )
+
+    def rebuild_counts(self):
+        # For stores written before the counters existed, or after editing
+        # assessments by hand; reads each distinct (day, verdict, answers).
+        counts = collections.Counter()
+        with self._lock, self._writer:
+            rows = self._writer.execute(
+                "SELECT substr(recorded_at, 1, 10), verdict, answers_mask, COUNT(*) FROM assessments"
+                " GROUP BY 1, 2, 3"
+            )
+            for day, verdict, mask, count in rows.fetchall():
+                for name in counter_names(verdict, mask):
+                    counts[day, name] += count
+            self._writer.execute("DELETE FROM daily_counts")
+            self._add_counts(counts)
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # -------- Reads
+    def _select(self, columns, verdict, ruleset_version, since, until, flags):
+        # A flag filter drives the query from the (flag_id, assessment_id)
+        # primary key, so results come back in id order without a sort.
+        flag_ids = []
+        for name in flags:
+            try:
+                flag_ids.append(self._flag_ids[name])
+            except KeyError:
+                raise ValueError(f"Unknown answer flag: {name!r}") from None
+
+        clauses, params = [], []
+        if flag_ids:
+            sql = f"SELECT {columns} FROM assessment_flags f JOIN assessments a ON a.id = f.assessment_id"
+            clauses.append("f.flag_id = ?")
+            params.append(flag_ids[0])
+        else:
+            sql = f"SELECT {columns} FROM assessments a"
+        for flag_id in flag_ids[1:]:
+            clauses.append("EXISTS (SELECT 1 FROM assessment_flags WHERE flag_id = ? AND assessment_id = a.id)")
+            params.append(flag_id)
+        if verdict is not None:
+            clauses.append("a.verdict = ?")
+            params.append(verdict)
+        if ruleset_version is not None:
+            clauses.append("a.ruleset_version = ?")
+            params.append(ruleset_version)
+        if since is not None:
+            clauses.append("a.recorded_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("a.recorded_at < ?")
+            params.append(until)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        order = "f.assessment_id" if flag_ids else "a.id"
+        return sql, params, order
+
+    def get(self, assessment_id):
+        row = self._reader().execute(
+            f"SELECT {COLUMNS} FROM assessments a WHERE a.id = ?", (assessment_id,)
+        ).fetchone()
+        return _row_to_assessment(row) if row else None
+
+    def query(self, verdict=None, ruleset_version=None, since=None, until=None, flags=(), limit=None):
+        # Most recently stored first; rows are decoded one at a time as the
+        # caller iterates, so any result size runs in constant memory.
+        sql, params, order = self._select(COLUMNS, verdict, ruleset_version, since, until, flags)
+        sql += f" ORDER BY {order} DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for row in self._reader().execute(sql, params):
+            yield _row_to_assessment(row)
+
+    def query_raw(self, verdict=None, ruleset_version=None, since=None, until=None, flags=()):
+        # query() as (id, recorded_at, ruleset_version, verdict, answers_mask,
+        # rationale, decision_log) rows with the last two still JSON text, for
+        # readers that decode only what they need.
+        sql, params, order = self._select(RAW_COLUMNS, verdict, ruleset_version, since, until, flags)
+        return self._reader().execute(f"{sql} ORDER BY {order} DESC", params)
+
+    def verdicts_by_mask(self, ruleset_version):
+        # (answers_mask, verdict, count) for every distinct answer set stored
+        # under ``ruleset_version``, read from the index without the rows.
+        return self._reader().execute(
+            "SELECT answers_mask, verdict, COUNT(*) FROM assessments WHERE ruleset_version = ?"
+            " GROUP BY answers_mask, verdict",
+            (ruleset_version,),
+        )
+
+    def with_masks(self, ruleset_version, masks, batch_size=500):
+        # (id, recorded_at, verdict, answers_mask) of the assessments stored
+        # under ``ruleset_version`` with one of ``masks``, by index lookups, in
+        # no particular order (sorting by id would make SQLite scan the
+        # version instead).
+        masks = sorted(masks)
+        for start in range(0, len(masks), batch_size):
+            batch = masks[start : start + batch_size]
+            yield from self._reader().execute(
+                "SELECT id, recorded_at, verdict, answers_mask FROM assessments"
+                f" WHERE ruleset_version = ? AND answers_mask IN ({', '.join('?' * len(batch))})",
+                (ruleset_version, *batch),
+            )
+
+    def daily_counts(self, since=None, until=None):
+        # (day, name, count) rows of the materialised counters for the days
+        # from ``since`` up to, not including, ``until`` (ISO dates).
+        sql, params = "SELECT day, name, count FROM daily_counts", []
+        if since is not None:
+            sql += " WHERE day >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND day < ?" if params else " WHERE day < ?"
+            params.append(until)
+        return self._reader().execute(sql + " ORDER BY day", params)
+
+    def count(self, verdict=None, ruleset_version=None, since=None, until=None, flags=()):
+        sql, params, _ = self._select("COUNT(*)", verdict, ruleset_version, since, until, flags)
+        return self._reader().execute(sql, params).fetchone()[0]
@@ -1,248 +1,246 @@
-import json
+import atexit
+import contextlib
 import datetime as dt
+import functools
+import hashlib
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import streamlit as st
 
+import dashboard
+import inventory
+import share_links
+from audit import BATCH_SIZE, FSYNC_INTERVAL, AuditLog, decision_event, verdict_event
+from bulk_export import export_bytes
+from classifier import (
+    AI_MODEL_KNOWLEDGE_OPTIONS,
+    AI_SYSTEM,
+    LIKELY_NOT_AI_SYSTEM,
+    ML_TECHNIQUES,
+    RULESET,
+    STEP1_ANSWERS,
+    STEP2_ANSWERS,
+    STEP3_ANSWERS,
+    decode,
+    encode,
+    evaluate_mask,
+)
+from exports import cached_result, json_export, markdown_export, result_cache
+from profiling import Profiler
+from sessions import IDLE_TIMEOUT, DecisionEntry, SessionRegistry, SQLiteSessionStore
+from store import AssessmentStore
+from traces import TraceRecorder
+
 st.set_page_config(page_title="AI System Classifier (EU AI Act-aligned)", page_icon="🤖", layout="centered")
 
 
-def inject_custom_css():
-    st.markdown(
-        """
-        <style>
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-
-        :root {
-            --primary-bg: #f5f7fb;
-            --primary-text: #1f2933;
-            --accent: #2563eb;
-            --muted-text: #4b5563;
-            --card-bg: #ffffff;
-            --divider: #e5e7eb;
-        }
+# -------- Profiling
+# Opt in with ``?profile=1`` or ``APP_PROFILE=1``. Timings are shared by all
+# sessions and appended to ``APP_PROFILE_TRACE`` (JSON lines).
+@st.cache_resource
+def profiler():
+    profiler = Profiler(os.environ.get("APP_PROFILE_TRACE", "profile_trace.jsonl"))
+    atexit.register(profiler.close)
+    return profiler
 
-        .stApp {
-            background-color: var(--primary-bg);
-            color: var(--primary-text);
-            font-family: 'Inter', sans-serif;
-        }
 
-        section.main > div {
-            padding: 1.5rem 2.5rem 4rem;
-            background: linear-gradient(180deg, rgba(255,255,255,0.95) 0%, rgba(245,247,251,0.9) 100%);
-            border-radius: 24px;
-            box-shadow: 0 20px 45px rgba(15, 23, 42, 0.05);
-            border: 1px solid rgba(226, 232, 240, 0.9);
-        }
+def profiling_enabled():
+    return os.environ.get("APP_PROFILE") == "1" or st.query_params.get("profile") == "1"
 
-        h1, h2, h3 {
-            font-weight: 700 !important;
-            letter-spacing: -0.01em;
-            color: var(--primary-text);
-        }
 
-        .stMarkdown p, .stMarkdown li {
-            font-size: 1rem;
-            line-height: 1.6;
-            color: var(--muted-text);
-        }
+def timed(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiling_enabled():
+                return func(*args, **kwargs)
+            session = st.session_state.setdefault("profile_session", uuid.uuid4().hex[:8])
+            with profiler().section(name, session):
+                return func(*args, **kwargs)
 
-        .st-expander {
-            border: 1px solid rgba(37, 99, 235, 0.15) !important;
-            border-radius: 16px !important;
-            background: rgba(37, 99, 235, 0.05) !important;
-        }
+        return wrapper
 
-        .stExpanderHeader {
-            font-weight: 600;
-            color: var(--accent);
-        }
+    return decorator
 
-        .stRadio > div, .stCheckbox > label {
-            font-size: 0.98rem;
-            font-weight: 500;
-        }
-
-        .stCheckbox:hover, .stRadio:hover {
-            background: rgba(37, 99, 235, 0.04);
-            border-radius: 12px;
-            transition: background 0.2s ease;
-        }
-
-        [data-testid="stCheckbox"] > label {
-            align-items: flex-start;
-            gap: 0.35rem;
-        }
 
-        .st-key-g_complex_predictions [data-testid="stCheckbox"],
-        .st-key-g_recommendations [data-testid="stCheckbox"],
-        .st-key-g_content [data-testid="stCheckbox"],
-        .st-key-g_decisions [data-testid="stCheckbox"],
-        .st-key-step1_unable_to_verify [data-testid="stCheckbox"],
-        .st-key-step2_unable_to_verify [data-testid="stCheckbox"] {
-            padding: 0.85rem 1rem;
-            border-radius: 14px;
-            border: 1px solid rgba(37, 99, 235, 0.15);
-            background: rgba(37, 99, 235, 0.05);
-            transition: border 0.2s ease, background 0.2s ease, box-shadow 0.2s ease;
-            margin-bottom: 0.75rem;
-        }
-
-        .st-key-g_complex_predictions [data-testid="stCheckbox"]:hover,
-        .st-key-g_recommendations [data-testid="stCheckbox"]:hover,
-        .st-key-g_content [data-testid="stCheckbox"]:hover,
-        .st-key-g_decisions [data-testid="stCheckbox"]:hover,
-        .st-key-step1_unable_to_verify [data-testid="stCheckbox"]:hover,
-        .st-key-step2_unable_to_verify [data-testid="stCheckbox"]:hover {
-            border-color: rgba(37, 99, 235, 0.35);
-            background: rgba(37, 99, 235, 0.08);
-            box-shadow: 0 10px 20px rgba(37, 99, 235, 0.08);
-        }
+def render_profile_panel():
+    if not profiling_enabled():
+        return
+    with st.sidebar:
+        st.markdown("### Rerun profile")
+        st.caption(
+            "Milliseconds per section over the last runs of every session, excluding nested sections. "
+            "Step reruns are counted; the table refreshes on full reruns."
+        )
+        st.dataframe(profiler().summary(), hide_index=True, use_container_width=True)
+        stats = result_cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        st.caption(
+            f"Result cache: {stats['size']}/{stats['maxsize']} entries, "
+            f"{stats['hits']} hits, {stats['misses']} misses"
+            + (f" ({stats['hits'] / lookups:.0%} hit rate)" if lookups else "")
+            + f", {stats['evictions']} evictions."
+        )
+        audit = audit_log().stats()
+        st.caption(
+            f"Audit log: {audit['written']} events written in {audit['batches']} batches, {audit['fsyncs']} fsyncs, "
+            f"queue {audit['depth']}/{audit['queue_size']} (peak {audit['max_depth']}), {audit['dropped']} dropped."
+        )
+        registry = session_registry()
+        if registry.store:
+            st.caption(
+                f"Session store: {registry.checkpointed} session writes in {registry.checkpoints} checkpoints, "
+                f"{registry.resumed} sessions resumed."
+            )
+        st.button("Refresh", key="profile-refresh")
 
-        .st-key-g_complex_predictions [data-testid="stCheckbox"] > label,
-        .st-key-g_recommendations [data-testid="stCheckbox"] > label,
-        .st-key-g_content [data-testid="stCheckbox"] > label,
-        .st-key-g_decisions [data-testid="stCheckbox"] > label,
-        .st-key-step1_unable_to_verify [data-testid="stCheckbox"] > label,
-        .st-key-step2_unable_to_verify [data-testid="stCheckbox"] > label {
-            gap: 0.25rem;
-        }
 
-        .st-key-g_complex_predictions [data-testid="stCheckbox"] > label p,
-        .st-key-g_recommendations [data-testid="stCheckbox"] > label p,
-        .st-key-g_content [data-testid="stCheckbox"] > label p,
-        .st-key-g_decisions [data-testid="stCheckbox"] > label p,
-        .st-key-step1_unable_to_verify [data-testid="stCheckbox"] > label p,
-        .st-key-step2_unable_to_verify [data-testid="stCheckbox"] > label p {
-            margin: 0;
-            font-size: 0.92rem;
-            color: var(--muted-text);
-            line-height: 1.55;
-        }
+# -------- Styles
+# The stylesheet and fonts live in static/ and are served by Streamlit
+# (server.enableStaticServing) so browsers cache them. Each run only re-emits
+# the <link> tags; the version query changes whenever a file does.
+STATIC_DIR = Path(__file__).resolve().parent / "static"
 
-        .st-key-g_complex_predictions [data-testid="stCheckbox"] > label p strong,
-        .st-key-g_recommendations [data-testid="stCheckbox"] > label p strong,
-        .st-key-g_content [data-testid="stCheckbox"] > label p strong,
-        .st-key-g_decisions [data-testid="stCheckbox"] > label p strong,
-        .st-key-step1_unable_to_verify [data-testid="stCheckbox"] > label p strong,
-        .st-key-step2_unable_to_verify [data-testid="stCheckbox"] > label p strong {
-            display: block;
-            font-size: 1rem;
-            color: var(--primary-text);
-            margin-bottom: 0.2rem;
-        }
 
-        .st-key-step1_unable_to_verify [data-testid="stCheckbox"] > label,
-        .st-key-step2_unable_to_verify [data-testid="stCheckbox"] > label {
-            font-size: 0.95rem;
-            font-weight: 600;
-            color: var(--primary-text);
-        }
+@st.cache_resource
+def stylesheet_links():
+    # Without the font file the stylesheet falls back to an installed Inter or
+    # the system UI font rather than requesting a missing asset.
+    names = ["app.css"]
+    if (STATIC_DIR / "fonts" / "InterVariable.woff2").exists():
+        names.insert(0, "fonts/inter.css")
+    links = []
+    for name in names:
+        version = hashlib.sha1((STATIC_DIR / name).read_bytes()).hexdigest()[:10]
+        links.append(f'<link rel="stylesheet" href="app/static/{name}?v={version}">')
+    return "".join(links)
 
-        .stDownloadButton button {
-            background: var(--accent);
-            color: #fff;
-            font-weight: 600;
-            border-radius: 999px;
-            padding: 0.75rem 1.5rem;
-            box-shadow: 0 10px 20px rgba(37, 99, 235, 0.25);
-        }
 
-        .stDownloadButton button:hover {
-            background: #1d4ed8;
-        }
+@timed("CSS injection")
+def inject_custom_css():
+    st.markdown(stylesheet_links(), unsafe_allow_html=True)
 
-        .stSuccess, .stInfo, .stWarning {
-            border-radius: 16px;
-            border: none;
-            box-shadow: 0 12px 25px rgba(15, 23, 42, 0.08);
-        }
 
-        .stDivider, hr {
-            border: none;
-            height: 1px;
-            background: var(--divider);
-            margin: 2.5rem 0;
-        }
+inject_custom_css()
 
-        .small-muted {
-            color: var(--muted-text);
-            font-size: 0.9rem;
-        }
 
-        .summary-hint {
-            margin-top: 1rem;
-            padding: 0.85rem 1rem;
-            border-radius: 14px;
-            background: rgba(37, 99, 235, 0.08);
-            border: 1px solid rgba(37, 99, 235, 0.18);
-            color: var(--primary-text);
-            font-weight: 500;
-        }
+# -------- Session state
+# The wizard's answers (a classifier bitmask) and decision log live in a
+# process-wide registry rather than in st.session_state, so sessions left idle
+# for ``SESSION_IDLE_TIMEOUT`` seconds can be evicted. With ``SESSION_STORE``
+# set, they are also checkpointed to that SQLite file and the session id is
+# kept in the URL, so any app process sharing the file can resume them. That
+# URL may be copied to someone else, so a new browser session never takes over
+# the session in it: it continues from a copy under a new id.
+SESSION_PARAM = "s"
 
-        .stDownloadButton, .stButton button {
-            transition: transform 0.2s ease, box-shadow 0.2s ease;
-        }
 
-        .stDownloadButton button:active, .stButton button:active {
-            transform: translateY(1px);
-            box-shadow: 0 6px 10px rgba(37, 99, 235, 0.25);
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
+@st.cache_resource
+def session_registry():
+    path = os.environ.get("SESSION_STORE")
+    registry = SessionRegistry(
+        float(os.environ.get("SESSION_IDLE_TIMEOUT", IDLE_TIMEOUT)), store=SQLiteSessionStore(path) if path else None
     )
+    atexit.register(registry.close)
+    return registry
+
+
+def start_session():
+    # Runs once per browser session, before the first widget is created.
+    registry = session_registry()
+    linked = st.query_params.get(SESSION_PARAM) if registry.store else None
+    session_id = uuid.uuid4().hex
+    state = registry.copy(linked, session_id) if linked else None
+    if state is not None:
+        answers = decode(state.answers, evaluate_mask(state.answers).stage)
+        st.session_state.update(share_links.widget_values(answers))
+    else:
+        registry.create(session_id)
+        if not share_links.restore(st.query_params, st.session_state):
+            st.warning("This link's answers could not be restored; please answer the questions below.")
+    st.session_state.session_id = session_id
+    if registry.store:
+        st.query_params[SESSION_PARAM] = session_id
+        if state is not None:
+            registry.checkpoint(session_id)
+
+
+def wizard_state():
+    registry = session_registry()
+    session_id = st.session_state.get("session_id")
+    state = registry.get(session_id) if session_id else None
+    if state is None:
+        if session_id:
+            # Evicted while idle: a step rerun cannot see the earlier steps'
+            # answers, so rebuild them from the widgets with a full rerun.
+            registry.create(session_id)
+            st.rerun()
+        session_id = st.session_state["session_id"] = uuid.uuid4().hex
+        state = registry.create(session_id)
+    return state
+
+
+# Opt in with ``APP_RECORD_TRACE=<path>``: every session's widget changes are
+# appended there, for benchmarks/session_load.py to replay.
+@st.cache_resource
+def trace_recorder():
+    recorder = TraceRecorder(os.environ["APP_RECORD_TRACE"])
+    atexit.register(recorder.close)
+    return recorder
+
+
+def update_answers(step_answers, answers):
+    # Replace one step's bits of the session's answers with ``answers``.
+    state = wizard_state()
+    if "APP_RECORD_TRACE" in os.environ:
+        trace_recorder().observe(st.session_state.session_id, st.session_state)
+    mask = (state.answers & ~step_answers) | encode(answers)
+    if mask != state.answers:
+        state.answers = mask
+        session_registry().checkpoint(st.session_state.session_id)
+    return evaluate_mask(mask)
 
 
-inject_custom_css()
-
-st.session_state.setdefault("decision_log_entries", [])
-st.session_state["decision_log_entries"].clear()
-decision_log = st.session_state["decision_log_entries"]
-
 # -------- Helpers
-def record_decision(step, outcome, notes=None):
-    entry = {
-        "timestamp": dt.datetime.utcnow().isoformat() + "Z",
-        "step": step,
-        "outcome": outcome,
-        "notes": notes or [],
-    }
-    decision_log.append(entry)
-    return entry
-
-
+@timed("Decision log")
 def render_decision_log():
+    decision_log = wizard_state().decision_log
     if not decision_log:
         return
 
-    st.markdown("### Decision log")
+    # One element for the whole log keeps the number of deltas per rerun
+    # constant however many steps have been recorded.
+    blocks = []
     for entry in decision_log:
         notes_markup = "".join(
             f"<li style='margin-left: 1.25rem; color: var(--muted-text); line-height: 1.5;'>{note}</li>"
-            for note in entry["notes"]
+            for note in entry.notes
         ) or "<li style='margin-left: 1.25rem; color: var(--muted-text); line-height: 1.5;'>No additional notes recorded.</li>"
 
-        st.markdown(
-            """
-            <div style="margin-bottom: 1rem;">
-                <p style="font-weight: 600; margin-bottom: 0.25rem;">{step} — {outcome}</p>
-                <ul style="margin: 0.25rem 0 0; padding-left: 1rem;">{notes}</ul>
-                <p class="small-muted" style="margin-top: 0.35rem;">Recorded at {timestamp}</p>
-            </div>
-            """.format(
-                step=entry["step"],
-                outcome=entry["outcome"],
+        blocks.append(
+            '<div style="margin-bottom: 1rem;">'
+            '<p style="font-weight: 600; margin-bottom: 0.25rem;">{step} — {outcome}</p>'
+            '<ul style="margin: 0.25rem 0 0; padding-left: 1rem;">{notes}</ul>'
+            '<p class="small-muted" style="margin-top: 0.35rem;">Recorded at {timestamp}</p>'
+            "</div>".format(
+                step=entry.step,
+                outcome=entry.outcome,
                 notes=notes_markup,
-                timestamp=entry["timestamp"],
-            ),
-            unsafe_allow_html=True,
+                timestamp=entry.timestamp,
+            )
         )
 
+    st.markdown("### Decision log\n\n" + "".join(blocks), unsafe_allow_html=True)
+
 
 def decision_badge(label, verdict):
-    if verdict == "AI system":
+    if verdict == AI_SYSTEM:
         st.success(f"✅ {label}: **{verdict}**")
-    elif verdict == "Likely not an AI system":
+    elif verdict == LIKELY_NOT_AI_SYSTEM:
         st.info(f"ℹ️ {label}: **{verdict}**")
     else:
         st.warning(f"⚠️ {label}: **{verdict}**")
@@ -260,44 +258,37 @@ def generation_option(key, title, description):
     return st.checkbox(label, key=key)
 
 
-def export_assessment(assessment):
-    payload = {
-        "app": "AI System Classifier (EU AI Act-aligned)",
-        "version": "1.0.0",
-        "timestamp": dt.datetime.utcnow().isoformat() + "Z",
-        "assessment": assessment,
+def generation_indicators(indicators):
+    st.markdown(indicators["label"])
+    flags = {
+        option["key"]: generation_option(f"g_{option['key']}", option["name"], option["help"])
+        for option in indicators["options"]
     }
-    markdown_lines = [
-        "# AI System Classification Summary",
-        "",
-        f"**Result:** {assessment['result']}",
-        "",
-        "## Rationale",
-    ]
-    markdown_lines.extend(f"- {item}" for item in assessment.get("rationale", []))
-    markdown_lines.append("")
-    markdown_lines.append("## Decision log")
-    for entry in assessment.get("decision_log", []):
-        markdown_lines.append(f"### {entry['step']}")
-        markdown_lines.append(f"- **Outcome:** {entry['outcome']}")
-        markdown_lines.append(f"- **Recorded at:** {entry['timestamp']}")
-        notes = entry.get("notes") or ["No additional notes recorded."]
-        markdown_lines.append("- **Notes:**")
-        markdown_lines.extend(f"  - {note}" for note in notes)
-        markdown_lines.append("")
-
-    markdown_payload = "\n".join(markdown_lines)
+    flags["none_applies"] = st.checkbox(indicators["none_applies"]["label"], key="g_none")
+    return flags
+
+
+@timed("Export")
+def export_assessment(assessment):
+    # Both files are rendered only when a download is requested, from
+    # templates shared by every session with the same answers.
+    def json_payload():
+        return json_export(assessment, dt.datetime.utcnow().isoformat() + "Z")
+
+    def markdown_payload():
+        return markdown_export(assessment)
 
     with st.container():
         col_json, col_md = st.columns(2)
         with col_json:
             st.download_button(
                 "⬇️ Download assessment (JSON)",
-                data=json.dumps(payload, indent=2),
+                data=json_payload,
                 file_name="ai_system_classification.json",
                 mime="application/json",
                 use_container_width=True,
                 key="download-json",
+                on_click="ignore",
             )
         with col_md:
             st.download_button(
@@ -307,9 +298,163 @@ def export_assessment(assessment):
                 mime="text/markdown",
                 use_container_width=True,
                 key="download-markdown",
+                on_click="ignore",
             )
 
 
+@st.cache_resource
+def assessment_store():
+    store = AssessmentStore(os.environ.get("ASSESSMENT_DB", "assessments.sqlite3"))
+    atexit.register(store.close)
+    return store
+
+
+# -------- Bulk export
+BULK_FORMATS = {
+    "ndjson": ("NDJSON", "assessments.ndjson", "application/x-ndjson"),
+    "parquet": ("Parquet", "assessments.parquet", "application/vnd.apache.parquet"),
+    "markdown": ("Markdown decision logs (zip)", "assessment_decision_logs.zip", "application/zip"),
+}
+
+
+@st.fragment
+def bulk_export_panel():
+    # A fragment, so picking a period or format does not rerun the wizard.
+    with st.expander("Export stored assessments"):
+        today = dt.date.today()
+        quarter_start = dt.date(today.year, today.month - (today.month - 1) % 3, 1)
+        period = st.date_input("Recorded between", (quarter_start, today), max_value=today, key="bulk-period")
+        fmt = st.selectbox(
+            "Format", list(BULK_FORMATS), format_func=lambda name: BULK_FORMATS[name][0], key="bulk-format"
+        )
+        if len(period) != 2:
+            st.caption("Pick the last day of the period.")
+            return
+        since, until = period[0].isoformat(), (period[1] + dt.timedelta(days=1)).isoformat()
+
+        def payload():
+            store = assessment_store()
+            store.flush()
+            return export_bytes(store.query(since=since, until=until), fmt)
+
+        _, file_name, mime = BULK_FORMATS[fmt]
+        st.download_button(
+            "⬇️ Download",
+            data=payload,
+            file_name=file_name,
+            mime=mime,
+            use_container_width=True,
+            key="bulk-download",
+            on_click="ignore",
+        )
+
+
+# Every decision log entry and stored verdict is appended to rotating JSON
+# lines files in ``AUDIT_LOG_DIR`` by a background thread.
+@st.cache_resource
+def audit_log():
+    log = AuditLog(
+        os.environ.get("AUDIT_LOG_DIR", "audit_logs"),
+        batch_size=int(os.environ.get("AUDIT_BATCH_SIZE", BATCH_SIZE)),
+        fsync_interval=float(os.environ.get("AUDIT_FSYNC_INTERVAL", FSYNC_INTERVAL)),
+    )
+    atexit.register(log.close)
+    return log
+
+
+def store_assessment(assessment, key):
+    # Reruns that land on the same finished assessment must not store it twice.
+    state = wizard_state()
+    if state.stored_key != key:
+        assessment_store().add(assessment, key=key)
+        audit_log().record(verdict_event(st.session_state.session_id, assessment, key))
+        state.stored_key = key
+        session_registry().checkpoint(st.session_state.session_id)
+
+
+def record_outcome(result):
+    # The log survives reruns: entries for leading steps whose outcome did not
+    # change keep their original timestamps, and only the steps after the
+    # first change are dropped and recorded again.
+    decision_log = wizard_state().decision_log
+    kept = 0
+    for entry, decision in zip(decision_log, result.decision_log):
+        if entry.decision != decision:
+            break
+        kept += 1
+    if kept < len(decision_log) or kept < len(result.decision_log):
+        del decision_log[kept:]
+        decision_log.extend(DecisionEntry(decision) for decision in result.decision_log[kept:])
+        session_id = st.session_state.session_id
+        for entry in decision_log[kept:]:
+            audit_log().record(decision_event(session_id, entry))
+        session_registry().checkpoint(session_id)
+
+
+def share_answers(result):
+    # Keep the answers shown so far in the URL (see share_links).
+    share_links.update(st.query_params, encode(decode(wizard_state().answers, result.stage)))
+
+
+@timed("Final decision")
+def render_outcome(result, notice=None):
+    record_outcome(result)
+    share_answers(result)
+    if result.verdict is None:
+        st.info(result.message)
+        st.stop()
+
+    decision_badge("Result", result.verdict)
+    if result.summary:
+        st.markdown(result.summary)
+    else:
+        st.markdown("**Rationale**")
+        for r in result.rationale:
+            st.markdown(f"- {r}")
+    if notice:
+        st.markdown(notice)
+    render_decision_log()
+    state = wizard_state()
+    answers = decode(state.answers, result.stage)
+    cached = cached_result(answers)
+    assessment = {
+        "result": cached.verdict,
+        "rationale": list(cached.rationale),
+        "answers": answers,
+        "decision_log": [entry.as_dict() for entry in state.decision_log],
+    }
+    export_assessment(assessment)
+    store_assessment(assessment, cached.key)
+    st.stop()
+
+
+# -------- Portfolio dashboard
+# Enabled with ``APP_DASHBOARD=1``, then opened with ``?dashboard=1``.
+if os.environ.get("APP_DASHBOARD") == "1" and st.query_params.get("dashboard") == "1":
+    dashboard.render(assessment_store())
+    st.stop()
+
+
+# -------- Inventory upload
+# ``?inventory=1`` classifies an uploaded CSV, xlsx or JSON lines inventory on
+# a pool of ``INVENTORY_WORKERS`` processes shared by every session.
+INVENTORY_WORKERS = int(os.environ.get("INVENTORY_WORKERS", os.cpu_count() or 1))
+
+
+@st.cache_resource
+def inventory_pool():
+    # The server process runs many threads, so workers are spawned rather
+    # than forked.
+    pool = ProcessPoolExecutor(INVENTORY_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    atexit.register(pool.shutdown, cancel_futures=True)
+    return pool
+
+
+if st.query_params.get("inventory") == "1":
+    inventory.render(inventory_pool(), INVENTORY_WORKERS)
+    st.stop()
+
+
 # -------- App header
 st.markdown(
     """
@@ -334,498 +479,181 @@ with st.expander("EU AI Act definition (for reference)"):
         "or decisions that can influence physical or virtual environments."
     )
 
-# -------- Wizard state
-if "answers" not in st.session_state:
-    st.session_state.answers = {}
-
-answers = st.session_state.answers
-
-# -------- Step 1 — Negative scope check (non‑AI categories)
-section_header(
-    "Step 1 — Does your solution fall into any of these categories?",
-)
+# -------- Wizard steps
+# Questions, help texts and messages come from the ruleset the classifier
+# compiled on import.
+QUESTIONS = RULESET["questions"]
+STEPS = RULESET["steps"]
+MESSAGES = RULESET["messages"]
 
-non_ai_labels = {
-    "basic_data_processing_tools": "Basic data processing tools",
-    "classical_heuristic_based": "Classical heuristic-based systems",
-    "simple_prediction_systems": "Simple prediction systems",
-}
 
-c_none = st.checkbox("None applies", help="Select if none of the categories below are relevant.")
-c_basic = st.checkbox(
-    "Basic data processing tools",
-    help="Operate on predefined human instructions; repetitive or rule-based; exactly as programmed.",
-)
-c_heur = st.checkbox(
-    "Classical heuristic‑based systems",
-    help="Solve problems without learning; rely on human-programmed rules/strategies only.",
-)
-c_simple_pred = st.checkbox(
-    "Simple prediction systems",
-    help="Basic statistics (e.g., averages, fixed formulas) without learned models.",
-)
+# With ``?batched=1`` or ``APP_BATCHED_STEPS=1`` each step's questions are a
+# form submitted once, so a step costs one rerun however many answers it
+# takes. Follow-up questions are then shown with the question they depend on
+# and ignored when they do not apply.
+def batched_steps():
+    return os.environ.get("APP_BATCHED_STEPS") == "1" or st.query_params.get("batched") == "1"
 
-st.markdown("---")
-step1_unable_to_verify = st.checkbox("I am not able to verify this", key="step1_unable_to_verify")
 
-answers["non_ai_categories"] = {
-    "none_applies": c_none,
-    "basic_data_processing_tools": c_basic,
-    "classical_heuristic_based": c_heur,
-    "simple_prediction_systems": c_simple_pred,
-    "unable_to_verify": step1_unable_to_verify,
-}
+@contextlib.contextmanager
+def step_inputs(key):
+    # Yields whether the step's widgets are collected in a form.
+    if not batched_steps():
+        yield False
+        return
+    with st.form(key, border=False):
+        yield True
+        st.form_submit_button("Continue")
+
+
+# Each step is a fragment nested in the previous one, so a widget change
+# reruns only its own step and the steps after it instead of the whole app.
+@st.fragment
+@timed("Step 1")
+def step1_negative_scope():
+    section_header(STEPS["step1"]["title"], STEPS["step1"].get("help"))
+    question = QUESTIONS["non_ai_categories"]
+
+    with step_inputs("step1-form"):
+        non_ai_categories = {
+            "none_applies": st.checkbox(
+                question["none_applies"]["label"], help=question["none_applies"].get("help"), key="step1_none_applies"
+            )
+        }
+        for option in question["options"]:
+            non_ai_categories[option["key"]] = st.checkbox(
+                option["label"], help=option.get("help"), key=f"step1_{option['key']}"
+            )
 
-non_ai_selected = any([c_basic, c_heur, c_simple_pred])
-selected_non_ai_labels = [
-    label
-    for key, label in non_ai_labels.items()
-    if answers["non_ai_categories"].get(key)
-]
-
-
-# Early exit option
-if step1_unable_to_verify:
-    notes = ["Unable to verify whether the solution fits a non-AI exclusion."]
-    if selected_non_ai_labels:
-        notes.append("Selections captured for transparency: " + ", ".join(selected_non_ai_labels))
-    record_decision("Step 1 — Negative scope check", "Unable to verify", notes)
-else:
-    if non_ai_selected:
-        notes = ["Selected NON-AI categories: " + ", ".join(selected_non_ai_labels)]
-        record_decision("Step 1 — Negative scope check", "Non-AI category selected", notes)
-        decision_badge("Result", "Likely not an AI system")
-        st.markdown(
-            "- You indicated at least one NON‑AI category.\n"
-            "- These solutions follow predefined human rules and do not infer outputs using AI models."
+        st.markdown("---")
+        non_ai_categories["unable_to_verify"] = st.checkbox(
+            question["unable_to_verify"]["label"], key="step1_unable_to_verify"
         )
-        record_decision("Final verdict", "Likely not an AI system", ["Classification completed at Step 1."])
-        render_decision_log()
-        export_assessment(
-            {
-                "result": "Likely not an AI system",
-                "rationale": [
-                    "Selected NON-AI category during Step 1.",
-                    "These solutions follow predefined human rules and do not infer outputs using AI models.",
-                ],
-                "answers": answers,
-                "decision_log": decision_log,
-            }
-        )
-        st.stop()
-
-    if not c_none:
-        st.info("Select an option to continue the assessment.")
-        st.stop()
-
-    record_decision(
-        "Step 1 — Negative scope check",
-        "No non-AI categories apply",
-        ["Confirmed none of the exclusion categories matched."],
-    )
-
-st.divider()
-
-# -------- Step 2 — AI model development using AI techniques
-section_header(
-    "Step 2 — Was any component of your solution developed using **AI Techniques**?",
-    "This step allows you to confirm if your system uses AI Models, by checking if any of its components was developed using machine learning or logic-and knowledge based techniques.",
-)
-
-generation_labels = {
-    "complex_predictions": "Complex predictions",
-    "recommendations": "Recommendations",
-    "content": "Generative content",
-    "decisions": "Automated decisions",
-}
-
-tech_ml_selected = st.checkbox("Yes, using Machine Learning techniques")
-selected_ml = []
-if tech_ml_selected:
-    selected_ml = st.multiselect(
-        "Select the machine learning techniques used (optional)",
-        options=[
-            "Supervised Learning",
-            "Unsupervised Learning",
-            "Self‑Supervised Learning",
-            "Reinforcement Learning",
-            "Deep Learning",
-        ],
-    )
 
-tech_logic = st.checkbox("Yes, using Logic‑ and Knowledge‑Based Techniques")
-none_selected = st.checkbox("No, None of these techniques was used")
+    # Early exit option
+    result = update_answers(STEP1_ANSWERS, {"non_ai_categories": non_ai_categories})
+    if result.stage == "step1":
+        render_outcome(result)
 
-st.markdown("---")
-step2_unable_to_verify = st.checkbox("I am not able to verify this", key="step2_unable_to_verify")
+    st.divider()
+    step2_ai_techniques()
 
-if step2_unable_to_verify and (tech_ml_selected or tech_logic or none_selected or selected_ml):
-    st.warning("Remove other selections to continue with the 'I am not able to verify this' option.")
 
-answers.setdefault("ai_techniques", {})
+@st.fragment
+@timed("Step 2")
+def step2_ai_techniques():
+    section_header(STEPS["step2"]["title"], STEPS["step2"].get("help"))
+    question = QUESTIONS["ai_techniques"]
 
-if none_selected and (tech_ml_selected or tech_logic or selected_ml):
-    st.warning("Remove other selections if you choose 'None of these techniques is used'.")
+    with step_inputs("step2-form") as batched:
+        tech_ml_selected = st.checkbox(question["ml_selected"]["label"], key="step2_ml_selected")
+        selected_ml = []
+        if tech_ml_selected or batched:
+            selected_ml = st.multiselect(
+                question["ml_techniques"]["label"], options=list(ML_TECHNIQUES), key="step2_ml_techniques"
+            )
 
-answers["ai_techniques"] = {
-    "ml_selected": tech_ml_selected,
-    "ml_techniques": selected_ml,
-    "logic_knowledge_based": tech_logic,
-    "none_selected": none_selected,
-    "unable_to_verify": step2_unable_to_verify,
-}
+        tech_logic = st.checkbox(question["logic_knowledge_based"]["label"], key="step2_logic_knowledge_based")
+        none_selected = st.checkbox(question["none_selected"]["label"], key="step2_none_selected")
 
-selected_tech_notes = []
-if tech_ml_selected:
-    if selected_ml:
-        selected_tech_notes.append("Machine learning techniques identified: " + ", ".join(selected_ml))
-    else:
-        selected_tech_notes.append("Machine learning techniques identified (details not specified).")
-if tech_logic:
-    selected_tech_notes.append("Logic- and knowledge-based techniques identified.")
-
-if step2_unable_to_verify:
-    ai_model_knowledge = st.radio(
-        "Do you know if the solution use AI Models?",
-        options=[
-            "Yes it use an AI Model",
-            "No it does not",
-            "I am not sure",
-        ],
-        index=None,
-    )
-    answers["ai_techniques"]["ai_model_knowledge"] = ai_model_knowledge
+        st.markdown("---")
+        step2_unable_to_verify = st.checkbox(question["unable_to_verify"]["label"], key="step2_unable_to_verify")
+    if not tech_ml_selected:
+        selected_ml = []
 
-    if ai_model_knowledge is None:
-        st.info("Select an option to continue the assessment.")
-        st.stop()
+    if step2_unable_to_verify and (tech_ml_selected or tech_logic or none_selected or selected_ml):
+        st.warning(MESSAGES["unable_with_techniques"])
 
-    if ai_model_knowledge == "Yes it use an AI Model":
-        rationale = [
-            "User confirmed the solution uses an AI Model while unable to verify supporting techniques.",
-            "Seek legal consultation to validate the declaration.",
-        ]
-        record_decision(
-            "Step 2 — AI techniques",
-            "Confirmed AI Model usage",
-            [
-                "Unable to verify specific AI techniques.",
-                "User stated explicitly that an AI Model is used.",
-            ],
-        )
-        decision_badge("Result", "AI system")
-        st.markdown(
-            "- You indicated the solution uses an AI Model.\n"
-            "- It is advisable to seek legal consultation to confirm this assessment."
-        )
-        record_decision("Final verdict", "AI system", rationale)
-        render_decision_log()
-        export_assessment({"result": "AI system", "rationale": rationale, "answers": answers, "decision_log": decision_log})
-        st.stop()
+    if none_selected and (tech_ml_selected or tech_logic or selected_ml):
+        st.warning(MESSAGES["none_with_techniques"])
 
-    if ai_model_knowledge == "No it does not":
-        rationale = [
-            "User indicated the solution does not use an AI Model while unable to verify techniques.",
-            "Seek legal consultation to confirm the declaration.",
-        ]
-        record_decision(
-            "Step 2 — AI techniques",
-            "User denied AI Model usage",
-            [
-                "Unable to verify specific AI techniques.",
-                "User stated the solution does not use an AI Model.",
-            ],
-        )
-        decision_badge("Result", "Likely not an AI system")
-        st.markdown(
-            "- You indicated the solution does **not** use an AI Model.\n"
-            "- It is advisable to seek legal consultation to confirm this assessment."
-        )
-        record_decision("Final verdict", "Likely not an AI system", rationale)
-        render_decision_log()
-        export_assessment(
-            {
-                "result": "Likely not an AI system",
-                "rationale": rationale,
-                "answers": answers,
-                "decision_log": decision_log,
-            }
-        )
-        st.stop()
-
-    st.markdown("Is the solution generating any of the following?")
-    g_complex_predictions = generation_option(
-        "g_complex_predictions",
-        "Complex predictions",
-        "The system generates estimates about an unknown value (the output) from known values supplied to the system (the input). It uncovers complex correlations between variables to make accurate predictions.",
-    )
-    g_recommendations = generation_option(
-        "g_recommendations",
-        "Recommendations",
-        "The system generates suggestions for specific actions, products, or services to users based on their preferences, behaviors, or other data inputs.",
-    )
-    g_content = generation_option(
-        "g_content",
-        "Generative content",
-        "The system produces new material such as text, images, videos, or audio using Generative Pre-trained Transformer (GPT) technologies or other generative models, typically Large Language Models.",
-    )
-    g_decisions = generation_option(
-        "g_decisions",
-        "Automated decisions",
-        "The system reaches conclusions or choices that fully automate processes traditionally handled by human judgement. The decision is produced in the environment surrounding the system without any human intervention.",
-    )
-    g_none = st.checkbox("None applies", key="g_none")
-
-    generation_flags = {
-        "complex_predictions": g_complex_predictions,
-        "recommendations": g_recommendations,
-        "content": g_content,
-        "decisions": g_decisions,
-        "none_applies": g_none,
+    techniques = {
+        "ml_selected": tech_ml_selected,
+        "ml_techniques": selected_ml,
+        "logic_knowledge_based": tech_logic,
+        "none_selected": none_selected,
+        "unable_to_verify": step2_unable_to_verify,
     }
-    answers["ai_techniques"]["generation_indicators"] = generation_flags
-
-    if g_none and any([g_complex_predictions, g_recommendations, g_content, g_decisions]):
-        st.warning("'None applies' cannot be selected together with other options.")
-        st.stop()
-
-    if not g_none and not any([g_complex_predictions, g_recommendations, g_content, g_decisions]):
-        st.info("Select at least one option to continue the assessment.")
-        st.stop()
-
-    if any([g_complex_predictions, g_recommendations, g_content, g_decisions]):
-        selected_generations = [
-            label for key, label in generation_labels.items() if generation_flags.get(key)
-        ]
-        rationale = [
-            "Unable to verify AI techniques but unsure about AI Model usage.",
-            "Generation indicators selected: " + ", ".join(selected_generations),
-            "Seek legal consultation to confirm this assessment.",
-        ]
-        record_decision(
-            "Step 2 — AI techniques",
-            "Generation behaviours observed",
-            [
-                "Unable to verify specific AI techniques or confirm AI Model usage.",
-                "Indicators selected: " + ", ".join(selected_generations),
-            ],
-        )
-        decision_badge("Result", "Likely an AI system")
-        st.markdown(
-            "- Based on your inputs, the solution is **likely an AI system**.\n"
-            "- It is advisable to seek legal consultation to confirm this assessment."
-        )
-        record_decision("Final verdict", "Likely an AI system", rationale)
-        render_decision_log()
-        export_assessment(
-            {
-                "result": "Likely an AI system",
-                "rationale": rationale,
-                "answers": answers,
-                "decision_log": decision_log,
-            }
-        )
-        st.stop()
-
-    if g_none:
-        rationale = [
-            "Unable to verify AI techniques and unsure about AI Model usage.",
-            "No generation indicators were selected.",
-            "Seek legal consultation to confirm this assessment.",
-        ]
-        record_decision(
-            "Step 2 — AI techniques",
-            "No generation indicators",
-            [
-                "Unable to verify specific AI techniques or confirm AI Model usage.",
-                "User indicated none of the generation behaviours apply.",
-            ],
-        )
-        decision_badge("Result", "Likely not an AI system")
-        st.markdown(
-            "- None of the listed generation indicators apply.\n"
-            "- It is advisable to seek legal consultation to confirm this assessment."
-        )
-        record_decision("Final verdict", "Likely not an AI system", rationale)
-        render_decision_log()
-        export_assessment(
-            {
-                "result": "Likely not an AI system",
-                "rationale": rationale,
-                "answers": answers,
-                "decision_log": decision_log,
-            }
-        )
-        st.stop()
-
-has_any_selection = tech_ml_selected or tech_logic or none_selected
-uses_ai_techniques = tech_ml_selected or tech_logic
-
-if none_selected:
-    rationale = [
-        "User selected 'None of these techniques is used'.",
-        "Without AI techniques, the solution is generally not considered an AI system.",
-    ]
-    record_decision(
-        "Step 2 — AI techniques",
-        "No AI techniques declared",
-        ["User confirmed that none of the listed AI techniques are used."],
-    )
-    decision_badge("Result", "Likely not an AI system")
-    st.markdown(
-        "- You selected **None of these techniques is used**.\n"
-        "- Without components developed using AI techniques, a solution is generally **not considered** an AI system."
-    )
-    if selected_ml or tech_logic:
-        st.markdown(
-            "- Remove any other technique selections to avoid conflicting inputs."
-        )
-    record_decision("Final verdict", "Likely not an AI system", rationale)
-    render_decision_log()
-    export_assessment(
-        {"result": "Likely not an AI system", "rationale": rationale, "answers": answers, "decision_log": decision_log}
-    )
-    st.stop()
-
-if not has_any_selection:
-    st.info("Select an option to continue the assessment.")
-    st.stop()
-
-if not uses_ai_techniques:
-    # If no AI techniques are used, then not an AI system (per slide flow)
-    rationale = [
-        "No AI techniques were selected after Step 2 validation.",
-        "Without components developed using AI techniques, the solution is generally not an AI system.",
-    ]
-    record_decision(
-        "Step 2 — AI techniques",
-        "No AI techniques selected",
-        ["Confirmed absence of AI techniques after validation."],
-    )
-    decision_badge("Result", "Likely not an AI system")
-    st.markdown(
-        "- You did **not** select any AI techniques.\n"
-        "- Without components developed using AI techniques, the solution is generally **not** an AI system."
-    )
-    record_decision("Final verdict", "Likely not an AI system", rationale)
-    render_decision_log()
-    export_assessment(
-        {"result": "Likely not an AI system", "rationale": rationale, "answers": answers, "decision_log": decision_log}
+    result = update_answers(STEP2_ANSWERS, {"ai_techniques": techniques})
+
+    if step2_unable_to_verify:
+        with step_inputs("step2-unable-form") as batched:
+            ai_model_knowledge = st.radio(
+                question["ai_model_knowledge"]["label"],
+                options=list(AI_MODEL_KNOWLEDGE_OPTIONS),
+                index=None,
+                key="step2_ai_model_knowledge",
+            )
+            if batched:
+                st.caption(f"Only if the answer is “{AI_MODEL_KNOWLEDGE_OPTIONS[-1]}”:")
+                generation_flags = generation_indicators(question["generation_indicators"])
+        techniques["ai_model_knowledge"] = ai_model_knowledge
+
+        result = update_answers(STEP2_ANSWERS, {"ai_techniques": techniques})
+        if result.stage == "step2":
+            render_outcome(result)
+
+        if not batched:
+            generation_flags = generation_indicators(question["generation_indicators"])
+        g_none = generation_flags["none_applies"]
+        techniques["generation_indicators"] = generation_flags
+
+        result = update_answers(STEP2_ANSWERS, {"ai_techniques": techniques})
+        if g_none and any(value for key, value in generation_flags.items() if key != "none_applies"):
+            record_outcome(result)
+            share_answers(result)
+            st.warning(result.message)
+            st.stop()
+
+        render_outcome(result)
+
+    if result.stage == "step2":
+        conflict_notice = None
+        if none_selected and (selected_ml or tech_logic):
+            conflict_notice = MESSAGES["none_with_techniques_notice"]
+        render_outcome(result, conflict_notice)
+
+    st.divider()
+    step3_optimization_carve_out()
+
+
+@st.fragment
+@timed("Step 3")
+def step3_optimization_carve_out():
+    section_header(STEPS["step3"]["title"], STEPS["step3"].get("help"))
+    question = QUESTIONS["optimization_only"]
+    yes, no = question["options"]
+
+    # Defaults to "No" through session state rather than ``index``, so a
+    # restored answer does not clash with a widget default.
+    st.session_state.setdefault("step3_optimization_only", no)
+    with step_inputs("step3-form") as batched:
+        opt_only = st.radio(question["label"], options=[yes, no], horizontal=True, key="step3_optimization_only")
+
+        conditions = {}
+        if opt_only == yes or batched:
+            if batched:
+                st.caption(f"Only if the answer is “{yes}”:")
+            st.markdown(QUESTIONS["optimization_conditions"]["label"])
+            for option in QUESTIONS["optimization_conditions"]["options"]:
+                conditions[option["key"]] = st.checkbox(
+                    option["label"], help=option.get("help"), key=f"step3_{option['key']}"
+                )
+    if opt_only != yes:
+        conditions = {}
+
+    result = update_answers(
+        STEP3_ANSWERS, {"optimization_only": opt_only == yes, "optimization_conditions": conditions}
     )
-    st.stop()
-
-record_decision(
-    "Step 2 — AI techniques",
-    "AI techniques identified",
-    selected_tech_notes or ["At least one AI technique checkbox was selected."],
-)
-
-st.divider()
-
-# -------- Step 3 — Optimization-only carve-out
-section_header(
-    "Step 3 — Are AI models used **only for mathematical optimization / speed‑up**?",
-    "Mathematical optimization refers to the process of finding the best solution from a set of possible options by maximizing or minimizing a specific objective function, typically under defined constraints.",
-)
 
-opt_only = st.radio("Optimization-only usage?", options=["Yes", "No"], index=1, horizontal=True)
-answers["optimization_only"] = opt_only == "Yes"
+    st.divider()
+    render_outcome(result)
 
-condition_labels = {
-    "supporting_role_only": "Model plays a supporting role only",
-    "fixed_after_deployment": "Model is fixed after deployment",
-    "no_influence_objectives": "Model does not influence system objectives",
-    "outputs_narrowly_scoped": "Outputs remain narrowly scoped",
-    "performance_is_efficiency": "Performance is measured as efficiency gains",
-}
-
-conditions = {}
-if opt_only == "Yes":
-    st.markdown("Select **all** that apply:")
-    conditions["supporting_role_only"] = st.checkbox(
-        "The model plays a supporting role only",
-        help="Trained and used to support one narrowly defined engineering/operational domain. No new reasoning capabilities introduced.",
-    )
-    conditions["fixed_after_deployment"] = st.checkbox(
-        "The model is fixed after deployment",
-        help="No retraining, self‑adaptation, or dynamic updates during operation.",
-    )
-    conditions["no_influence_objectives"] = st.checkbox(
-        "The model does not influence or redefine the system’s objectives",
-        help="Goals/decision criteria remain fully human‑defined and rule‑based.",
-    )
-    conditions["outputs_narrowly_scoped"] = st.checkbox(
-        "The outputs are narrowly scoped",
-        help="No direct triggering of actions in physical/virtual environments; outputs feed deterministic optimisation routines.",
-    )
-    conditions["performance_is_efficiency"] = st.checkbox(
-        "Performance metric is computational efficiency",
-        help="Measured by speed, memory, numerical stability—not prediction accuracy/recommendation/decision quality.",
-    )
-
-answers["optimization_conditions"] = conditions
-
-all_conditions_true = all(conditions.values()) if opt_only == "Yes" else False
-
-selected_condition_labels = [
-    condition_labels[key]
-    for key, value in conditions.items()
-    if value
-]
-missing_condition_labels = [
-    condition_labels[key]
-    for key in condition_labels
-    if not conditions.get(key, False)
-]
-
-if opt_only == "Yes":
-    step3_outcome = "Optimization carve-out evaluated"
-    step3_notes = ["User indicated AI models are used for optimization-only purposes."]
-    if selected_condition_labels:
-        step3_notes.append("Conditions satisfied: " + ", ".join(selected_condition_labels))
-    if not all_conditions_true and missing_condition_labels:
-        step3_notes.append("Conditions not selected: " + ", ".join(missing_condition_labels))
-else:
-    step3_outcome = "Optimization carve-out not claimed"
-    step3_notes = ["User selected 'No' for optimization-only usage."]
-
-record_decision("Step 3 — Optimization carve-out", step3_outcome, step3_notes)
-
-st.divider()
-
-# -------- Final decision logic
-rationale = []
-if opt_only == "Yes" and all_conditions_true:
-    verdict = (
-        "Your solution is a borderline case. It likely falls outside the definition of AI system, "
-        "but it is advisable to seek legal advice to confirm this."
-    )
-    rationale.append(
-        "Optimization‑only usage and **all** optimization carve‑out conditions satisfied. Borderline case—seek legal advice."
-    )
-elif opt_only == "Yes" and not all_conditions_true:
-    verdict = "AI system"
-    rationale.append("Optimization‑only usage **but** not all carve‑out conditions satisfied.")
-else:
-    verdict = "AI system"
-    rationale.append("Uses AI techniques and not limited to optimization‑only carve‑out.")
-
-# Enrich rationale with optional info
-inference_autonomy = answers.get("inference_autonomy", {})
-if inference_autonomy.get("infers_outputs"):
-    rationale.append("Confirms inference from inputs to outputs.")
-if inference_autonomy.get("varying_autonomy"):
-    rationale.append("Operates with varying levels of autonomy (may still be human‑in-the-loop).")
-
-# -------- Display result
-decision_badge("Result", verdict)
-st.markdown("**Rationale**")
-for r in rationale:
-    st.markdown(f"- {r}")
-
-# -------- Export
-record_decision("Final verdict", verdict, rationale)
-render_decision_log()
-assessment = {"result": verdict, "rationale": rationale, "answers": answers, "decision_log": decision_log}
-export_assessment(assessment)
 
+render_profile_panel()
+with st.sidebar:
+    st.markdown("[Classify a whole inventory file](?inventory=1)")
+    bulk_export_panel()
+if "session_id" not in st.session_state:
+    start_session()
+step1_negative_scope()
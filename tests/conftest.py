@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The modules live at the repository root, as for the app and the scripts.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,113 @@
+import json
+import os
+import time
+
+import pytest
+
+import audit
+from audit import AuditLog
+
+
+def event(number):
+    return {"type": "test", "timestamp": 1_780_000_000.0 + number, "number": number}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def read_log(directory):
+    lines = []
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), encoding="utf-8") as handle:
+            lines += [json.loads(line) for line in handle]
+    return lines
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = AuditLog(str(tmp_path), batch_size=4, fsync_interval=0.01, max_bytes=200)
+    yield log
+    log.close()
+
+
+def test_events_are_written_as_json_lines(tmp_path, log):
+    for number in range(10):
+        assert log.record(event(number))
+    log.close()
+    lines = read_log(tmp_path)
+    assert [line["number"] for line in lines] == list(range(10))
+    assert lines[0]["timestamp"] == "2026-05-28T20:26:40Z"
+    stats = log.stats()
+    assert stats["written"] == 10 and stats["dropped"] == 0
+    assert stats["fsyncs"] >= 1
+    assert not log.record(event(10))
+
+
+def test_files_rotate_after_max_bytes(tmp_path, log):
+    for number in range(10):
+        log.record(event(number))
+        wait_for(lambda: log.stats()["written"] == number + 1)
+    log.close()
+    assert len(os.listdir(tmp_path)) > 1
+    assert log.stats()["rotations"] == len(os.listdir(tmp_path)) - 1
+    assert [line["number"] for line in read_log(tmp_path)] == list(range(10))
+
+
+def test_writer_survives_a_rotation_that_cannot_open_the_next_file(tmp_path, log, monkeypatch):
+    log.record(event(0))
+    wait_for(lambda: log.stats()["written"] == 1)
+
+    def no_space(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    # Every write now rotates (the file is over max_bytes after a few events)
+    # or finds no file left to write to.
+    monkeypatch.setattr(audit, "open", no_space, raising=False)
+    log.record({**event(1), "padding": "x" * 200})
+    log.record(event(2))
+    wait_for(lambda: log.stats()["dropped"] == 2)
+    assert "No space left on device" in log.last_error
+    assert log._thread.is_alive()
+
+    monkeypatch.undo()
+    log.record(event(3))
+    log.close()
+    lines = read_log(tmp_path)
+    assert [line["number"] for line in lines if line["type"] == "test"] == [0, 3]
+    assert [line["count"] for line in lines if line["type"] == "dropped"] == [2]
+
+
+def test_writer_survives_an_unexpected_error(tmp_path, log, monkeypatch):
+    encode_json = audit.encode_json
+    failures = []
+
+    def fail_once(value, compact=False):
+        if not failures:
+            failures.append(value)
+            raise RuntimeError("encoder broke")
+        return encode_json(value, compact=compact)
+
+    monkeypatch.setattr(audit, "encode_json", fail_once)
+    log.record(event(0))
+    wait_for(lambda: log.stats()["dropped"] == 1)
+    assert "encoder broke" in log.last_error
+    log.record(event(1))
+    log.close()
+    lines = read_log(tmp_path)
+    assert [line["number"] for line in lines if line["type"] == "test"] == [1]
+    assert [line["count"] for line in lines if line["type"] == "dropped"] == [1]
+
+
+def test_unserialisable_events_are_counted_as_dropped(tmp_path, log):
+    log.record({"type": "test", "number": 0})
+    log.record(event(1))
+    log.close()
+    lines = read_log(tmp_path)
+    assert [line["number"] for line in lines if line["type"] == "test"] == [1]
+    assert log.stats()["dropped"] == 1
+    assert "timestamp" in log.last_error
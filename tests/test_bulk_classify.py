@@ -0,0 +1,120 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import bulk_classify
+from bulk_classify import classify_record, classify_stream, read_records
+from classifier import RULESET_VERSION, SELECT_OPTION, evaluate
+
+EXCLUDED = {"non_ai_categories": {"basic_data_processing_tools": True}}
+CSV_HEADER = "id,system,business_unit,owner,non_ai_categories.none_applies,ai_techniques.ml_selected,"
+CSV_HEADER += "ai_techniques.ml_techniques,optimization_only\n"
+
+
+def records(text, fmt):
+    return list(read_records(io.StringIO(text), fmt))
+
+
+def results(lines):
+    return [json.loads(line) for line in classify_stream(iter(lines), 1, 2)]
+
+
+# -------- JSON lines
+def test_jsonl_reports_unreadable_lines_per_record():
+    text = "\n".join(
+        [
+            json.dumps({"id": "a", "answers": EXCLUDED, "system": "Payroll", "business_unit": "HR", "owner": "x"}),
+            "{not json",
+            "",
+            "[1, 2]",
+            "42",
+            json.dumps(EXCLUDED),
+        ]
+    )
+    (first, broken, listed, number, inline) = records(text, "jsonl")
+    assert first == ("a", EXCLUDED, {"system": "Payroll", "business_unit": "HR"})
+    assert broken[0] == 2 and isinstance(broken[1], json.JSONDecodeError)
+    assert listed[0] == 4 and str(listed[1]) == "Expected a JSON object, got list"
+    assert number[0] == 5 and str(number[1]) == "Expected a JSON object, got int"
+    assert inline == (6, EXCLUDED, {})
+
+
+def test_jsonl_inline_answers_drop_the_other_fields():
+    line = json.dumps({"id": 7, "system": "Scheduler", "note": "legacy", **EXCLUDED})
+    ((record_id, answers, fields),) = records(line, "jsonl")
+    assert (record_id, answers, fields) == (7, EXCLUDED, {"system": "Scheduler"})
+    (result,) = results([(record_id, answers, fields)])
+    assert result["answers"] == EXCLUDED
+
+
+# -------- CSV
+def test_csv_rows_become_answers():
+    text = CSV_HEADER + "s1,Fraud model,Claims,Ann,yes,1,Deep Learning; Supervised Learning,no\n"
+    ((record_id, answers, fields),) = records(text, "csv")
+    assert record_id == "s1"
+    assert fields == {"system": "Fraud model", "business_unit": "Claims"}
+    assert answers == {
+        "non_ai_categories": {"none_applies": True},
+        "ai_techniques": {"ml_selected": True, "ml_techniques": ["Deep Learning", "Supervised Learning"]},
+        "optimization_only": False,
+    }
+
+
+def test_csv_column_that_clashes_with_the_answers_is_a_row_error():
+    text = "ai_techniques,non_ai_categories.basic_data_processing_tools\nyes,yes\n"
+    ((record_id, answers, _),) = records(text, "csv")
+    assert record_id == 1
+    assert isinstance(answers, ValueError)
+    assert "'ai_techniques' clashes" in str(answers)
+
+
+def test_csv_bad_rows_do_not_stop_the_others():
+    text = "id,non_ai_categories.basic_data_processing_tools,ai_techniques.ml_techniques\n"
+    text += "ok,yes,\nbad,no,Astrology\nempty,,\n"
+    ok, bad, empty = results(records(text, "csv"))
+    assert ok["result"] == evaluate(EXCLUDED).verdict
+    assert bad == {"id": "bad", "error": "Unknown machine learning technique: 'Astrology'"}
+    assert empty == {"id": "empty", "error": SELECT_OPTION, "incomplete": True}
+
+
+def test_xlsx_rows_use_the_csv_layout(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    workbook.active.append(["id", "system", "non_ai_categories.basic_data_processing_tools"])
+    workbook.active.append(["x1", "Reports", "yes"])
+    workbook.active.append([None, None, None])
+    workbook.active.append(["x2", None, "no"])
+    path = tmp_path / "inventory.xlsx"
+    workbook.save(path)
+    with open(path, "rb") as stream:
+        rows = list(read_records(stream, "xlsx"))
+    assert rows[0] == ("x1", EXCLUDED, {"system": "Reports"})
+    assert rows[1][0] == "x2"
+
+
+# -------- Classification
+def test_classify_record_shapes():
+    success = classify_record("s", EXCLUDED, {"system": "Reports"})
+    assert success["ruleset_version"] == RULESET_VERSION
+    assert success["system"] == "Reports"
+    assert success["result"] == evaluate(EXCLUDED).verdict
+    assert success["decision_log"][-1]["outcome"] == success["result"]
+    assert classify_record("s", [1]) == {"id": "s", "error": "Expected answers to be an object, got list"}
+    assert classify_record("s", ValueError("unreadable")) == {"id": "s", "error": "unreadable"}
+    assert classify_record("s", {}) == {"id": "s", "error": SELECT_OPTION, "incomplete": True}
+
+
+def test_classify_stream_keeps_input_order_on_a_pool():
+    inventory = [(number, EXCLUDED if number % 3 else {}, {}) for number in range(20)]
+    with ThreadPoolExecutor(2) as pool:
+        lines = list(classify_stream(iter(inventory), 2, 3, pool=pool))
+    assert [json.loads(line)["id"] for line in lines] == list(range(20))
+    assert json.loads(lines[0])["incomplete"] is True
+
+
+def test_input_format_from_the_file_name():
+    assert bulk_classify.input_format("Inventory.CSV") == "csv"
+    assert bulk_classify.input_format("inventory.xlsx") == "xlsx"
+    assert bulk_classify.input_format("inventory.ndjson") == "jsonl"
@@ -0,0 +1,138 @@
+import os
+import random
+
+import pytest
+
+import classifier
+import truth_table
+from classifier import (
+    AI_MODEL_KNOWLEDGE_OPTIONS,
+    AI_SYSTEM,
+    BORDERLINE,
+    CONDITION_LABELS,
+    GENERATION_CONFLICT,
+    LIKELY_AI_SYSTEM,
+    LIKELY_NOT_AI_SYSTEM,
+    ML_TECHNIQUES,
+    SELECT_GENERATION,
+    SELECT_OPTION,
+    WIZARD_ANSWERS,
+    canonical,
+    classify,
+    decode,
+    encode,
+    evaluate,
+    evaluate_mask,
+)
+
+YES, NO, NOT_SURE = AI_MODEL_KNOWLEDGE_OPTIONS
+NONE_APPLIES = {"none_applies": True}
+
+
+def unable(knowledge, **generation):
+    answers = {"non_ai_categories": NONE_APPLIES, "ai_techniques": {"unable_to_verify": True}}
+    answers["ai_techniques"]["ai_model_knowledge"] = knowledge
+    if generation:
+        answers["ai_techniques"]["generation_indicators"] = generation
+    return answers
+
+
+def techniques(optimization_only=None, conditions=(), **selected):
+    answers = {"non_ai_categories": NONE_APPLIES, "ai_techniques": selected}
+    if optimization_only is not None:
+        answers["optimization_only"] = optimization_only
+        answers["optimization_conditions"] = {key: True for key in conditions}
+    return answers
+
+
+# -------- Baseline flow
+# The verdicts and first rationale lines of the wizard as it was written
+# before the classifier was extracted from streamlit_app.py.
+BASELINE_FLOW = [
+    ({}, None, SELECT_OPTION),
+    ({"non_ai_categories": {"basic_data_processing_tools": True}}, LIKELY_NOT_AI_SYSTEM, "Selected NON-AI category"),
+    ({"non_ai_categories": NONE_APPLIES}, None, SELECT_OPTION),
+    (techniques(none_selected=True), LIKELY_NOT_AI_SYSTEM, "User selected 'None of these techniques is used'."),
+    (unable(YES), AI_SYSTEM, "User confirmed the solution uses an AI Model"),
+    (unable(NO), LIKELY_NOT_AI_SYSTEM, "User indicated the solution does not use an AI Model"),
+    (unable(NOT_SURE), None, SELECT_GENERATION),
+    (unable(NOT_SURE, none_applies=True), LIKELY_NOT_AI_SYSTEM, "Unable to verify AI techniques and unsure"),
+    (unable(NOT_SURE, content=True), LIKELY_AI_SYSTEM, "Unable to verify AI techniques but unsure"),
+    (unable(NOT_SURE, content=True, none_applies=True), None, GENERATION_CONFLICT),
+    (
+        techniques(ml_selected=True, ml_techniques=[ML_TECHNIQUES[0]], optimization_only=False),
+        AI_SYSTEM,
+        "Uses AI techniques and not limited to optimization",
+    ),
+    (
+        techniques(logic_knowledge_based=True, optimization_only=True, conditions=list(CONDITION_LABELS)[:2]),
+        AI_SYSTEM,
+        "Optimization‑only usage **but** not all carve‑out conditions satisfied.",
+    ),
+    (
+        techniques(logic_knowledge_based=True, optimization_only=True, conditions=CONDITION_LABELS),
+        BORDERLINE,
+        "Optimization‑only usage and **all** optimization carve‑out conditions satisfied.",
+    ),
+]
+
+
+@pytest.mark.parametrize("answers, verdict, rationale", BASELINE_FLOW)
+def test_classify_follows_the_baseline_flow(answers, verdict, rationale):
+    result_verdict, result_rationale, decision_log = classify(answers)
+    assert result_verdict == verdict
+    assert result_rationale[0].startswith(rationale)
+    if verdict is not None:
+        assert (decision_log[-1]["step"], decision_log[-1]["outcome"]) == ("Final verdict", verdict)
+
+
+def test_decision_table_matches_the_golden_truth_table():
+    # Every combination of the wizard's answers, checked against the rules
+    # restated with NumPy in truth_table.py.
+    report = truth_table.build()
+    assert report["errors"] == []
+    assert report["unreachable_paths"] == []
+    golden = os.path.join(os.path.dirname(os.path.abspath(truth_table.__file__)), truth_table.GOLDEN_PATH)
+    with open(golden, encoding="utf-8") as handle:
+        assert truth_table.golden_text(report) == handle.read()
+
+
+# -------- Answer masks
+def random_masks(count=2000):
+    rng = random.Random(20260101)
+    return [rng.getrandbits(WIZARD_ANSWERS.bit_length()) & WIZARD_ANSWERS for _ in range(count)]
+
+
+def test_encode_decode_round_trips_every_table_key():
+    for key in classifier._TABLE:
+        assert encode(decode(key)) == key
+
+
+def test_canonical_is_a_projection():
+    for mask in random_masks():
+        key = canonical(mask)
+        assert canonical(key) == key
+        assert key & ~mask == 0
+
+
+def test_canonical_keeps_the_classification():
+    # Answers the flow never reads on a path do not change its outcome.
+    for mask in random_masks():
+        result = evaluate_mask(mask)
+        assert evaluate(decode(mask)) == result
+        assert evaluate(decode(mask, result.stage)) == result
+
+
+def test_decode_stops_at_the_stage():
+    mask = encode(techniques(ml_selected=True, ml_techniques=[ML_TECHNIQUES[1]], optimization_only=True))
+    assert set(decode(mask, "step1")) == {"non_ai_categories"}
+    assert set(decode(mask, "step2")) == {"non_ai_categories", "ai_techniques"}
+    assert decode(mask)["ai_techniques"]["ml_techniques"] == [ML_TECHNIQUES[1]]
+    assert decode(mask)["optimization_only"] is True
+
+
+def test_encode_rejects_unknown_answers():
+    with pytest.raises(ValueError, match="machine learning technique"):
+        encode({"ai_techniques": {"ml_techniques": ["Astrology"]}})
+    with pytest.raises(ValueError, match="AI model knowledge"):
+        encode({"ai_techniques": {"ai_model_knowledge": "Perhaps"}})
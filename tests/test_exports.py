@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+import exports
+from classifier import classify
+from exports import ResultCache, assessment_payload, fill_slots, json_export, markdown_export, markdown_lines
+
+ANSWERS = [
+    {"non_ai_categories": {"basic_data_processing_tools": True}},
+    {
+        "non_ai_categories": {"none_applies": True},
+        "ai_techniques": {"ml_selected": True, "ml_techniques": ["Deep Learning", "Supervised Learning"]},
+        "optimization_only": False,
+    },
+    {"non_ai_categories": {"none_applies": True}, "ai_techniques": {"unable_to_verify": True}},
+]
+
+
+def assessment(answers):
+    # Decision log entries as the app records them, timestamp first.
+    verdict, rationale, decision_log = classify(answers)
+    decision_log = [
+        {"timestamp": f"2026-07-01T10:00:{number:02d}Z", **entry} for number, entry in enumerate(decision_log)
+    ]
+    return {"result": verdict, "rationale": rationale, "answers": answers, "decision_log": decision_log}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    exports.result_cache.clear()
+    yield
+    exports.result_cache.clear()
+
+
+@pytest.mark.parametrize("answers", ANSWERS)
+def test_exports_match_a_direct_render(answers):
+    current = assessment(answers)
+    expected = json.dumps(assessment_payload(current, "2026-07-01T10:01:00Z"), indent=2)
+    assert json_export(current, "2026-07-01T10:01:00Z") == expected
+    assert markdown_export(current) == "\n".join(markdown_lines(current))
+    assert exports.render_markdown(current) == "\n".join(markdown_lines(current))
+
+
+def test_templates_are_shared_between_assessments_with_the_same_answers():
+    first, second = assessment(ANSWERS[1]), assessment(ANSWERS[1])
+    second["decision_log"][0]["timestamp"] = "2026-07-02T08:00:00Z"
+    before = exports.result_cache.stats()
+    json_export(first, "a")
+    assert "2026-07-02T08:00:00Z" in markdown_export(second)
+    after = exports.result_cache.stats()
+    assert after["size"] == 1
+    assert (after["misses"] - before["misses"], after["hits"] - before["hits"]) == (1, 1)
+
+
+def test_fill_slots_rejects_a_different_number_of_values():
+    assert fill_slots(["a", "c", "e"], ["b", "d"]) == "abcde"
+    with pytest.raises(ValueError, match="Template has 2 slots, got 1 values"):
+        fill_slots(["a", "c", "e"], ["b"])
+    with pytest.raises(ValueError, match="Template has 0 slots, got 1 values"):
+        fill_slots(["a"], ["b"])
+
+
+def test_an_assessment_with_a_different_decision_log_is_rejected():
+    current = assessment(ANSWERS[1])
+    current["decision_log"].pop()
+    with pytest.raises(ValueError):
+        markdown_export(current)
+
+
+def test_result_cache_evicts_the_least_recently_used_entry():
+    cache = ResultCache(2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    assert cache.get("a", lambda: 0) == 1
+    cache.get("c", lambda: 3)
+    assert cache.get("b", lambda: 4) == 4
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 1, "misses": 4, "evictions": 2}
+
+
+def test_encode_json_falls_back_for_large_integers():
+    assert json.loads(exports.encode_json({"big": 1 << 70}, compact=True)) == {"big": 1 << 70}
+    assert exports.encode_json({"name": "é"}).decode("utf-8") == '{\n  "name": "é"\n}'
@@ -0,0 +1,91 @@
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import inventory
+from inventory import NO_VERDICT, InventoryJob
+
+
+class Upload(io.BytesIO):
+    # The parts of Streamlit's UploadedFile an InventoryJob uses.
+
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+        self.file_id = f"{name}-{len(data)}"
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(2) as pool:
+        yield pool
+
+
+def run(upload, pool, chunk_size=2):
+    job = InventoryJob(upload, pool, 2, chunk_size=chunk_size)
+    deadline = time.monotonic() + 10
+    while not job.finished:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+    return job
+
+
+def rows(job):
+    return [result for number in range(job.pages) for result in job.page(number)]
+
+
+def test_bad_rows_are_reported_and_the_rest_classified(pool):
+    lines = [
+        json.dumps({"id": "ok", "non_ai_categories": {"basic_data_processing_tools": True}}),
+        "42",
+        "{broken",
+        json.dumps({"id": "open", "answers": {}}),
+        json.dumps({"id": "list", "answers": [1]}),
+    ]
+    job = run(Upload("inventory.jsonl", "\n".join(lines).encode()), pool)
+    assert job.error is None
+    assert job.done == 5
+    assert job.errors == 3
+    assert job.verdicts[NO_VERDICT] == 1
+    results = rows(job)
+    assert [result["id"] for result in results] == ["ok", 2, 3, "open", "list"]
+    assert [inventory._verdict(result) for result in results][1:] == [
+        inventory.UNCLASSIFIED,
+        inventory.UNCLASSIFIED,
+        NO_VERDICT,
+        inventory.UNCLASSIFIED,
+    ]
+    assert results[1]["error"] == "Expected a JSON object, got int"
+
+
+def test_csv_clash_is_a_row_error(pool):
+    data = b"id,ai_techniques,non_ai_categories.basic_data_processing_tools\nr1,x,yes\n"
+    job = run(Upload("inventory.csv", data), pool)
+    (result,) = rows(job)
+    assert job.errors == 1
+    assert "clashes with the answer columns" in result["error"]
+
+
+def test_results_are_paged(pool, monkeypatch):
+    monkeypatch.setattr(inventory, "PAGE_SIZE", 4)
+    lines = [json.dumps({"id": number, "non_ai_categories": {"none_applies": True}}) for number in range(10)]
+    job = run(Upload("inventory.jsonl", "\n".join(lines).encode()), pool)
+    assert job.pages == 3
+    assert [len(job.page(number)) for number in range(3)] == [4, 4, 2]
+    assert job.results_bytes().count(b"\n") == 10
+    assert job.progress() == 1.0
+
+
+def test_a_failing_file_keeps_the_rows_read_before_it(pool):
+    # The bad bytes sit past the text reader's first block, so the rows before
+    # them are decoded and classified first.
+    lines = [json.dumps({"id": number, "non_ai_categories": {"none_applies": True}}) for number in range(200)]
+    data = "\n".join(lines).encode() + b"\n\xff\xfe\n"
+    job = run(Upload("inventory.jsonl", data), pool, chunk_size=1)
+    assert "utf-8" in job.error
+    assert 0 < job.done < 200
+    assert [result["id"] for result in rows(job)] == list(range(job.done))
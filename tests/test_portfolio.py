@@ -0,0 +1,96 @@
+import io
+import json
+from collections import Counter
+
+import portfolio
+from bulk_classify import classify_record
+from classifier import classify
+from portfolio import PortfolioReport, iter_ndjson, section_lines, write_report
+from store import AssessmentStore
+
+EXCLUDED = {"non_ai_categories": {"basic_data_processing_tools": True}}
+ML = {
+    "non_ai_categories": {"none_applies": True},
+    "ai_techniques": {"ml_selected": True, "ml_techniques": ["Deep Learning"]},
+    "optimization_only": False,
+}
+
+
+def assessment(answers, name, number=0):
+    verdict, rationale, decision_log = classify(answers)
+    decision_log = [
+        {"timestamp": f"2026-07-01T10:{number:02d}:{index:02d}Z", **entry} for index, entry in enumerate(decision_log)
+    ]
+    return {
+        "system": name,
+        "recorded_at": f"2026-07-01T10:{number:02d}:59Z",
+        "result": verdict,
+        "rationale": rationale,
+        "answers": answers,
+        "decision_log": decision_log,
+    }
+
+
+# -------- Sections
+def test_sections_match_a_direct_render():
+    report = PortfolioReport("Report")
+    systems = [assessment(answers, f"System {number}", number) for number, answers in enumerate([ML, EXCLUDED, ML])]
+    for system in systems:
+        assert report.section(system) == "\n".join(section_lines(system))
+    assert report.systems == 3
+    assert len(report._templates) == 2
+
+
+def test_stored_rows_render_like_the_assessments(tmp_path):
+    with AssessmentStore(str(tmp_path / "assessments.sqlite3")) as store:
+        for number, answers in enumerate([ML, EXCLUDED, ML]):
+            store.add(assessment(answers, None, number), recorded_at=f"2026-07-01T10:{number:02d}:59Z")
+        store.flush()
+        stored, raw = list(store.query()), list(store.query_raw())
+    direct, from_rows = PortfolioReport("Report"), PortfolioReport("Report")
+    for system, row in zip(stored, raw):
+        system["system"] = f"Assessment {system['id']}"
+        assert from_rows.row_section(row) == direct.section(system)
+    assert from_rows.summary() == direct.summary()
+
+
+def test_report_puts_the_summary_first_or_last():
+    systems = [assessment(ML, "Fraud model"), assessment(EXCLUDED, "Reports")]
+    first, last = io.BytesIO(), io.BytesIO()
+    assert write_report(iter(systems), first, "Report") == 2
+    write_report(iter(systems), last, "Report", summary_first=False)
+    first, last = first.getvalue().decode(), last.getvalue().decode()
+    assert first.startswith("# Report\n\n## Portfolio summary")
+    assert first.index("## Portfolio summary") < first.index("## Fraud model")
+    assert last.index("## Reports") < last.index("## Portfolio summary")
+    assert "- **Systems assessed:** 2" in first
+    assert "| Basic data processing tools | 1 | 50.0% |" in first
+
+
+# -------- Input readers
+def test_iter_ndjson_counts_the_records_it_skips():
+    records = [
+        classify_record("ok", ML, {"business_unit": "Claims"}),
+        classify_record("other", ML, {"business_unit": "HR"}),
+        classify_record("none", ML),
+        classify_record("open", {}, {"business_unit": "Claims"}),
+        classify_record("bad", [1], {"business_unit": "Claims"}),
+        {"id": "unclassified", "business_unit": "Claims"},
+    ]
+    # Error records carry no inventory columns of their own.
+    records[-2]["business_unit"] = "Claims"
+    stream = io.StringIO("\n".join(json.dumps(record) for record in records) + "\n\n")
+    skipped = Counter()
+    assert [record["id"] for record in iter_ndjson(stream, "Claims", skipped)] == ["ok"]
+    assert skipped == {"other business unit": 1, "no business_unit": 1, "incomplete": 1, "error": 1, "no verdict": 1}
+
+
+def test_iter_ndjson_without_a_business_unit_keeps_every_verdict():
+    records = [classify_record("a", ML, {"business_unit": "HR"}), classify_record("b", EXCLUDED)]
+    stream = io.StringIO("\n".join(json.dumps(record) for record in records))
+    assert [record["id"] for record in iter_ndjson(stream)] == ["a", "b"]
+
+
+def test_system_name_falls_back_to_the_id():
+    assert portfolio.system_name({"name": "Scheduler", "id": 3}) == "Scheduler"
+    assert portfolio.system_name({"id": 3}) == "Assessment 3"
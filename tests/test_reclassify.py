@@ -0,0 +1,101 @@
+import copy
+import json
+
+import pytest
+
+import reclassify
+import ruleset
+from classifier import RULESET_PATH, build_machine, classify, encode, evaluate
+from reclassify import changed_states
+from store import AssessmentStore
+
+EXCLUDED = {"non_ai_categories": {"basic_data_processing_tools": True}}
+ML = {
+    "non_ai_categories": {"none_applies": True},
+    "ai_techniques": {"ml_selected": True, "ml_techniques": ["Deep Learning"]},
+    "optimization_only": False,
+}
+CARVE_OUT = {**ML, "optimization_only": True}
+
+
+@pytest.fixture
+def rules():
+    return ruleset.load(RULESET_PATH)
+
+
+def no_carve_out_is_borderline(rules):
+    # The changed ruleset: step 3's "No" answer gives a borderline verdict.
+    changed = copy.deepcopy(rules)
+    changed["version"] += "-test"
+    changed["states"]["step3"]["transitions"][-1]["verdict"]["verdict"] = "borderline"
+    return changed
+
+
+def assessment(answers):
+    verdict, rationale, decision_log = classify(answers)
+    return {"result": verdict, "rationale": rationale, "answers": answers, "decision_log": decision_log}
+
+
+# -------- Rule changes
+def test_an_unchanged_ruleset_changes_no_state(rules):
+    assert changed_states(rules, copy.deepcopy(rules)) == set()
+
+
+def test_a_changed_transition_changes_its_state(rules):
+    assert changed_states(rules, no_carve_out_is_borderline(rules)) == {"step3"}
+
+
+def test_shared_text_changes_every_state_that_uses_it(rules):
+    changed = copy.deepcopy(rules)
+    changed["notes"]["inference"] = "Changed."
+    users = {name for name in rules["states"] if '"include": "inference"' in json.dumps(rules["states"][name])}
+    assert users and changed_states(rules, changed) == users
+
+
+def test_a_new_start_changes_every_state(rules):
+    changed = copy.deepcopy(rules)
+    changed["start"] = "step2"
+    assert changed_states(rules, changed) == set(rules["states"])
+
+
+# -------- Re-classification
+@pytest.mark.parametrize("workers", [1, 2])
+def test_only_answers_that_take_a_changed_rule_are_classified(rules, workers):
+    current = no_carve_out_is_borderline(rules)
+    groups = [(encode(answers), evaluate(answers).verdict) for answers in [EXCLUDED, ML, CARVE_OUT]]
+    results = list(reclassify.reclassify(iter(groups), current, {"step3"}, workers, 1))
+    assert [(mask, old) for mask, old, _, _ in results] == groups[1:]
+    (ml, carve_out) = results
+    assert ml[2] == build_machine(current).run(encode(ML))[0] != ml[1]
+    assert ml[3] == ["states.step3.transitions[1]"]
+    assert carve_out[2] == carve_out[1]
+    assert carve_out[3] == ["states.step3.transitions[0]"]
+
+
+def test_main_reports_the_flipped_assessments(rules, tmp_path, capsys):
+    previous, current = tmp_path / "previous.json", tmp_path / "current.json"
+    changed = no_carve_out_is_borderline(rules)
+    previous.write_text(json.dumps(rules), encoding="utf-8")
+    current.write_text(json.dumps(changed), encoding="utf-8")
+    db, output = str(tmp_path / "assessments.sqlite3"), tmp_path / "flipped.ndjson"
+    with AssessmentStore(db) as store:
+        for answers in [EXCLUDED, ML, ML, CARVE_OUT]:
+            store.add(assessment(answers))
+        store.flush()
+        ids = [stored["id"] for stored in store.query() if encode(stored["answers"]) == encode(ML)]
+
+    argv = [str(previous), "--ruleset", str(current), "--db", db, "-o", str(output), "--workers", "1"]
+    assert reclassify.main(argv) == 0
+    flipped = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted(record["id"] for record in flipped) == sorted(ids)
+    assert {record["previous_verdict"] for record in flipped} == {evaluate(ML).verdict}
+    assert {record["verdict"] for record in flipped} == {build_machine(changed).run(encode(ML))[0]}
+    report = capsys.readouterr().err
+    assert "Changed states: step3" in report
+    assert "Verdicts flipped for 2 assessments:" in report
+
+
+def test_main_stops_when_nothing_changed(tmp_path, capsys):
+    db = str(tmp_path / "assessments.sqlite3")
+    assert reclassify.main([RULESET_PATH, "--db", db, "-o", str(tmp_path / "flipped.ndjson")]) == 0
+    assert "nothing to do" in capsys.readouterr().err
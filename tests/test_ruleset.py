@@ -0,0 +1,89 @@
+import copy
+import json
+import random
+
+import pytest
+
+import classifier
+import ruleset
+from ruleset import RulesetError
+
+
+@pytest.fixture
+def rules():
+    return copy.deepcopy(classifier.RULESET)
+
+
+def step1(rules):
+    return rules["states"]["step1"]["transitions"]
+
+
+def test_machine_agrees_with_the_decision_table(rules):
+    machine = classifier.build_machine(rules)
+    keys = random.Random(20260101).sample(sorted(classifier._TABLE), 2000)
+    for key in keys:
+        assert classifier.Classification._make(machine.run(key)) == classifier._TABLE[key]
+
+
+def test_path_names_the_rules_taken(rules):
+    machine = classifier.build_machine(rules)
+    path = machine.path(classifier.encode({"non_ai_categories": {"basic_data_processing_tools": True}}))
+    assert path == [("step1", 1)]
+    assert "states.step1.transitions[1]" in machine.rules
+
+
+def test_unused_lists_rules_no_answers_reach(rules):
+    never = {"all": ["non_ai_categories.none_applies"], "none": ["non_ai_categories.none_applies"]}
+    step1(rules).insert(0, {"when": never, "goto": "step2"})
+    machine = classifier.build_machine(rules)
+    for key in classifier._reachable_keys():
+        machine.run(key)
+    assert machine.unused() == ["states.step1.transitions[0]"]
+
+
+@pytest.mark.parametrize(
+    "change, message",
+    [
+        (lambda rules: step1(rules)[0].update(goto="nowhere"), "unknown state 'nowhere'"),
+        (lambda rules: step1(rules)[-1].update(when={}), "the last transition must not have a guard"),
+        (lambda rules: step1(rules)[0]["when"].update(all=["non_ai_categories.typo"]), "unknown answer flag"),
+        (lambda rules: step1(rules)[0]["when"].update(any=["@typo"]), "unknown answer group"),
+        (lambda rules: step1(rules)[0].update(incomplete="select_option"), "needs exactly one of"),
+        (lambda rules: step1(rules)[0]["log"]["notes"].append("{selected[typo]}"), "bad template"),
+        (lambda rules: step1(rules)[0]["log"]["notes"].append({"include": "typo"}), "unknown shared notes"),
+        (lambda rules: rules["states"]["step2"]["transitions"].insert(0, {"goto": "step1"}), "cycle"),
+        (lambda rules: rules["states"].update(orphan=copy.deepcopy(rules["states"]["step1"])), "unreachable"),
+        (lambda rules: rules.update(start="typo"), "start: unknown state"),
+    ],
+)
+def test_broken_rulesets_fail_at_compile_time(rules, change, message):
+    change(rules)
+    with pytest.raises(RulesetError, match=message):
+        classifier.build_machine(rules)
+
+
+def test_build_machine_needs_the_same_questions(rules):
+    rules["questions"]["ai_techniques"]["ml_techniques"]["options"].append("Quantum Learning")
+    with pytest.raises(RulesetError, match="questions differ"):
+        classifier.build_machine(rules)
+
+
+# -------- Loading
+def test_load_reads_the_default_ruleset():
+    assert ruleset.load() == classifier.RULESET
+
+
+def test_load_rejects_missing_and_unknown_sections(tmp_path, rules):
+    del rules["start"]
+    rules["extra"] = {}
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(rules), encoding="utf-8")
+    with pytest.raises(RulesetError, match=r"unknown sections \['extra'\], missing sections \['start'\]"):
+        ruleset.load(str(path))
+
+
+def test_load_reports_invalid_json(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text("{", encoding="utf-8")
+    with pytest.raises(RulesetError, match="rules.json"):
+        ruleset.load(str(path))
@@ -0,0 +1,69 @@
+import pytest
+
+import classifier
+import share_links
+from classifier import CONDITION_LABELS, WIZARD_ANSWERS, decode, encode, from_token, to_token
+
+# Table keys the wizard can produce, which are all canonical.
+WIZARD_KEYS = [key for key in classifier._TABLE if not key & ~WIZARD_ANSWERS]
+
+
+def test_token_round_trips_every_wizard_key():
+    for key in WIZARD_KEYS:
+        token = to_token(key)
+        assert len(token) <= 7
+        assert from_token(token) == key
+
+
+def test_update_then_restore_fills_in_the_widgets():
+    # An empty mask leaves no token to restore.
+    for key in [key for key in WIZARD_KEYS[::50] if key]:
+        params, state = {}, {}
+        share_links.update(params, key)
+        assert share_links.restore(params, state)
+        assert state == share_links.widget_values(decode(key))
+        assert encode(decode(from_token(params[share_links.PARAM]))) == key
+
+
+def test_widget_values_use_the_app_keys():
+    answers = {
+        "non_ai_categories": {"none_applies": True},
+        "ai_techniques": {"unable_to_verify": True, "ai_model_knowledge": "I am not sure"},
+        "optimization_only": True,
+        "optimization_conditions": {key: True for key in CONDITION_LABELS},
+    }
+    answers["ai_techniques"]["generation_indicators"] = {"content": True}
+    values = share_links.widget_values(decode(encode(answers)))
+    assert values["step1_none_applies"] is True
+    assert values["step2_unable_to_verify"] is True
+    assert values["step2_ai_model_knowledge"] == "I am not sure"
+    assert values["g_content"] is True and values["g_none"] is False
+    assert values["step3_optimization_only"] == "Yes"
+    assert all(values[f"step3_{key}"] for key in CONDITION_LABELS)
+
+
+def test_update_leaves_an_unchanged_token_and_drops_an_empty_one():
+    params = {}
+    share_links.update(params, 0)
+    assert params == {}
+    key = WIZARD_KEYS[-1]
+    share_links.update(params, key)
+    token = params[share_links.PARAM]
+    share_links.update(params, key)
+    assert params == {share_links.PARAM: token}
+    share_links.update(params, 0)
+    assert params == {}
+
+
+def test_restore_without_a_token_changes_nothing():
+    state = {}
+    assert share_links.restore({}, state)
+    assert state == {}
+
+
+@pytest.mark.parametrize("token", ["2abc", "1", "1-x", "1zzzzzzz", "1" + format(1 << 29, "x")])
+def test_restore_drops_a_token_that_does_not_fit(token):
+    params, state = {share_links.PARAM: token}, {}
+    assert not share_links.restore(params, state)
+    assert params == {}
+    assert state == {}
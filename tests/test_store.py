@@ -0,0 +1,128 @@
+import sqlite3
+import time
+
+import pytest
+
+from classifier import classify, encode, evaluate
+from store import AssessmentStore
+
+EXCLUDED = {"non_ai_categories": {"basic_data_processing_tools": True}}
+ML = {
+    "non_ai_categories": {"none_applies": True},
+    "ai_techniques": {"ml_selected": True, "ml_techniques": ["Deep Learning"]},
+    "optimization_only": False,
+}
+
+
+def assessment(answers):
+    verdict, rationale, decision_log = classify(answers)
+    return {"result": verdict, "rationale": rationale, "answers": answers, "decision_log": decision_log}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AssessmentStore(str(tmp_path / "assessments.sqlite3"), batch_size=3, flush_interval=60)
+    yield store
+    store.close()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def lock(store):
+    # Holds the write lock from another connection; the store's writer gives
+    # up at once instead of waiting out its busy timeout.
+    store._writer.execute("PRAGMA busy_timeout=0")
+    connection = sqlite3.connect(store.path, isolation_level=None)
+    connection.execute("BEGIN IMMEDIATE")
+    return connection
+
+
+# -------- Flushing
+def test_writes_wait_for_a_full_batch_or_flush(store):
+    store.add(assessment(EXCLUDED))
+    store.add(assessment(EXCLUDED))
+    assert store.count() == 0
+    store.flush()
+    assert store.count() == 2
+    for _ in range(3):
+        store.add(assessment(ML))
+    assert store.count() == 5
+
+
+def test_timer_flushes_a_partial_batch(tmp_path):
+    with AssessmentStore(str(tmp_path / "assessments.sqlite3"), batch_size=100, flush_interval=0.05) as store:
+        store.add(assessment(EXCLUDED))
+        wait_for(lambda: store.count() == 1)
+
+
+def test_stored_assessments_read_back(store):
+    store.add(assessment(ML), recorded_at="2026-07-01T10:00:00Z")
+    store.flush()
+    (stored,) = store.query()
+    assert stored["recorded_at"] == "2026-07-01T10:00:00Z"
+    assert stored["result"] == evaluate(ML).verdict
+    assert encode(stored["answers"]) == encode(ML)
+    assert store.count(flags=["ai_techniques.ml_techniques.Deep Learning"]) == 1
+    assert store.count(verdict=evaluate(EXCLUDED).verdict) == 0
+
+
+def test_failed_flush_keeps_the_batch(store):
+    store.add(assessment(EXCLUDED))
+    store.add(assessment(EXCLUDED))
+    other = lock(store)
+    with pytest.raises(sqlite3.OperationalError):
+        store.add(assessment(ML))
+    assert len(store._pending) == 3
+    other.execute("COMMIT")
+    store.flush()
+    assert store.count() == 3
+    assert {row[1]: row[2] for row in store.daily_counts()}["stage:step1"] == 2
+
+
+def test_failed_timed_flush_is_retried(tmp_path):
+    with AssessmentStore(str(tmp_path / "assessments.sqlite3"), batch_size=100, flush_interval=0.05) as store:
+        other = lock(store)
+        store.add(assessment(EXCLUDED))
+        wait_for(lambda: store.last_error is not None)
+        assert "locked" in store.last_error
+        other.execute("COMMIT")
+        wait_for(lambda: store.count() == 1)
+
+
+# -------- Daily counters
+def test_daily_counts_follow_the_stored_assessments(store):
+    store.add(assessment(EXCLUDED), recorded_at="2026-07-01T10:00:00Z")
+    store.add(assessment(ML), recorded_at="2026-07-01T11:00:00Z")
+    store.add(assessment(ML), recorded_at="2026-07-02T09:00:00Z")
+    counts = {(day, name): count for day, name, count in store.daily_counts()}
+    excluded, ml = evaluate(EXCLUDED).verdict, evaluate(ML).verdict
+    assert counts[("2026-07-01", f"verdict:{excluded}")] == 1
+    assert counts[("2026-07-01", f"verdict:{ml}")] == 1
+    assert counts[("2026-07-02", f"verdict:{ml}")] == 1
+    assert counts[("2026-07-01", "stage:step3")] == 1
+    assert counts[("2026-07-01", "answer:ai_techniques.ml_techniques.Deep Learning")] == 1
+    assert ("2026-07-02", f"verdict:{excluded}") not in counts
+    assert {row[0] for row in store.daily_counts(since="2026-07-02")} == {"2026-07-02"}
+    assert {row[0] for row in store.daily_counts(until="2026-07-02")} == {"2026-07-01"}
+
+    before = sorted(store.daily_counts())
+    store.rebuild_counts()
+    assert sorted(store.daily_counts()) == before
+
+
+def test_counts_are_rebuilt_for_a_store_without_them(tmp_path):
+    path = str(tmp_path / "assessments.sqlite3")
+    with AssessmentStore(path) as store:
+        store.add(assessment(ML), recorded_at="2026-07-01T10:00:00Z")
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("DELETE FROM daily_counts")
+    connection.close()
+    with AssessmentStore(path) as store:
+        assert ("2026-07-01", f"verdict:{evaluate(ML).verdict}", 1) in list(store.daily_counts())
@@ -0,0 +1,91 @@
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+
+from classifier import WIZARD_ANSWERS, canonical, decode, evaluate_mask
+from share_links import widget_values
+
+# An interaction trace is the sequence of wizard widget changes one browser
+# session made, as JSON lines of {"session", "t", "key", "value"}: ``t`` is
+# seconds since the session's first run, ``key`` the widget key and ``value``
+# what the widget returned. benchmarks/session_load.py replays them.
+WIDGET_PREFIXES = ("step1_", "step2_", "g_", "step3_")
+_DEFAULTS = {
+    "step2_ml_techniques": [],
+    "step2_ai_model_knowledge": None,
+    "step3_optimization_only": widget_values(decode(0))["step3_optimization_only"],
+}
+
+
+def default_value(key):
+    return _DEFAULTS.get(key, False)
+
+
+class TraceRecorder:
+    # Appends the widget changes of every session to ``path``. observe() is
+    # called with a session's widget values after each run; a widget that
+    # appears with its default value is not a change.
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._file = open(path, "a", encoding="utf-8")
+
+    def observe(self, session, widgets):
+        now = time.monotonic()
+        lines = []
+        with self._lock:
+            started, seen = self._sessions.setdefault(session, (now, {}))
+            for key in list(widgets.keys()):
+                if not key.startswith(WIDGET_PREFIXES):
+                    continue
+                value = widgets[key]
+                if isinstance(value, list):
+                    value = list(value)
+                if value != seen.get(key, default_value(key)):
+                    seen[key] = value
+                    event = {"session": session, "t": round(now - started, 3), "key": key, "value": value}
+                    lines.append(json.dumps(event, ensure_ascii=False) + "\n")
+            if lines and self._file is not None:
+                self._file.writelines(lines)
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def load(path):
+    # Session id -> [(t, key, value)] in the order they were made.
+    traces = defaultdict(list)
+    with open(path, encoding="utf-8") as stream:
+        for line in stream:
+            if line.strip():
+                event = json.loads(line)
+                traces[event["session"]].append((event["t"], event["key"], event["value"]))
+    return {session: sorted(events, key=lambda event: event[0]) for session, events in traces.items()}
+
+
+def synthetic(count, seed=0, think=(0.5, 3.0)):
+    # Traces of users who answer the questions in page order until the
+    # wizard reaches a verdict, pausing ``think`` seconds between changes.
+    rng = random.Random(seed)
+    traces = {}
+    while len(traces) < count:
+        mask = canonical(rng.getrandbits(29) & WIZARD_ANSWERS)
+        result = evaluate_mask(mask)
+        if result.verdict is None:
+            continue
+        t = 0.0
+        events = []
+        for key, value in widget_values(decode(mask, result.stage)).items():
+            if value != default_value(key):
+                t += rng.uniform(*think)
+                events.append((round(t, 3), key, value))
+        traces[f"synthetic-{len(traces):05d}"] = events
+    return traces
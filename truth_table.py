@@ -0,0 +1,369 @@
+import argparse
+import difflib
+import sys
+import time
+
+import numpy as np
+
+from classifier import (
+    _CONDITION_MASK,
+    _GENERATION_MASK,
+    _KNOWLEDGE_CODES,
+    _KNOWLEDGE_MASK,
+    _KNOWLEDGE_SHIFT,
+    _ML_MASK,
+    _NON_AI_MASK,
+    _NOT_SURE,
+    _TABLE,
+    AI_SYSTEM,
+    BORDERLINE,
+    GENERATION_CONFLICT,
+    GENERATION_NONE,
+    INFERS_OUTPUTS,
+    LIKELY_AI_SYSTEM,
+    LIKELY_NOT_AI_SYSTEM,
+    LOGIC_SELECTED,
+    ML_SELECTED,
+    NONE_APPLIES,
+    NONE_SELECTED,
+    OPTIMIZATION_ONLY,
+    RULESET_VERSION,
+    SELECT_GENERATION,
+    SELECT_OPTION,
+    STEP1_UNABLE,
+    STEP2_UNABLE,
+    VARYING_AUTONOMY,
+    canonical,
+)
+
+GOLDEN_PATH = "truth_table.txt"
+
+# Every path through the rules, identified by (stage, verdict, detail): the
+# prompt for an incomplete assessment, otherwise the outcome of the last step.
+PATHS = {
+    ("step1", None, SELECT_OPTION): "step1.incomplete",
+    ("step1", LIKELY_NOT_AI_SYSTEM, "Non-AI category selected"): "step1.non_ai",
+    ("step2", None, SELECT_OPTION): "step2.incomplete",
+    ("step2", AI_SYSTEM, "Confirmed AI Model usage"): "step2.model_yes",
+    ("step2", LIKELY_NOT_AI_SYSTEM, "User denied AI Model usage"): "step2.model_no",
+    ("step2", LIKELY_NOT_AI_SYSTEM, "No AI techniques declared"): "step2.no_techniques",
+    ("generation", None, GENERATION_CONFLICT): "generation.conflict",
+    ("generation", None, SELECT_GENERATION): "generation.incomplete",
+    ("generation", LIKELY_AI_SYSTEM, "Generation behaviours observed"): "generation.indicators",
+    ("generation", LIKELY_NOT_AI_SYSTEM, "No generation indicators"): "generation.none",
+    ("step3", AI_SYSTEM, "Optimization carve-out not claimed"): "step3.not_claimed",
+    ("step3", AI_SYSTEM, "Optimization carve-out evaluated"): "step3.partial",
+    ("step3", BORDERLINE, "Optimization carve-out evaluated"): "step3.carve_out",
+}
+PATH_NAMES = tuple(PATHS.values())
+_PATH_CODES = {name: code for code, name in enumerate(PATH_NAMES)}
+_FINAL_PATHS = np.array([verdict is not None for _, verdict, _ in PATHS], dtype=bool)
+
+_KNOWS_YES = _KNOWLEDGE_CODES["Yes it use an AI Model"] << _KNOWLEDGE_SHIFT
+_KNOWS_NO = _KNOWLEDGE_CODES["No it does not"] << _KNOWLEDGE_SHIFT
+_GENERATION_INDICATORS = _GENERATION_MASK
+
+# The wizard's answer space: every Step 1 and Step 2 checkbox, the AI model
+# knowledge radio, the generation indicators, optimization-only and its five
+# conditions, i.e. bits 0-8 and 14-26 of the classifier's bitmask. The ML
+# technique multiselect and the inference flags are held at zero: they only
+# change note and rationale text, never the path.
+#
+# Step 1 is the only part of the flow that can end it before anything else is
+# read, so the space is laid out as a grid of the 2**17 later answer sets
+# (rows) by the 32 Step 1 answer sets (columns). Each side is evaluated once
+# and the two are broadcast together; the grid in row-major order is every
+# answer set, in mask order.
+SPACE_BITS = 22
+_STEP1_BITS = 5
+_LOW_BITS = 9
+_HIGH_SHIFT = 14
+
+
+def answer_space():
+    step1 = np.arange(1 << _STEP1_BITS, dtype=np.uint32)
+    index = np.arange(1 << (SPACE_BITS - _STEP1_BITS), dtype=np.uint32)
+    low = _LOW_BITS - _STEP1_BITS
+    later = ((index & ((1 << low) - 1)) << _STEP1_BITS) | ((index >> low) << _HIGH_SHIFT)
+    return step1, later
+
+
+def _set(masks, bits):
+    return (masks & np.uint32(bits)) != 0
+
+
+def _slots(keys):
+    # Position in the flattened grid of the answer set equal to ``keys``.
+    return (keys & ((1 << _LOW_BITS) - 1)) | ((keys >> _HIGH_SHIFT) << _LOW_BITS)
+
+
+def _masks(slots):
+    return (slots & ((1 << _LOW_BITS) - 1)) | ((slots >> _LOW_BITS) << _HIGH_SHIFT)
+
+
+# -------- Vectorised rules
+def canonical_keys(step1, later):
+    # classifier.canonical() over the whole grid.
+    u = np.uint32
+    step1_unable = _set(step1, STEP1_UNABLE)
+    non_ai = step1 & u(_NON_AI_MASK)
+    passes_step1 = step1_unable | ((non_ai == 0) & _set(step1, NONE_APPLIES))
+    step1_key = non_ai | np.where(
+        step1_unable, u(STEP1_UNABLE), np.where(passes_step1, u(NONE_APPLIES), u(0))
+    )
+
+    knowledge = later & u(_KNOWLEDGE_MASK)
+    unable_key = STEP2_UNABLE | knowledge | np.where(
+        knowledge == _NOT_SURE, later & u(_GENERATION_MASK | GENERATION_NONE), u(0)
+    )
+    technique_key = (
+        (later & u(ML_SELECTED | LOGIC_SELECTED | OPTIMIZATION_ONLY | INFERS_OUTPUTS | VARYING_AUTONOMY))
+        | np.where(_set(later, ML_SELECTED), later & u(_ML_MASK), u(0))
+        | np.where(_set(later, OPTIMIZATION_ONLY), later & u(_CONDITION_MASK), u(0))
+    )
+    later_key = np.select(
+        [
+            _set(later, STEP2_UNABLE),
+            _set(later, NONE_SELECTED),
+            ~_set(later, ML_SELECTED | LOGIC_SELECTED),
+        ],
+        [unable_key, u(NONE_SELECTED), u(0)],
+        technique_key,
+    )
+    return np.where(passes_step1, later_key[:, None] | step1_key, step1_key)
+
+
+def _first_match(rules, default):
+    return np.select(
+        [condition for condition, _ in rules],
+        [np.int8(_PATH_CODES[name]) for _, name in rules],
+        np.int8(default),
+    )
+
+
+def path_codes(step1, later):
+    # An independent statement of the rules, checked against the compiled
+    # decision table: first matching condition wins.
+    step1_unable = _set(step1, STEP1_UNABLE)
+    step1_path = _first_match(
+        [
+            (~step1_unable & _set(step1, _NON_AI_MASK), "step1.non_ai"),
+            (~step1_unable & ~_set(step1, NONE_APPLIES), "step1.incomplete"),
+        ],
+        -1,
+    )
+
+    step2_unable = _set(later, STEP2_UNABLE)
+    knowledge = later & np.uint32(_KNOWLEDGE_MASK)
+    indicators = _set(later, _GENERATION_INDICATORS)
+    generation_none = _set(later, GENERATION_NONE)
+    later_path = _first_match(
+        [
+            (step2_unable & (knowledge == 0), "step2.incomplete"),
+            (step2_unable & (knowledge == _KNOWS_YES), "step2.model_yes"),
+            (step2_unable & (knowledge == _KNOWS_NO), "step2.model_no"),
+            (step2_unable & indicators & generation_none, "generation.conflict"),
+            (step2_unable & indicators, "generation.indicators"),
+            (step2_unable & generation_none, "generation.none"),
+            (step2_unable, "generation.incomplete"),
+            (_set(later, NONE_SELECTED), "step2.no_techniques"),
+            (~_set(later, ML_SELECTED | LOGIC_SELECTED), "step2.incomplete"),
+            (~_set(later, OPTIMIZATION_ONLY), "step3.not_claimed"),
+            ((later & np.uint32(_CONDITION_MASK)) == _CONDITION_MASK, "step3.carve_out"),
+        ],
+        _PATH_CODES["step3.partial"],
+    )
+    return np.where(step1_path >= 0, step1_path, later_path[:, None])
+
+
+# Answer combinations the wizard warns about or cannot reconcile, with the
+# stages that read them. A combination is contradictory when a path through
+# one of those stages still turns it into a final verdict. Each is a
+# selection of grid columns (Step 1) or rows (later steps).
+def conflicts(step1, later):
+    every_stage = ("step1", "step2", "generation", "step3")
+    after_step1 = ("step2", "generation", "step3")
+    return [
+        (
+            "Step 1 'None applies' with a non-AI category",
+            every_stage,
+            _set(step1, NONE_APPLIES) & _set(step1, _NON_AI_MASK),
+            None,
+        ),
+        (
+            "Step 1 'unable to verify' with other selections",
+            every_stage,
+            _set(step1, STEP1_UNABLE) & _set(step1, NONE_APPLIES | _NON_AI_MASK),
+            None,
+        ),
+        (
+            "Step 2 'unable to verify' with technique selections",
+            after_step1,
+            None,
+            _set(later, STEP2_UNABLE) & _set(later, ML_SELECTED | LOGIC_SELECTED | NONE_SELECTED),
+        ),
+        (
+            "Step 2 'None of these techniques' with a technique",
+            after_step1,
+            None,
+            _set(later, NONE_SELECTED) & _set(later, ML_SELECTED | LOGIC_SELECTED),
+        ),
+        (
+            "Generation 'None applies' with an indicator",
+            ("generation",),
+            None,
+            _set(later, GENERATION_NONE) & _set(later, _GENERATION_INDICATORS),
+        ),
+    ]
+
+
+# -------- Verification
+def table_path(result):
+    detail = result.message if result.verdict is None else result.decision_log[-2][1]
+    return PATHS.get((result.stage, result.verdict, detail))
+
+
+def build():
+    step1, later = answer_space()
+    keys = canonical_keys(step1, later)
+    paths = path_codes(step1, later)
+
+    # Group answer sets by canonical key with a histogram instead of a sort.
+    slots = _slots(keys)
+    counts = np.bincount(slots.ravel(), minlength=slots.size)
+    classes = np.flatnonzero(counts)
+    class_keys = _masks(classes)
+
+    errors = []
+    slot_paths = np.full(slots.size, -1, dtype=np.int8)
+    for slot, key in zip(classes.tolist(), class_keys.tolist()):
+        if canonical(key) != key:
+            errors.append(f"canonical key {key:#09x} is not canonical")
+        result = _TABLE.get(key)
+        name = table_path(result) if result is not None else None
+        if name is None:
+            errors.append(f"key {key:#09x} has no known path in the decision table")
+        else:
+            slot_paths[slot] = _PATH_CODES[name]
+
+    # Spot-check the vectorised projection against classifier.canonical().
+    sample = (later[::97, None] | step1[::3]).ravel()
+    for mask, key in zip(sample.tolist(), keys[::97, ::3].ravel().tolist()):
+        if canonical(mask) != key:
+            errors.append(f"canonical({mask:#09x}) is {canonical(mask):#09x}, vectorised {key:#09x}")
+
+    # Every answer set must follow the path the table gives its class.
+    table_paths = slot_paths[slots]
+    mismatched = np.flatnonzero(table_paths != paths)
+    for index in mismatched[:20].tolist():
+        mask = int(_masks(index))
+        got = table_paths.flat[index]
+        errors.append(
+            f"answers {mask:#09x}: rules say {PATH_NAMES[paths.flat[index]]}, "
+            f"table says {PATH_NAMES[got] if got >= 0 else 'nothing'}"
+        )
+    if len(mismatched) > 20:
+        errors.append(f"... and {len(mismatched) - 20} more mismatched answer sets")
+
+    path_counts = np.bincount(paths.ravel(), minlength=len(PATH_NAMES))
+    unreachable = [name for name, count in zip(PATH_NAMES, path_counts) if not count]
+    in_space = {key for key in _TABLE if not key & (_ML_MASK | INFERS_OUTPUTS | VARYING_AUTONOMY)}
+    unreached_keys = sorted(in_space - set(class_keys.tolist()))
+
+    contradictions = []
+    for label, stages, columns, rows in conflicts(step1, later):
+        selected = paths
+        if columns is not None:
+            selected = selected[:, columns]
+        if rows is not None:
+            selected = selected[rows]
+        reached = np.bincount(selected.ravel(), minlength=len(PATH_NAMES))
+        verdicts = {
+            name: int(count)
+            for name, count, final in zip(PATH_NAMES, reached, _FINAL_PATHS)
+            if count and final and name.split(".")[0] in stages
+        }
+        contradictions.append((label, selected.size, verdicts))
+
+    return {
+        "answer_sets": slots.size,
+        "classes": [
+            (key, int(counts[slot]), PATH_NAMES[slot_paths[slot]])
+            for slot, key in zip(classes.tolist(), class_keys.tolist())
+            if slot_paths[slot] >= 0
+        ],
+        "path_counts": dict(zip(PATH_NAMES, path_counts.tolist())),
+        "unreachable_paths": unreachable,
+        "unreached_table_keys": unreached_keys,
+        "contradictions": contradictions,
+        "errors": errors,
+    }
+
+
+def golden_text(report):
+    lines = [
+        f"# ruleset {RULESET_VERSION}: {report['answer_sets']} answer sets, {len(report['classes'])} classes",
+        "# answer sets per path",
+    ]
+    lines += [f"{name} {count}" for name, count in report["path_counts"].items()]
+    lines.append("# canonical key, answer sets, path")
+    lines += [f"{key:#09x} {count} {name}" for key, count, name in report["classes"]]
+    return "\n".join(lines) + "\n"
+
+
+# -------- Entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enumerate every wizard answer set and verify the decision table.")
+    parser.add_argument("--golden", default=GOLDEN_PATH, help=f"golden file (default: {GOLDEN_PATH})")
+    parser.add_argument("--write", action="store_true", help="rewrite the golden file instead of comparing")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    report = build()
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"Checked {report['answer_sets']:,} answer sets in {len(report['classes']):,} classes "
+        f"in {elapsed * 1000:.0f} ms"
+    )
+    for name, count in report["path_counts"].items():
+        print(f"  {name:<24}{count:>10,}")
+    for name in report["unreachable_paths"]:
+        print(f"Unreachable path: {name}")
+    for key in report["unreached_table_keys"]:
+        print(f"Unreachable decision-table key: {key:#09x}")
+    for label, total, reached in report["contradictions"]:
+        if reached:
+            verdicts = ", ".join(f"{name} ({count:,})" for name, count in reached.items())
+            print(f"Contradictory: {label}: {sum(reached.values()):,} of {total:,} reach a verdict via {verdicts}")
+    for error in report["errors"]:
+        print(f"ERROR: {error}", file=sys.stderr)
+
+    text = golden_text(report)
+    if args.write:
+        with open(args.golden, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        print(f"Wrote {args.golden}")
+        return 1 if report["errors"] else 0
+
+    try:
+        with open(args.golden, encoding="utf-8") as handle:
+            expected = handle.read()
+    except FileNotFoundError:
+        print(f"No golden file at {args.golden}; run with --write to create it.", file=sys.stderr)
+        return 1
+    if expected != text:
+        diff = difflib.unified_diff(
+            expected.splitlines(), text.splitlines(), args.golden, "current rules", lineterm="", n=0
+        )
+        print("\n".join(diff))
+        print("The truth table changed; rerun with --write if the change is intended.", file=sys.stderr)
+        return 1
+    if report["errors"]:
+        return 1
+    print(f"Matches {args.golden}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())